@@ -1,187 +1,51 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-
-CANDLE_OPTIONS = ["None", "White Candle", "Red Candle"]
-
-
-def qp_int(key, default, min_value=0):
-    """Read an integer query parameter, falling back to default."""
-    val = st.query_params.get(key)
-    if val is not None:
-        try:
-            return max(int(val), min_value)
-        except (ValueError, TypeError):
-            pass
-    return default
-
-
-def qp_bool(key, default):
-    """Read a boolean query parameter (1/0), falling back to default."""
-    val = st.query_params.get(key)
-    if val is not None:
-        return val == "1"
-    return default
-
-
-def qp_radio_index(key, default, max_index=2):
-    """Read a radio button index query parameter, falling back to default."""
-    val = st.query_params.get(key)
-    if val is not None:
-        try:
-            v = int(val)
-            if 0 <= v <= max_index:
-                return v
-        except (ValueError, TypeError):
-            pass
-    return default
-
-
-def compute_multiplier(cc, white_candle, red_candle):
-    return 1 + (1 * cc + 1 * white_candle + 2 * red_candle)
-
-
-def run_simulation(
-    n_hunts_t1_writing,
-    n_hunts_t2_writing,
-    writing_multiplier,
-    cc_writing,
-    n_hunts_t3_noto_postscript,
-    bk,
-    noto_postscript_multiplier,
-    cc_noto,
-    fantasy_postscript_multiplier,
-    fantasy_diamond_multiplier,
-    cc_fantasy,
-    n_t2_mats,
-    n_t3_mats,
-    required_diamonds,
-    available_diamonds,
-    n_mallets,
-    noto_break_block,
-    fantasy_postscript_break_block,
-    fantasy_writing_short_only,
-    fantasy_postscript_extend,
-):
-    n_diamonds_per_cycle = 13 * fantasy_diamond_multiplier
-    required_cycles = (
-        (required_diamonds - available_diamonds) / n_diamonds_per_cycle
-        if n_diamonds_per_cycle > 0
-        else 0
-    )
-
-    all_simulation_data = []
-
-    for n_hunts_t2_fantasy_postscript in range(14):
-        n_hunts_t1_fantasy_postscript = 13 - n_hunts_t2_fantasy_postscript
-
-        # T2 mats
-        n_hunts_t2_total = n_hunts_t2_writing + n_hunts_t2_fantasy_postscript
-        t2_mats_used = n_hunts_t2_total * 12
-        t2_mats_farmed = (n_hunts_t1_writing * 1.5 * writing_multiplier) + (
-            n_hunts_t1_fantasy_postscript * 3 * fantasy_postscript_multiplier
-        )
-        net_t2_mats = t2_mats_farmed - t2_mats_used
-        n_cycles_t2 = 999 if net_t2_mats > 0 else (n_t2_mats / -net_t2_mats if net_t2_mats != 0 else 999)
-
-        # T3 mats
-        n_hunts_t3_total = n_hunts_t3_noto_postscript
-        t3_mats_used = n_hunts_t3_total * 30 * (1 / (1 + (bk * 0.5)))
-        t3_mats_farmed = (n_hunts_t2_writing * 1.2 * writing_multiplier) + (
-            n_hunts_t2_fantasy_postscript * 3 * fantasy_postscript_multiplier
-        )
-        net_t3_mats = t3_mats_farmed - t3_mats_used
-        n_cycles_t3 = 999 if net_t3_mats > 0 else (n_t3_mats / -net_t3_mats if net_t3_mats != 0 else 999)
-
-        # Mallets
-        noto_extend_ps_probability = 0.2
-        mallets_used = (
-            noto_break_block * 30
-            + 19  # noto writing
-            + noto_extend_ps_probability * 30
-            + fantasy_postscript_break_block * 30
-            + 5.18 * 5  # fantasy writing (med / short)
-            + fantasy_writing_short_only * ((12.52 - 5.18) * 5)
-            + fantasy_postscript_extend * 30
-        )
-        no_extend_prob = 0.5
-        avg_noto_ps_hunts = (
-            (no_extend_prob / (no_extend_prob + noto_extend_ps_probability)) * 10
-            + (noto_extend_ps_probability / (no_extend_prob + noto_extend_ps_probability)) * 13
-        )
-        mallets_farmed = (
-            0.6 * noto_postscript_multiplier * avg_noto_ps_hunts
-            + 2.5 * fantasy_postscript_multiplier * 13
-        )
-        net_mallets = mallets_farmed - mallets_used
-        n_cycles_mallets = 999 if net_mallets >= 0 else (n_mallets / -net_mallets if net_mallets != 0 else 999)
-
-        # CC used
-        cc_hunts_per_cycle = (
-            cc_writing * (n_hunts_t1_writing + n_hunts_t2_writing)
-            + cc_noto * n_hunts_t3_noto_postscript
-            + cc_fantasy * 13
-        )
-        n_cc_used = min(n_cycles_t2, n_cycles_t3, n_cycles_mallets, required_cycles) * cc_hunts_per_cycle
-
-        all_simulation_data.append(
-            {
-                "n_hunts_t1_fantasy_postscript": n_hunts_t1_fantasy_postscript,
-                "n_hunts_t2_fantasy_postscript": n_hunts_t2_fantasy_postscript,
-                "n_hunts_t2_writing": n_hunts_t2_writing,
-                "n_hunts_t2_total": n_hunts_t2_total,
-                "t2_mats_used": t2_mats_used,
-                "t2_mats_farmed": t2_mats_farmed,
-                "net_t2_mats": net_t2_mats,
-                "n_cycles_t2": n_cycles_t2,
-                "n_hunts_t3_total": n_hunts_t3_total,
-                "t3_mats_used": t3_mats_used,
-                "t3_mats_farmed": t3_mats_farmed,
-                "net_t3_mats": net_t3_mats,
-                "n_cycles_t3": n_cycles_t3,
-                "mallets_used": mallets_used,
-                "mallets_farmed": mallets_farmed,
-                "net_mallets": net_mallets,
-                "n_cycles_mallets": n_cycles_mallets,
-                "n_cc_used": n_cc_used,
-            }
-        )
-
-    return pd.DataFrame(all_simulation_data), n_diamonds_per_cycle, required_cycles
 
+from cliffs import CANDLE_OPTIONS, SimParams
+from cliffs.cache import simulation_cache
+from cliffs.graph import ModelGraph, warm_cache
+from cliffs.jobs import job_pool
+from cliffs.profiling import PROFILE_QUERY_KEY, RerunProfiler, profiling_enabled
+from cliffs.store import result_store
+from cliffs.ui import release_unused_jobs, render_profiler
 
 # --- Page config & navigation ---
 st.set_page_config(page_title="Cliffs Simulator — LNY 2026", page_icon="⛰️", layout="wide")
 
+# Opt-in profiling (?profile=1 or CLIFFS_PROFILE=1); stages are no-ops otherwise.
+profiler = RerunProfiler(profiling_enabled(st.query_params))
+
 page = st.navigation([
     st.Page("pages/guide.py", title="User Guide", icon="📖"),
     st.Page("pages/simulator.py", title="Cliffs Simulator", icon="⛰️", default=True),
+    st.Page("pages/optimizer.py", title="Optimizer", icon="🎯"),
     st.Page("pages/event.py", title="LNY Event", icon="🧧"),
+    st.Page("pages/roster.py", title="Roster", icon="👥"),
 ])
 
 # --- Initialize widget defaults from query params (first load only) ---
 if "_initialized" not in st.session_state:
-    st.session_state["w_t1w"] = qp_int("t1w", 80)
-    st.session_state["w_t2w"] = qp_int("t2w", 40)
-    st.session_state["w_ccw"] = qp_bool("ccw", True)
-    st.session_state["w_cw"] = CANDLE_OPTIONS[qp_radio_index("cw", 0)]
-    st.session_state["w_t3n"] = qp_int("t3n", 13)
-    st.session_state["w_bk"] = qp_bool("bk", True)
-    st.session_state["w_ccn"] = qp_bool("ccn", True)
-    st.session_state["w_cn"] = CANDLE_OPTIONS[qp_radio_index("cn", 1)]
-    st.session_state["w_ccf"] = qp_bool("ccf", True)
-    st.session_state["w_cf"] = CANDLE_OPTIONS[qp_radio_index("cf", 2)]
-    st.session_state["w_t2m"] = qp_int("t2m", 1000)
-    st.session_state["w_t3m"] = qp_int("t3m", 500)
-    st.session_state["w_rd"] = qp_int("rd", 355)
-    st.session_state["w_ad"] = qp_int("ad", 0)
-    st.session_state["w_mal"] = qp_int("mal", 50)
-    st.session_state["w_nbb"] = qp_bool("nbb", True)
-    st.session_state["w_fbb"] = qp_bool("fbb", True)
-    st.session_state["w_fws"] = qp_bool("fws", True)
-    st.session_state["w_fpe"] = qp_bool("fpe", True)
-    st.session_state["w_cap"] = qp_int("cap", 30, min_value=1)
-    st.session_state["w_hpd"] = qp_int("hpd", 80, min_value=1)
+    saved = SimParams.from_query(st.query_params)
+    st.session_state["w_t1w"] = saved.n_hunts_t1_writing
+    st.session_state["w_t2w"] = saved.n_hunts_t2_writing
+    st.session_state["w_ccw"] = saved.cc_writing
+    st.session_state["w_cw"] = CANDLE_OPTIONS[saved.candle_writing]
+    st.session_state["w_t3n"] = saved.n_hunts_t3_noto_postscript
+    st.session_state["w_bk"] = saved.bk
+    st.session_state["w_ccn"] = saved.cc_noto
+    st.session_state["w_cn"] = CANDLE_OPTIONS[saved.candle_noto]
+    st.session_state["w_ccf"] = saved.cc_fantasy
+    st.session_state["w_cf"] = CANDLE_OPTIONS[saved.candle_fantasy]
+    st.session_state["w_t2m"] = saved.n_t2_mats
+    st.session_state["w_t3m"] = saved.n_t3_mats
+    st.session_state["w_rd"] = saved.required_diamonds
+    st.session_state["w_ad"] = saved.available_diamonds
+    st.session_state["w_mal"] = saved.n_mallets
+    st.session_state["w_nbb"] = saved.noto_break_block
+    st.session_state["w_fbb"] = saved.fantasy_postscript_break_block
+    st.session_state["w_fws"] = saved.fantasy_writing_short_only
+    st.session_state["w_fpe"] = saved.fantasy_postscript_extend
+    st.session_state["w_cap"] = saved.max_cycles_cap
+    st.session_state["w_hpd"] = saved.hunts_per_day
     st.session_state["_initialized"] = True
 
 # --- Shared sidebar parameters ---
@@ -191,7 +55,6 @@ n_hunts_t1_writing = st.sidebar.number_input("T1 Writing Hunts", min_value=0, st
 n_hunts_t2_writing = st.sidebar.number_input("T2 Writing Hunts", min_value=0, step=10, key="w_t2w")
 cc_writing = st.sidebar.checkbox("Condensed Creativity (Writing)", key="w_ccw")
 candle_writing = st.sidebar.radio("LNY 2026 Candle (Writing)", CANDLE_OPTIONS, key="w_cw")
-writing_multiplier = compute_multiplier(cc_writing, candle_writing == "White Candle", candle_writing == "Red Candle")
 
 st.sidebar.header("Postscript Phase (Noto)")
 
@@ -199,14 +62,11 @@ n_hunts_t3_noto_postscript = st.sidebar.number_input("Noto Charging Hunts (T3)",
 bk = st.sidebar.checkbox("Baitkeep Charm (T3 Cheese)", key="w_bk")
 cc_noto = st.sidebar.checkbox("Condensed Creativity (Noto)", key="w_ccn")
 candle_noto = st.sidebar.radio("LNY 2026 Candle (Noto)", CANDLE_OPTIONS, key="w_cn")
-noto_postscript_multiplier = compute_multiplier(cc_noto, candle_noto == "White Candle", candle_noto == "Red Candle")
 
 st.sidebar.header("Postscript Phase (Fantasy)")
 
 cc_fantasy = st.sidebar.checkbox("Condensed Creativity (Fantasy)", key="w_ccf")
 candle_fantasy = st.sidebar.radio("LNY 2026 Candle (Fantasy)", CANDLE_OPTIONS, key="w_cf")
-fantasy_postscript_multiplier = compute_multiplier(cc_fantasy, candle_fantasy == "White Candle", candle_fantasy == "Red Candle")
-fantasy_diamond_multiplier = 1 + (1 * (candle_fantasy == "White Candle") + 2 * (candle_fantasy == "Red Candle"))
 
 st.sidebar.header("Materials & Diamonds")
 
@@ -227,85 +87,107 @@ st.sidebar.header("Event Settings")
 hunts_per_day = st.sidebar.number_input("Hunts per Day", min_value=1, step=10, key="w_hpd",
                                         help="How many hunts you complete per day on average.")
 
+st.sidebar.header("Stochastic Mode")
+stochastic_mode = st.sidebar.toggle("Monte Carlo Trials", key="w_mc",
+                                    help="Sample drops and Noto extends per cycle instead of using averages.")
+monte_carlo_options = None
+if stochastic_mode:
+    monte_carlo_options = {
+        "n_trials": st.sidebar.number_input("Trials", min_value=100, step=500, value=2000, key="w_mct"),
+        "time_budget": st.sidebar.number_input("Time Budget (s)", min_value=0.5, step=0.5, value=2.0, key="w_mcb"),
+        "seed": st.sidebar.number_input("Random Seed", min_value=0, step=1, value=0, key="w_mcs"),
+    }
+
 st.sidebar.header("Chart Settings")
 max_cycles_cap = st.sidebar.number_input("Max Cycles Cap (for charts)", min_value=1, step=1, key="w_cap")
 
+# --- Current settings ---
+params = SimParams(
+    n_hunts_t1_writing=n_hunts_t1_writing,
+    n_hunts_t2_writing=n_hunts_t2_writing,
+    cc_writing=cc_writing,
+    candle_writing=CANDLE_OPTIONS.index(candle_writing),
+    n_hunts_t3_noto_postscript=n_hunts_t3_noto_postscript,
+    bk=bk,
+    cc_noto=cc_noto,
+    candle_noto=CANDLE_OPTIONS.index(candle_noto),
+    cc_fantasy=cc_fantasy,
+    candle_fantasy=CANDLE_OPTIONS.index(candle_fantasy),
+    n_t2_mats=n_t2_mats,
+    n_t3_mats=n_t3_mats,
+    required_diamonds=required_diamonds,
+    available_diamonds=available_diamonds,
+    n_mallets=n_mallets,
+    noto_break_block=noto_break_block,
+    fantasy_postscript_break_block=fantasy_postscript_break_block,
+    fantasy_writing_short_only=fantasy_writing_short_only,
+    fantasy_postscript_extend=fantasy_postscript_extend,
+    max_cycles_cap=max_cycles_cap,
+    hunts_per_day=hunts_per_day,
+)
+settings = params.to_settings()
+
 # --- Save settings to URL ---
 st.sidebar.divider()
 if st.sidebar.button("Save Settings to URL"):
     st.session_state["_settings_saved"] = True
-    params = {
-        "t1w": str(n_hunts_t1_writing),
-        "t2w": str(n_hunts_t2_writing),
-        "ccw": str(int(cc_writing)),
-        "cw": str(CANDLE_OPTIONS.index(candle_writing)),
-        "t3n": str(n_hunts_t3_noto_postscript),
-        "bk": str(int(bk)),
-        "ccn": str(int(cc_noto)),
-        "cn": str(CANDLE_OPTIONS.index(candle_noto)),
-        "ccf": str(int(cc_fantasy)),
-        "cf": str(CANDLE_OPTIONS.index(candle_fantasy)),
-        "t2m": str(n_t2_mats),
-        "t3m": str(n_t3_mats),
-        "rd": str(required_diamonds),
-        "ad": str(available_diamonds),
-        "mal": str(n_mallets),
-        "nbb": str(int(noto_break_block)),
-        "fbb": str(int(fantasy_postscript_break_block)),
-        "fws": str(int(fantasy_writing_short_only)),
-        "fpe": str(int(fantasy_postscript_extend)),
-        "cap": str(max_cycles_cap),
-        "hpd": str(hunts_per_day),
-    }
+    keep_profiling = st.query_params.get(PROFILE_QUERY_KEY)
     st.query_params.clear()
-    st.query_params.update(params)
+    st.query_params.update(params.to_query())
+    if keep_profiling:
+        st.query_params[PROFILE_QUERY_KEY] = keep_profiling
 
 if st.session_state.pop("_settings_saved", False):
     st.sidebar.success("URL updated! Bookmark this page to save your settings.")
 
-# --- Run simulation ---
-df, n_diamonds_per_cycle, required_cycles = run_simulation(
-    n_hunts_t1_writing,
-    n_hunts_t2_writing,
-    writing_multiplier,
-    cc_writing,
-    n_hunts_t3_noto_postscript,
-    bk,
-    noto_postscript_multiplier,
-    cc_noto,
-    fantasy_postscript_multiplier,
-    fantasy_diamond_multiplier,
-    cc_fantasy,
-    n_t2_mats,
-    n_t3_mats,
-    required_diamonds,
-    available_diamonds,
-    n_mallets,
-    noto_break_block,
-    fantasy_postscript_break_block,
-    fantasy_writing_short_only,
-    fantasy_postscript_extend,
-)
 
-# --- Compute derived columns ---
-df["max_cycles_mats"] = df[["n_cycles_t2", "n_cycles_t3"]].min(axis=1)
-df["max_cycles"] = df[["n_cycles_t2", "n_cycles_t3", "n_cycles_mallets"]].min(axis=1)
-best_idx = df["max_cycles_mats"].idxmax()
-best_row = df.loc[best_idx]
+profiler.checkpoint("sidebar")
+
+
+# --- Run simulation ---
+# The first rerun after a restart loads recently used results from the on-disk store.
+warm_cache()
+# The session's model graph recomputes only the nodes whose settings changed; the result
+# node is also shared across sessions via the simulation cache.
+model = st.session_state.setdefault("model", ModelGraph())
+model.start_rerun(settings)
+profiler.note(page=page.title, recomputed=model.recomputed)
+with profiler.stage("simulation"):
+    result = model["result"]
+
+with st.sidebar.expander("Cache Stats"):
+    cache_stats = simulation_cache.stats()
+    st.caption(
+        f"{cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']:.0%} hit rate) · {cache_stats['size']}/{cache_stats['max_entries']} entries"
+    )
+    if result_store is not None:
+        store_stats = result_store.stats()
+        st.caption(
+            f"Disk store: {store_stats['entries']} entries, {store_stats['bytes'] / 2**20:.1f}/"
+            f"{store_stats['max_bytes'] / 2**20:.0f} MiB · {store_stats['hits']} hits / {store_stats['misses']} misses"
+        )
+    job_stats = job_pool.stats()
+    st.caption(
+        f"Background jobs: {job_stats['running']} running on {job_stats['max_workers']} workers · "
+        f"{job_stats['submitted']} started, {job_stats['coalesced']} shared, {job_stats['cancelled']} cancelled"
+    )
 
 # --- Store results in session state for all pages ---
-st.session_state["df"] = df
-st.session_state["best_row"] = best_row
-st.session_state["required_cycles"] = required_cycles
-st.session_state["n_diamonds_per_cycle"] = n_diamonds_per_cycle
-st.session_state["writing_multiplier"] = writing_multiplier
-st.session_state["noto_postscript_multiplier"] = noto_postscript_multiplier
-st.session_state["fantasy_postscript_multiplier"] = fantasy_postscript_multiplier
-st.session_state["n_t2_mats"] = n_t2_mats
-st.session_state["n_t3_mats"] = n_t3_mats
-st.session_state["n_mallets"] = n_mallets
-st.session_state["max_cycles_cap"] = max_cycles_cap
-st.session_state["hunts_per_day"] = hunts_per_day
+# The result object is the cached one, so sessions with the same settings share it.
+st.session_state["result"] = result
+st.session_state["params"] = params
+st.session_state["settings"] = settings
+st.session_state["monte_carlo_options"] = monte_carlo_options
+st.session_state["profiler"] = profiler
 
 # --- Run the selected page ---
-page.run()
+with profiler.stage(f"page: {page.title}"):
+    page.run()
+
+# Background jobs the page no longer asked for (it was left, or its inputs changed
+# elsewhere) are cancelled instead of running on for nobody.
+release_unused_jobs()
+
+if profiler.enabled:
+    render_profiler(profiler.finish())
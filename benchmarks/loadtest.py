@@ -0,0 +1,322 @@
+"""Concurrent-session load test of the Streamlit app on a local server.
+
+    python -m benchmarks.loadtest [--sessions 20] [--reruns 10] [--think 0.5] [-o loadtest.json]
+
+Starts `streamlit run app.py` headless on a free localhost port and opens --sessions
+websocket sessions against it, each speaking the same protocol as a browser tab. Every
+session reruns the app --reruns times, changing one to three random sidebar inputs each
+time and switching between the Simulator, Optimizer and LNY Event pages at random, with
+--think seconds of idle time in between. Rerun latency is measured from sending the rerun
+to the server's script_finished message.
+
+Reports p50/p95/p99 latency overall and per page, the server's CPU use (cores busy over
+the run) and its RSS growth per connected session. CPU and RSS are read from /proc, so
+they are only reported on Linux. Nothing leaves the machine; the server only listens on
+127.0.0.1 and is stopped at the end.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+from benchmarks.run import ROOT, environment
+
+PAGES = ("Cliffs Simulator", "Optimizer", "LNY Event")
+
+# Sidebar widget key -> random value a user might enter (ranges as in benchmarks.run.sweep_settings).
+RANDOM_INPUTS = {
+    "w_t1w": lambda rng: rng.randrange(0, 201, 10),
+    "w_t2w": lambda rng: rng.randrange(0, 101, 10),
+    "w_t3n": lambda rng: rng.randrange(0, 27),
+    "w_t2m": lambda rng: rng.randrange(0, 5001),
+    "w_t3m": lambda rng: rng.randrange(0, 5001),
+    "w_rd": lambda rng: rng.randrange(0, 501),
+    "w_ad": lambda rng: rng.randrange(0, 301),
+    "w_mal": lambda rng: rng.randrange(0, 2001),
+    "w_hpd": lambda rng: rng.randrange(10, 201, 10),
+    "w_cap": lambda rng: rng.randrange(10, 61),
+    "w_ccw": lambda rng: rng.random() < 0.5,
+    "w_bk": lambda rng: rng.random() < 0.5,
+    "w_ccn": lambda rng: rng.random() < 0.5,
+    "w_ccf": lambda rng: rng.random() < 0.5,
+    "w_nbb": lambda rng: rng.random() < 0.5,
+    "w_fbb": lambda rng: rng.random() < 0.5,
+    "w_fws": lambda rng: rng.random() < 0.5,
+    "w_fpe": lambda rng: rng.random() < 0.5,
+    "w_cw": lambda rng: rng.randrange(3),
+    "w_cn": lambda rng: rng.randrange(3),
+    "w_cf": lambda rng: rng.randrange(3),
+}
+
+# Proto value field for each widget type, and how to encode a value into it.
+WIDGET_VALUES = {
+    "number_input": ("double_value", float),
+    "checkbox": ("bool_value", bool),
+    "radio": ("string_value", None),  # option label; the random value is an option index
+}
+
+
+def _protocol():
+    try:
+        import websockets
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    except ImportError:
+        raise SystemExit("The load test needs the websockets package (pip install websockets).") from None
+    return websockets, BackMsg, ForwardMsg
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, timeout=60):
+    """`streamlit run app.py` on 127.0.0.1:port; returns the process once it answers health checks."""
+    command = [
+        sys.executable, "-m", "streamlit", "run", os.path.join(ROOT, "app.py"),
+        "--server.headless", "true",
+        "--server.address", "127.0.0.1",
+        "--server.port", str(port),
+        "--browser.gatherUsageStats", "false",
+    ]
+    server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited early:\n{server.stderr.read().decode()}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"streamlit did not start within {timeout}s")
+
+
+def process_usage(pid):
+    """(CPU seconds, RSS bytes) of a process from /proc, or (None, None) where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except OSError:
+        return None, None
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return cpu, rss_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class Session:
+    """One simulated browser tab: a websocket session that reruns app.py with chosen widget values."""
+
+    def __init__(self, url, seed):
+        self.url = url
+        self.rng = random.Random(seed)
+        self.page = PAGES[0]
+        self.widgets = {}  # widget key -> (id, type, options)
+        self.values = {}  # widget key -> value sent with every rerun
+        self.page_hashes = {}
+        self.timings = []  # (page, seconds)
+        self.errors = []
+        self._ws = None
+
+    async def connect(self):
+        websockets, _, _ = _protocol()
+        self._ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        await self._ws.close()
+
+    async def rerun(self):
+        """Rerun the current page with the current widget values; returns seconds until it finished."""
+        _, BackMsg, ForwardMsg = _protocol()
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.query_string = ""
+        client_state.page_script_hash = self.page_hashes.get(self.page, "")
+        for key, value in self.values.items():
+            widget_id, widget_type, options = self.widgets[key]
+            field, encode = WIDGET_VALUES[widget_type]
+            state = client_state.widget_states.widgets.add()
+            state.id = widget_id
+            setattr(state, field, options[value] if encode is None else encode(value))
+
+        start = time.perf_counter()
+        await self._ws.send(message.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self._ws.recv())
+            kind = forward.WhichOneof("type")
+            if kind == "navigation":
+                self.page_hashes = {page.page_name: page.page_script_hash for page in forward.navigation.app_pages}
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self._read_element(forward.delta.new_element)
+            elif kind == "script_finished":
+                elapsed = time.perf_counter() - start
+                self.timings.append((self.page, elapsed))
+                return elapsed
+
+    def _read_element(self, element):
+        element_type = element.WhichOneof("type")
+        if element_type == "exception":
+            self.errors.append(f"{self.page}: {element.exception.type}: {element.exception.message}")
+        elif element_type in WIDGET_VALUES:
+            widget = getattr(element, element_type)
+            key = widget.id.rsplit("-", 1)[-1]
+            if key in RANDOM_INPUTS:
+                self.widgets[key] = (widget.id, element_type, list(getattr(widget, "options", ())))
+
+    def change_inputs(self, switch_probability):
+        """Change one to three random sidebar inputs, and maybe move to another page."""
+        for key in self.rng.sample(sorted(self.widgets), k=min(len(self.widgets), self.rng.randint(1, 3))):
+            self.values[key] = RANDOM_INPUTS[key](self.rng)
+        if self.rng.random() < switch_probability:
+            self.page = self.rng.choice(PAGES)
+
+
+async def run_session(session, n_reruns, think, switch_probability, start_delay):
+    await asyncio.sleep(start_delay)
+    await session.connect()
+    await session.rerun()  # first page load
+    for _ in range(n_reruns):
+        await asyncio.sleep(session.rng.uniform(0, 2 * think))
+        session.change_inputs(switch_probability)
+        await session.rerun()
+
+
+async def sample_usage(pid, samples, interval=0.25):
+    while True:
+        samples.append(process_usage(pid)[1])
+        await asyncio.sleep(interval)
+
+
+async def warm_up(url):
+    """Load every page once so imports and first-use allocations are not counted against sessions."""
+    session = Session(url, seed=-1)
+    await session.connect()
+    try:
+        for page in PAGES:
+            session.page = page
+            await session.rerun()
+    finally:
+        await session.close()
+
+
+async def load_test(url, pid, args):
+    await warm_up(url)
+    sessions = [Session(url, args.seed + i) for i in range(args.sessions)]
+    rss_samples = []
+    sampler = asyncio.create_task(sample_usage(pid, rss_samples))
+    cpu_start, rss_start = process_usage(pid)
+    client_cpu_start = time.process_time()
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            run_session(session, args.reruns, args.think, args.switch, args.ramp * i / args.sessions)
+            for i, session in enumerate(sessions)
+        ))
+        wall = time.perf_counter() - start
+        cpu_end, rss_end = process_usage(pid)
+    finally:
+        sampler.cancel()
+        await asyncio.gather(*(session.close() for session in sessions if session._ws is not None))
+    usage = {"wall_s": wall, "client_cpu_s": time.process_time() - client_cpu_start}
+    if cpu_start is not None:
+        usage.update(
+            server_cpu_s=cpu_end - cpu_start,
+            server_cores_busy=(cpu_end - cpu_start) / wall,
+            server_rss_start_bytes=rss_start,
+            server_rss_end_bytes=rss_end,
+            server_rss_peak_bytes=max(filter(None, rss_samples), default=rss_end),
+            rss_per_session_bytes=(rss_end - rss_start) / args.sessions,
+        )
+    return sessions, usage
+
+
+def latency_stats(seconds):
+    seconds = np.asarray(seconds)
+    p50, p95, p99 = np.percentile(seconds, [50, 95, 99])
+    return {"n": len(seconds), "p50_s": p50, "p95_s": p95, "p99_s": p99, "max_s": seconds.max()}
+
+
+def report(sessions, usage):
+    timings = [timing for session in sessions for timing in session.timings]
+    latency = {"all": latency_stats([seconds for _, seconds in timings])}
+    for page in PAGES:
+        page_timings = [seconds for name, seconds in timings if name == page]
+        if page_timings:
+            latency[page] = latency_stats(page_timings)
+    errors = [error for session in sessions for error in session.errors]
+    return {"latency": latency, "usage": usage, "n_errors": len(errors), "errors": errors[:20]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent simulated sessions.")
+    parser.add_argument("--reruns", type=int, default=10, help="Reruns per session after the first page load.")
+    parser.add_argument("--think", type=float, default=0.5, help="Mean idle seconds between a session's reruns.")
+    parser.add_argument("--switch", type=float, default=0.3, help="Chance of switching page on each rerun.")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which sessions connect.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Test an already running server (ws://host:port/_stcore/stream) "
+                                      "instead of starting one; CPU and RSS need --pid.")
+    parser.add_argument("--pid", type=int, help="Server process id when using --url.")
+    parser.add_argument("-o", "--output", help="Also write the report as JSON.")
+    args = parser.parse_args(argv)
+    _protocol()
+
+    server = None
+    if args.url:
+        url, pid = args.url, args.pid
+    else:
+        port = free_port()
+        # Sessions should exercise computation, not results left on disk by earlier runs.
+        os.environ.setdefault("CLIFFS_STORE_PATH", "")
+        server = start_server(port)
+        url, pid = f"ws://127.0.0.1:{port}/_stcore/stream", server.pid
+    try:
+        sessions, usage = asyncio.run(load_test(url, pid, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(10)
+
+    result = report(sessions, usage)
+    print(f"{args.sessions} sessions x {args.reruns + 1} runs in {usage['wall_s']:.1f}s", file=sys.stderr)
+    print(f"{'page':<18} {'runs':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}", file=sys.stderr)
+    for page, stats in result["latency"].items():
+        percentiles = " ".join(f"{stats[k] * 1e3:7.0f}ms" for k in ("p50_s", "p95_s", "p99_s", "max_s"))
+        print(f"{page:<18} {stats['n']:>6} {percentiles}", file=sys.stderr)
+    if "server_cpu_s" in usage:
+        print(
+            f"server CPU {usage['server_cpu_s']:.1f}s ({usage['server_cores_busy']:.2f} cores busy), "
+            f"RSS {usage['server_rss_start_bytes'] / 2**20:.0f} -> {usage['server_rss_end_bytes'] / 2**20:.0f} MiB "
+            f"(peak {usage['server_rss_peak_bytes'] / 2**20:.0f}), "
+            f"{usage['rss_per_session_bytes'] / 2**20:.2f} MiB per session",
+            file=sys.stderr,
+        )
+    print(f"client CPU {usage['client_cpu_s']:.1f}s · {result['n_errors']} errors", file=sys.stderr)
+    for error in result["errors"]:
+        print(f"  {error}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "args": vars(args), **result}, f, indent=2, default=float)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    if result["n_errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
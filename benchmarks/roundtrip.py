@@ -0,0 +1,80 @@
+"""Round-trip check of rate calibration: logs drawn at known rates must calibrate back to them.
+
+    python -m benchmarks.roundtrip [--postscripts 20000] [--seed 0]
+
+For each Noto extend chance in EXTEND_PROBABILITIES, writes a CSV hunt log drawn the way
+montecarlo.run_trials draws hunts (one extend roll per Noto postscript, Poisson drops
+per hunt), runs calibration.calibrate on it and checks every fitted rate is within twice
+its 95% interval's half-width (about four standard errors) of the rate the log was drawn
+at, so the check is not expected to fail by chance. Exits non-zero if any rate is not.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from cliffs.calibration import calibrate
+from cliffs.engine import DEFAULT_RATES, NOTO_EXTENDED_POSTSCRIPT_HUNTS, NOTO_POSTSCRIPT_HUNTS
+
+EXTEND_PROBABILITIES = (0.1, 0.3, 0.5, 0.8)
+LOG_FIELDS = ["phase", "tier", "multiplier", "t2_mats", "t3_mats", "mallets", "mallets_spent", "short_only", "extended"]
+
+
+def simulate_log(path, rates, n_postscripts, rng):
+    """A CSV hunt log of n_postscripts Noto postscripts plus as many of every other hunt, drawn at rates."""
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, LOG_FIELDS)
+        writer.writeheader()
+        for _ in range(n_postscripts):
+            extended = rng.random() < rates["noto_extend_probability"]
+            n_hunts = NOTO_EXTENDED_POSTSCRIPT_HUNTS if extended else NOTO_POSTSCRIPT_HUNTS
+            for hunt in range(n_hunts):
+                row = {"phase": "noto_postscript", "mallets": rng.poisson(rates["noto_mallets"])}
+                if hunt == n_hunts - 1:
+                    row["extended"] = int(extended)
+                writer.writerow(row)
+
+            multiplier = int(rng.integers(1, 4))
+            writer.writerow({"phase": "writing", "tier": 1, "multiplier": multiplier,
+                             "t2_mats": rng.poisson(rates["t1_writing_t2"] * multiplier)})
+            writer.writerow({"phase": "writing", "tier": 2, "multiplier": multiplier,
+                             "t3_mats": rng.poisson(rates["t2_writing_t3"] * multiplier)})
+            tier = int(rng.integers(1, 3))
+            mats = rng.poisson(rates["fantasy_postscript_mats"])
+            writer.writerow({"phase": "fantasy_postscript", "tier": tier, "t2_mats" if tier == 1 else "t3_mats": mats,
+                             "mallets": rng.poisson(rates["fantasy_mallets"])})
+            short_only = int(rng.integers(0, 2))
+            spent = rates["fantasy_writing_short_mallets" if short_only else "fantasy_writing_mallets"]
+            writer.writerow({"phase": "fantasy_writing", "short_only": short_only, "mallets_spent": rng.poisson(spent)})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--postscripts", type=int, default=20000, help="Noto postscripts per log.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        for probability in EXTEND_PROBABILITIES:
+            rates = {**DEFAULT_RATES, "noto_extend_probability": probability}
+            path = os.path.join(directory, f"hunts_{probability}.csv")
+            simulate_log(path, rates, args.postscripts, rng)
+            fitted = calibrate([path])["rates"]
+            print(f"Noto extend chance {probability}:")
+            for name, rate in fitted.items():
+                ok = rate["calibrated"] and abs(rate["estimate"] - rates[name]) <= rate["high"] - rate["low"]
+                failures += not ok
+                print(f"  {name:32} {rates[name]:8.3f} -> {rate['estimate']:8.3f} "
+                      f"[{rate['low']:.3f}, {rate['high']:.3f}]{'' if ok else '  MISMATCH'}")
+    print("OK" if not failures else f"{failures} rates off by more than twice their 95% interval")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
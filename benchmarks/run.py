@@ -0,0 +1,236 @@
+"""Benchmarks for the simulation engine and Streamlit page reruns.
+
+    python -m benchmarks.run [--quick] [-o results.json] [--compare baseline.json]
+
+Times the legacy run_simulation, simulate, the derived-column / best-split step that
+app.py runs on every miss, batched simulate_settings sweeps from one configuration up
+to large batches (and the same sweeps through the compiled rule-set matrices), and end-to-end reruns of pages/simulator.py through AppTest. Each
+entry records the best and median time per call, throughput and peak traced memory,
+and the whole run is written as JSON so two commits can be compared with --compare.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from cliffs import SimParams, run_simulation, simulate, simulate_settings
+from cliffs.core import summarize
+from cliffs.engine import RULE_SET
+from cliffs.rules import compile_rule_sets, evaluate_rule_sets
+
+# Page runs measure computation, so keep results out of the on-disk store.
+os.environ.setdefault("CLIFFS_STORE_PATH", "")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Representative sidebar configurations: the defaults, a mallet-starved player, a
+# self-sustaining farm and a fully boosted one.
+CONFIGS = {
+    "default": SimParams(),
+    "mallet_bound": SimParams(n_mallets=20, fantasy_postscript_break_block=True, fantasy_writing_short_only=True),
+    "self_sustaining": SimParams(n_hunts_t1_writing=200, n_hunts_t2_writing=100, n_hunts_t3_noto_postscript=4),
+    "boosted": SimParams(
+        candle_writing=2, candle_noto=2, candle_fantasy=2, n_t2_mats=20000, n_t3_mats=20000, n_mallets=5000
+    ),
+}
+
+BATCH_SIZES = (1, 100, 10_000, 100_000)
+QUICK_BATCH_SIZES = (1, 100, 10_000)
+
+
+def measure(fn, repeat, number=1):
+    """Best and median seconds per call over repeat rounds, plus peak traced memory of one call."""
+    fn()  # warm-up: imports, caches, first-call allocations
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"min_s": min(timings), "median_s": statistics.median(timings), "peak_bytes": peak}
+
+
+def sweep_settings(params, size, seed=0):
+    """size settings around params with the hunt counts and stockpiles varied, as columnar arrays."""
+    rng = np.random.default_rng(seed)
+    settings = {key: np.full(size, value) for key, value in params.to_settings().items()}
+    settings["t1w"] = rng.integers(0, 201, size)
+    settings["t2w"] = rng.integers(0, 101, size)
+    settings["t3n"] = rng.integers(0, 27, size)
+    settings["t2m"] = rng.integers(0, 5001, size)
+    settings["t3m"] = rng.integers(0, 5001, size)
+    settings["mal"] = rng.integers(0, 2001, size)
+    return settings
+
+
+def bench_engine(repeat):
+    results = []
+    for name, params in CONFIGS.items():
+        legacy_args = [
+            params.n_hunts_t1_writing, params.n_hunts_t2_writing, params.writing_multiplier, params.cc_writing,
+            params.n_hunts_t3_noto_postscript, params.bk, params.noto_postscript_multiplier, params.cc_noto,
+            params.fantasy_postscript_multiplier, params.fantasy_diamond_multiplier, params.cc_fantasy,
+            params.n_t2_mats, params.n_t3_mats, params.required_diamonds, params.available_diamonds,
+            params.n_mallets, params.noto_break_block, params.fantasy_postscript_break_block,
+            params.fantasy_writing_short_only, params.fantasy_postscript_extend,
+        ]
+        result = simulate(params)
+
+        def rank():
+            return result.to_frame(), result.best_row
+
+        for bench, fn in (
+            ("run_simulation", lambda: run_simulation(*legacy_args)),
+            ("simulate", lambda: simulate(params)),
+            ("derive_and_rank", rank),
+        ):
+            stats = measure(fn, repeat, number=20)
+            results.append({"name": bench, "config": name, "size": 1, **stats})
+    return results
+
+
+def bench_batches(repeat, sizes):
+    results = []
+    compiled = compile_rule_sets([RULE_SET])
+    for size in sizes:
+        settings = sweep_settings(CONFIGS["default"], size)
+
+        def sweep():
+            columns, _, required_cycles = simulate_settings(settings)
+            return summarize(columns, required_cycles)
+
+        stats = measure(sweep, repeat if size < 100_000 else max(1, repeat // 2))
+        results.append({"name": "batch_sweep", "config": "default", "size": size, **stats})
+        stats = measure(lambda: evaluate_rule_sets(settings, compiled), repeat if size < 100_000 else max(1, repeat // 2))
+        results.append({"name": "rule_matrix", "config": "default", "size": size, **stats})
+    return results
+
+
+def bench_pages(repeat):
+    """End-to-end script runs of app.py on the Simulator page: cold, unchanged rerun and input change."""
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    from cliffs.cache import simulation_cache
+
+    set_log_level("error")
+
+    app_path = os.path.join(ROOT, "app.py")
+    results = []
+
+    def cold():
+        simulation_cache.clear()
+        at = AppTest.from_file(app_path, default_timeout=60)
+        at.run()
+        return at
+
+    at = cold()
+    change = itertools.count()
+
+    def rerun():
+        at.run()
+
+    def rerun_changed():
+        at.number_input(key="w_t1w").set_value(81 + next(change) % 100)
+        at.run()
+
+    for bench, fn in (("page_cold_run", cold), ("page_rerun", rerun), ("page_rerun_changed", rerun_changed)):
+        stats = measure(fn, repeat)
+        results.append({"name": bench, "config": "default", "size": 1, **stats})
+    if at.exception:
+        raise RuntimeError(f"pages/simulator.py raised: {at.exception[0].value}")
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for module in ("numpy", "pandas", "streamlit"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        **versions,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print best-time ratios against a baseline run; returns the number of regressions."""
+    before = {(r["name"], r["config"], r["size"]): r for r in baseline["results"]}
+    n_regressions = 0
+    print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for r in results:
+        key = (r["name"], r["config"], r["size"])
+        if key not in before:
+            continue
+        ratio = r["min_s"] / before[key]["min_s"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        n_regressions += bool(flag)
+        label = f"{r['name']}[{r['config']}, n={r['size']}]"
+        print(f"{label:<40} {before[key]['min_s'] * 1e3:>10.3f}ms {r['min_s'] * 1e3:>10.3f}ms {ratio:>7.2f}{flag}")
+    return n_regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="Write results as JSON (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--quick", action="store_true", help="Fewer repeats and no 100k-config batch.")
+    parser.add_argument("--skip-pages", action="store_true", help="Skip the AppTest page reruns.")
+    parser.add_argument("--compare", help="Baseline results JSON to compare best times against.")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Ratio above which --compare flags a regression.")
+    args = parser.parse_args(argv)
+
+    repeat = 3 if args.quick else 7
+    results = bench_engine(repeat) + bench_batches(repeat, QUICK_BATCH_SIZES if args.quick else BATCH_SIZES)
+    if not args.skip_pages:
+        results += bench_pages(repeat)
+    for r in results:
+        r["throughput_per_s"] = r["size"] / r["min_s"]
+        print(
+            f"{r['name']:<20} {r['config']:<16} n={r['size']:<7} "
+            f"min {r['min_s'] * 1e3:9.3f}ms  median {r['median_s'] * 1e3:9.3f}ms  "
+            f"{r['throughput_per_s']:12.0f}/s  peak {r['peak_bytes'] / 2**20:7.2f} MiB",
+            file=sys.stderr,
+        )
+
+    env = environment()
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{env['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"environment": env, "results": results}, f, indent=2)
+    print(f"Wrote {len(results)} results to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(results, json.load(f), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
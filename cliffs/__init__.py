@@ -0,0 +1,32 @@
+"""Headless Conclusion Cliffs LNY 2026 simulation model.
+
+Importing this package does not import Streamlit. Exports are resolved lazily, so NumPy
+loads on first use and pandas only when a DataFrame is requested (SimResult.to_frame,
+run_simulation).
+"""
+
+import importlib
+
+_EXPORTS = {
+    "CANDLE_OPTIONS": "cliffs.engine",
+    "SimParams": "cliffs.params",
+    "SimResult": "cliffs.core",
+    "compute_multiplier": "cliffs.engine",
+    "qp_bool": "cliffs.params",
+    "qp_int": "cliffs.params",
+    "qp_radio_index": "cliffs.params",
+    "run_simulation": "cliffs.core",
+    "simulate": "cliffs.core",
+    "simulate_settings": "cliffs.engine",
+    "simulate_splits": "cliffs.engine",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'cliffs' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
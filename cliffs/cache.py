@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from cliffs.engine import SIMULATION_KEYS
+
+
+def normalize_setting(value):
+    """Canonical form of a setting so 80, 80.0, "80" and True/1 share a cache key."""
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def simulation_key(settings):
+    """Cache key for the settings that affect the simulation (chart/event-only keys excluded)."""
+    return tuple((key, normalize_setting(settings[key])) for key in SIMULATION_KEYS)
+
+
+class SimulationCache:
+    """Thread-safe LRU cache with an entry cap and an optional time-to-live.
+
+    One instance lives for the whole server process, so every session shares it.
+    """
+
+    def __init__(self, max_entries=256, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, key, default=None):
+        """The cached value for key without counting a hit or miss or refreshing its LRU position."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl and time.monotonic() - entry[0] > self.ttl):
+                return default
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, calling compute() and storing its result on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
+
+
+simulation_cache = SimulationCache(
+    max_entries=int(os.environ.get("CLIFFS_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("CLIFFS_CACHE_TTL", 0)) or None,
+)
@@ -0,0 +1,269 @@
+"""Calibrate the model's drop and cost rates (engine.DEFAULT_RATES) from hunt logs.
+
+Hunt logs are CSV (with a header row) or JSONL, one hunt per row. Columns used:
+
+    phase          writing, noto_postscript, fantasy_writing or fantasy_postscript
+    tier           1 or 2: which tier a writing or Fantasy postscript hunt was
+    multiplier     the drop multiplier the hunt had from candles and CC (default 1)
+    t2_mats        T2 materials dropped
+    t3_mats        T3 materials dropped
+    mallets        mallets dropped
+    mallets_spent  mallets spent (Fantasy writing hunts)
+    short_only     1 if a Fantasy writing hunt was short-only writing, else 0
+    extended       on the last hunt of a Noto postscript: 1 if it was extended, else 0
+
+Other columns are ignored, and each rate uses only the rows that have what it needs.
+Drops are divided by the multiplier to give per-hunt base rates.
+
+Logs are read in fixed-size byte blocks and every block updates running count / mean /
+sum-of-squares accumulators, so memory stays flat however long the log is. The rate
+table records, for every log, the byte offset read up to and a fingerprint of its
+start, so ingesting a log again only reads rows appended since; a log that was replaced
+or truncated is read from the beginning. A last line without a newline is treated as
+still being written and left for the next ingest.
+
+Rates are reported with 95% confidence intervals (normal for means, Wilson for the
+Noto extend share); rates with fewer than MIN_OBSERVATIONS rows keep their default.
+Set CLIFFS_RATES to the table's path to run the simulator on the calibrated rates.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+
+import numpy as np
+
+from cliffs.engine import DEFAULT_RATES
+
+RATE_TABLE_FORMAT = 1
+LOG_FORMATS = ("csv", "jsonl")
+BLOCK_SIZE = 16 * 2**20
+FINGERPRINT_BYTES = 4096
+MIN_OBSERVATIONS = 30
+Z_95 = 1.959963984540054
+
+RATE_LABELS = {
+    "t1_writing_t2": "T2 mats per T1 writing hunt",
+    "t2_writing_t3": "T3 mats per T2 writing hunt",
+    "fantasy_postscript_mats": "Mats per Fantasy postscript hunt",
+    "noto_mallets": "Mallets per Noto postscript hunt",
+    "fantasy_mallets": "Mallets per Fantasy postscript hunt",
+    "noto_extend_probability": "Noto postscript extend chance",
+    "fantasy_writing_mallets": "Mallets per Fantasy writing hunt (med / short)",
+    "fantasy_writing_short_mallets": "Mallets per Fantasy writing hunt (short only)",
+}
+
+
+class RunningMean:
+    """Count, mean and sum of squared deviations of a stream, updated a block at a time."""
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        if values.size:
+            mean = values.mean()
+            self.merge(RunningMean(values.size, mean, float(((values - mean) ** 2).sum())))
+
+    def merge(self, other):
+        """Combine with another accumulator (Chan et al.'s parallel update)."""
+        n = self.n + other.n
+        if n:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta**2 * self.n * other.n / n
+            self.mean += delta * other.n / n
+            self.n = n
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else math.nan
+
+    def to_list(self):
+        return [int(self.n), float(self.mean), float(self.m2)]
+
+
+def _column(frame, name):
+    if name not in frame:
+        return np.full(len(frame), np.nan)
+    import pandas as pd
+
+    return pd.to_numeric(frame[name], errors="coerce").to_numpy(dtype=float)
+
+
+def observations(frame):
+    """Per-hunt observations of every rate in a DataFrame of log rows, as {rate: values}."""
+    if "phase" in frame:
+        phase = frame["phase"].astype(str).str.strip().str.lower().to_numpy()
+    else:
+        phase = np.full(len(frame), "")
+    tier = _column(frame, "tier")
+    multiplier = _column(frame, "multiplier")
+    multiplier = np.where(np.isnan(multiplier), 1.0, multiplier)
+    t2_mats, t3_mats = _column(frame, "t2_mats") / multiplier, _column(frame, "t3_mats") / multiplier
+    mallets = _column(frame, "mallets") / multiplier
+    spent, short_only, extended = (_column(frame, name) for name in ("mallets_spent", "short_only", "extended"))
+
+    writing, noto = phase == "writing", phase == "noto_postscript"
+    fantasy_writing, fantasy = phase == "fantasy_writing", phase == "fantasy_postscript"
+    values = {
+        "t1_writing_t2": t2_mats[writing & (tier == 1)],
+        "t2_writing_t3": t3_mats[writing & (tier == 2)],
+        "fantasy_postscript_mats": np.where(tier == 1, t2_mats, t3_mats)[fantasy & np.isin(tier, (1, 2))],
+        "noto_mallets": mallets[noto],
+        "fantasy_mallets": mallets[fantasy],
+        "noto_extend_probability": extended[noto],
+        "fantasy_writing_mallets": spent[fantasy_writing & (short_only != 1)],
+        "fantasy_writing_short_mallets": spent[fantasy_writing & (short_only == 1)],
+    }
+    return {name: v[np.isfinite(v)] for name, v in values.items()}
+
+
+def _parse_block(data, log_format, header):
+    import pandas as pd
+
+    if log_format == "csv":
+        return pd.read_csv(io.BytesIO(data), header=None, names=header, dtype={"phase": str})
+    return pd.read_json(io.BytesIO(data), lines=True, dtype={"phase": str})
+
+
+def _fingerprint(path, n_bytes):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read(n_bytes)).hexdigest()
+
+
+def new_rate_table():
+    return {"format": RATE_TABLE_FORMAT, "rates": rate_estimates({}), "sources": {}}
+
+
+def load_rate_table(path):
+    """Rate table written by save_rate_table (a new, empty table if path does not exist)."""
+    if not os.path.exists(path):
+        return new_rate_table()
+    with open(path) as f:
+        table = json.load(f)
+    if table.get("format") != RATE_TABLE_FORMAT:
+        raise ValueError(f"{path} is not a version {RATE_TABLE_FORMAT} rate table.")
+    return table
+
+
+def save_rate_table(table, path):
+    """Write the table atomically, so a simulator reading it never sees a partial file."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(table, f, indent=2)
+    os.replace(temporary, path)
+
+
+def ingest_log(path, source=None, log_format="csv", block_size=BLOCK_SIZE, progress=None):
+    """Read the rows of one log not yet covered by source; returns the updated source entry.
+
+    source is the log's entry in a rate table's "sources" (None for a log not seen before).
+    progress, if given, is called with the rows read so far after each block.
+    """
+    size = os.path.getsize(path)
+    resume = (
+        source is not None
+        and source["format"] == log_format
+        and source["offset"] <= size
+        and _fingerprint(path, source["fingerprint_bytes"]) == source["fingerprint"]
+    )
+    if not resume:
+        source = {"format": log_format, "offset": 0, "header": None, "n_rows": 0, "stats": {}}
+    stats = {name: RunningMean(*source["stats"].get(name, ())) for name in DEFAULT_RATES}
+
+    with open(path, "rb") as f:
+        f.seek(source["offset"])
+        offset = source["offset"]
+        if log_format == "csv" and source["header"] is None:
+            line = f.readline()
+            if line.endswith(b"\n"):  # otherwise the header is still being written
+                source["header"] = [name.strip() for name in next(csv.reader([line.decode("utf-8-sig")]))]
+                offset += len(line)
+        readable = log_format != "csv" or source["header"] is not None
+        carry = b""
+        while readable and (block := f.read(block_size)):
+            data = carry + block
+            end = data.rfind(b"\n") + 1
+            carry = data[end:]
+            if not end or not data[:end].strip():
+                offset += end
+                continue
+            frame = _parse_block(data[:end], log_format, source["header"])
+            for name, values in observations(frame).items():
+                stats[name].update(values)
+            source["n_rows"] += len(frame)
+            offset += end
+            if progress:
+                progress(source["n_rows"])
+
+    n_fingerprint = min(FINGERPRINT_BYTES, offset)
+    source.update(
+        offset=offset,
+        fingerprint_bytes=n_fingerprint,
+        fingerprint=_fingerprint(path, n_fingerprint),
+        stats={name: stat.to_list() for name, stat in stats.items()},
+    )
+    return source
+
+
+def log_format_for(path):
+    """jsonl for .jsonl / .ndjson / .json logs, csv otherwise."""
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson", ".json") else "csv"
+
+
+def rate_estimates(stats, min_observations=MIN_OBSERVATIONS):
+    """Rate table rows from {rate: RunningMean}: estimate, 95% interval, n, default, calibrated."""
+    rates = {}
+    for name, default in DEFAULT_RATES.items():
+        stat = stats.get(name) or RunningMean()
+        low = high = None
+        if name == "noto_extend_probability":
+            # Bernoulli share of extended postscripts, with a Wilson interval. The model rolls
+            # the extend chance once per Noto postscript, so the share is the chance itself.
+            if stat.n:
+                q, n, z = stat.mean, stat.n, Z_95
+                centre = (q + z**2 / (2 * n)) / (1 + z**2 / n)
+                half = z * math.sqrt(q * (1 - q) / n + z**2 / (4 * n**2)) / (1 + z**2 / n)
+                low, high = max(centre - half, 0.0), min(centre + half, 1.0)
+            observed = min(max(stat.mean, 0.0), 1.0) if stat.n else None
+        else:
+            if stat.n > 1:
+                half = Z_95 * math.sqrt(stat.variance / stat.n)
+                low, high = stat.mean - half, stat.mean + half
+            observed = stat.mean if stat.n else None
+        calibrated = stat.n >= min_observations
+        rates[name] = {
+            "estimate": float(observed) if calibrated else default,
+            "low": None if low is None else float(low),
+            "high": None if high is None else float(high),
+            "n": stat.n,
+            "default": default,
+            "calibrated": calibrated,
+        }
+    return rates
+
+
+def calibrate(paths, table=None, log_format=None, block_size=BLOCK_SIZE, min_observations=MIN_OBSERVATIONS,
+              progress=None):
+    """Ingest the new rows of each log into table (a new one if None) and refit its rates."""
+    table = table or new_rate_table()
+    for path in paths:
+        key = os.path.abspath(path)
+        report = progress and (lambda n_rows, path=path: progress(path, n_rows))
+        table["sources"][key] = ingest_log(
+            path, table["sources"].get(key), log_format or log_format_for(path), block_size, report
+        )
+
+    totals = {name: RunningMean() for name in DEFAULT_RATES}
+    for source in table["sources"].values():
+        for name, state in source["stats"].items():
+            if name in totals:
+                totals[name].merge(RunningMean(*state))
+    table["rates"] = rate_estimates(totals, min_observations)
+    return table
@@ -0,0 +1,336 @@
+"""Command-line entry point: python -m cliffs batch INPUT -o OUTPUT.
+
+Input records use the saved-URL keys (t1w, t2w, ccw, cw, ... hpd) and may be JSONL, CSV
+or one query string / bookmark URL per line. Records are streamed through the simulator
+in chunks on a process pool, and results are appended to the output as each chunk
+finishes, so memory stays flat however large the input is.
+
+python -m cliffs calibrate LOG [LOG ...] -o rates.json fits the model's rates to hunt
+logs (see cliffs.calibration), reading only rows added since the table was last written.
+
+python -m cliffs rules RULES.json [RULES.json ...] --settings INPUT -o OUTPUT evaluates
+every input record under every rule set in one vectorized pass per chunk (see
+cliffs.rules), one output row per record and rule set.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from collections import deque
+from contextlib import ExitStack
+from multiprocessing import Pool
+from urllib.parse import parse_qsl, urlsplit
+
+from cliffs.calibration import (
+    BLOCK_SIZE,
+    LOG_FORMATS,
+    MIN_OBSERVATIONS,
+    RATE_LABELS,
+    calibrate,
+    load_rate_table,
+    save_rate_table,
+)
+from cliffs.core import CONSTRAINT_LABELS, summarize
+from cliffs.engine import N_SPLITS, cycle_hunts, load_rule_set, simulate_settings
+from cliffs.export import CHUNK_WRITERS, EXPORT_FORMATS, available_formats
+from cliffs.params import settings_from_queries
+from cliffs.rules import compile_rule_sets, evaluate_rule_sets
+
+INPUT_FORMATS = ("jsonl", "csv", "query")
+OUTPUT_FORMATS = tuple(EXPORT_FORMATS)
+ID_KEYS = ("id", "name", "player")
+
+OUTPUT_FIELDS = [
+    "id",
+    "best_t1_fantasy_hunts",
+    "best_t2_fantasy_hunts",
+    "max_cycles",
+    "binding_constraint",
+    "effective_cycles",
+    "required_cycles",
+    "cycle_deficit",
+    "n_cc_used",
+]
+RULES_OUTPUT_FIELDS = ["id", "rule_set"] + OUTPUT_FIELDS[1:]
+
+
+def _query_value(value):
+    """Saved-URL string form of a JSON/CSV value (booleans become 1/0)."""
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _parse_query_line(line):
+    """Query dict from a bare query string or a full bookmark URL."""
+    line = line.strip()
+    if "://" in line or line.startswith("/"):
+        line = urlsplit(line).query
+    return dict(parse_qsl(line.lstrip("?")))
+
+
+def read_records(lines, input_format, fieldnames=None):
+    """Yield one query-param dict per input line (CSV lines need fieldnames or a header line)."""
+    if input_format == "jsonl":
+        for line in lines:
+            if line.strip():
+                yield {key: _query_value(value) for key, value in json.loads(line).items()}
+    elif input_format == "csv":
+        for row in csv.DictReader(lines, fieldnames=fieldnames):
+            yield {key: value for key, value in row.items() if value not in (None, "")}
+    else:
+        for line in lines:
+            if line.strip() and not line.lstrip().startswith("#"):
+                yield _parse_query_line(line)
+
+
+def _record_chunks(stream, input_format, chunk_size):
+    """Split the input into chunks of records: parsed rows for CSV, raw lines otherwise.
+
+    CSV is parsed here, so a quoted field may span lines; the workers build the query dicts.
+    """
+    if input_format == "csv":
+        reader = csv.reader(stream)
+        fieldnames = next(reader, [])
+        items = (row for row in reader if row)
+    else:
+        fieldnames = None
+        items = (line for line in stream if line.strip())
+    for i, chunk in enumerate(iter(lambda: list(itertools.islice(items, chunk_size)), [])):
+        yield i * chunk_size, chunk, fieldnames
+
+
+def chunk_records(items, input_format, fieldnames=None):
+    """Query-param dicts of one _record_chunks chunk."""
+    if input_format == "csv":
+        return [{key: value for key, value in zip(fieldnames, row) if value != ""} for row in items]
+    return list(read_records(items, input_format))
+
+
+def evaluate_records(records, remaining_days=None):
+    """Simulate a chunk of records in one batched pass and return output columns."""
+    batch = settings_from_queries(records)
+    columns, _, required_cycles = simulate_settings(batch)
+    n_cycles_time = None
+    if remaining_days is not None:
+        n_cycles_time = remaining_days * batch["hpd"] / cycle_hunts(batch["t1w"], batch["t2w"])
+    summary = summarize(columns, required_cycles, n_cycles_time)
+
+    ids = [next((record[key] for key in ID_KEYS if key in record), None) for record in records]
+    return {
+        "id": ids,
+        "best_t1_fantasy_hunts": (N_SPLITS - 1 - summary["best_split"]).tolist(),
+        "best_t2_fantasy_hunts": summary["best_split"].tolist(),
+        "max_cycles": summary["max_cycles"].tolist(),
+        "binding_constraint": [CONSTRAINT_LABELS[i] for i in summary["binding"]],
+        "effective_cycles": summary["effective_cycles"].tolist(),
+        "required_cycles": required_cycles.tolist(),
+        "cycle_deficit": summary["cycle_deficit"].tolist(),
+        "n_cc_used": summary["n_cc_used"].tolist(),
+    }
+
+
+def compare_records(records, compiled, remaining_days=None):
+    """Evaluate a chunk of records under every compiled rule set; rows are grouped by record."""
+    summary = evaluate_rule_sets(settings_from_queries(records), compiled, remaining_days)
+    names = compiled["names"]
+    n_fantasy_hunts = compiled["valid"].sum(axis=1) - 1
+
+    def by_record(values):
+        return values.T.ravel().tolist()
+
+    ids = [next((record[key] for key in ID_KEYS if key in record), None) for record in records]
+    return {
+        "id": [value for value in ids for _ in names],
+        "rule_set": names * len(records),
+        "best_t1_fantasy_hunts": by_record(n_fantasy_hunts[:, None] - summary["best_split"]),
+        "best_t2_fantasy_hunts": by_record(summary["best_split"]),
+        "max_cycles": by_record(summary["max_cycles"]),
+        "binding_constraint": [CONSTRAINT_LABELS[i] for i in by_record(summary["binding"])],
+        "effective_cycles": by_record(summary["effective_cycles"]),
+        "required_cycles": by_record(summary["required_cycles"]),
+        "cycle_deficit": by_record(summary["cycle_deficit"]),
+        "n_cc_used": by_record(summary["n_cc_used"]),
+    }
+
+
+def _evaluate_chunk(task):
+    start, items, input_format, fieldnames, remaining_days = task
+    result = evaluate_records(chunk_records(items, input_format, fieldnames), remaining_days)
+    # Records without an id column are numbered by their position in the input.
+    result["id"] = [str(start + i) if value is None else value for i, value in enumerate(result["id"])]
+    return result
+
+
+def _guess_format(path, formats, default):
+    suffix = os.path.splitext(path)[1].lstrip(".").lower()
+    aliases = {
+        "ndjson": "jsonl", "json": "jsonl", "pq": "parquet", "feather": "arrow", "ipc": "arrow",
+        "txt": "query", "urls": "query",
+    }
+    suffix = aliases.get(suffix, suffix)
+    return suffix if suffix in formats else default
+
+
+def _bounded_imap(pool, tasks, max_in_flight):
+    """Ordered pool.imap that keeps at most max_in_flight chunks queued, so input is read lazily."""
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(_evaluate_chunk, (task,)))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def run_batch(args):
+    input_format = args.input_format or _guess_format(args.input, INPUT_FORMATS, "query")
+    output_format = args.output_format or _guess_format(args.output, OUTPUT_FORMATS, "csv")
+    if output_format not in available_formats():
+        raise SystemExit(f"{output_format} output requires pyarrow (pip install pyarrow).")
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    writer = CHUNK_WRITERS[output_format](output, OUTPUT_FIELDS)
+    stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+
+    tasks = (
+        (start, items, input_format, fieldnames, args.remaining_days)
+        for start, items, fieldnames in _record_chunks(stream, input_format, args.chunk_size)
+    )
+
+    n_done = 0
+    try:
+        with ExitStack() as stack:
+            if args.workers == 1:
+                results = map(_evaluate_chunk, tasks)
+            else:
+                pool = stack.enter_context(Pool(args.workers))
+                results = _bounded_imap(pool, tasks, 2 * args.workers)
+            for result in results:
+                writer.write(result)
+                n_done += len(result["id"])
+                if args.progress:
+                    print(f"{n_done} records", file=sys.stderr)
+    finally:
+        writer.close()
+        if output is not sys.stdout.buffer:
+            output.close()
+        if stream is not sys.stdin:
+            stream.close()
+    print(f"Wrote {n_done} results to {args.output}", file=sys.stderr)
+
+
+def run_calibrate(args):
+    table = load_rate_table(args.output)
+    report = (lambda path, n_rows: print(f"{path}: {n_rows} rows", file=sys.stderr)) if args.progress else None
+    table = calibrate(
+        args.logs, table, args.input_format, int(args.block_mb * 2**20), args.min_observations, report
+    )
+    save_rate_table(table, args.output)
+
+    n_rows = sum(source["n_rows"] for source in table["sources"].values())
+    print(f"{'rate':<48} {'default':>8} {'estimate':>9} {'95% CI':>19} {'n':>10}", file=sys.stderr)
+    for name, rate in table["rates"].items():
+        interval = f"{rate['low']:.3f} - {rate['high']:.3f}" if rate["low"] is not None else "—"
+        estimate = f"{rate['estimate']:.3f}" + ("" if rate["calibrated"] else "*")
+        print(
+            f"{RATE_LABELS[name]:<48} {rate['default']:>8.3f} {estimate:>9} {interval:>19} {rate['n']:>10}",
+            file=sys.stderr,
+        )
+    print(
+        f"Wrote {args.output} from {n_rows} rows in {len(table['sources'])} logs "
+        f"(* = default kept, fewer than {args.min_observations} observations)",
+        file=sys.stderr,
+    )
+
+
+def run_rules(args):
+    compiled = compile_rule_sets([load_rule_set(path) for path in args.rule_sets])
+    input_format = args.input_format or _guess_format(args.settings, INPUT_FORMATS, "query")
+    output_format = args.output_format or _guess_format(args.output, OUTPUT_FORMATS, "csv")
+    if output_format not in available_formats():
+        raise SystemExit(f"{output_format} output requires pyarrow (pip install pyarrow).")
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    writer = CHUNK_WRITERS[output_format](output, RULES_OUTPUT_FIELDS)
+    stream = sys.stdin if args.settings == "-" else open(args.settings, newline="")
+
+    n_done = 0
+    try:
+        for start, items, fieldnames in _record_chunks(stream, input_format, args.chunk_size):
+            result = compare_records(chunk_records(items, input_format, fieldnames), compiled, args.remaining_days)
+            n_rows = len(result["id"]) // len(compiled["names"])
+            result["id"] = [
+                str(start + i // len(compiled["names"])) if value is None else value
+                for i, value in enumerate(result["id"])
+            ]
+            writer.write(result)
+            n_done += n_rows
+    finally:
+        writer.close()
+        if output is not sys.stdout.buffer:
+            output.close()
+        if stream is not sys.stdin:
+            stream.close()
+    print(f"Wrote {n_done} records x {len(compiled['names'])} rule sets to {args.output}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cliffs", description="Cliffs LNY 2026 simulator tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Simulate many saved-URL configurations.")
+    batch.add_argument("input", help="JSONL, CSV or query-string file ('-' for stdin).")
+    batch.add_argument("-o", "--output", required=True, help="Output path ('-' for stdout).")
+    batch.add_argument("--input-format", choices=INPUT_FORMATS, help="Default: from the file extension.")
+    batch.add_argument("--output-format", choices=OUTPUT_FORMATS, help="Default: from the file extension.")
+    batch.add_argument("--chunk-size", type=int, default=2000, help="Records per batched simulation.")
+    batch.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    batch.add_argument(
+        "--remaining-days",
+        type=float,
+        help="Include the time constraint for this many remaining event days (uses each record's hpd).",
+    )
+    batch.add_argument("--progress", action="store_true", help="Report progress on stderr.")
+    batch.set_defaults(handler=run_batch)
+
+    calibrate_parser = commands.add_parser("calibrate", help="Fit the model's drop and cost rates to hunt logs.")
+    calibrate_parser.add_argument("logs", nargs="+", help="CSV or JSONL hunt logs.")
+    calibrate_parser.add_argument(
+        "-o", "--output", default="rates.json", help="Rate table to update (created if missing; default rates.json)."
+    )
+    calibrate_parser.add_argument("--input-format", choices=LOG_FORMATS, help="Default: from each file's extension.")
+    calibrate_parser.add_argument(
+        "--block-mb", type=float, default=BLOCK_SIZE / 2**20, help="Bytes of log read and parsed at a time, in MiB."
+    )
+    calibrate_parser.add_argument(
+        "--min-observations", type=int, default=MIN_OBSERVATIONS, help="Rows a rate needs to replace its default."
+    )
+    calibrate_parser.add_argument("--progress", action="store_true", help="Report progress on stderr.")
+    calibrate_parser.set_defaults(handler=run_calibrate)
+
+    rules_parser = commands.add_parser("rules", help="Compare rule sets over many saved-URL configurations.")
+    rules_parser.add_argument("rule_sets", nargs="+", help="Rule-set files (see cliffs/rulesets/lny_2026.json).")
+    rules_parser.add_argument(
+        "--settings", required=True, help="JSONL, CSV or query-string file of configurations ('-' for stdin)."
+    )
+    rules_parser.add_argument("-o", "--output", required=True, help="Output path ('-' for stdout).")
+    rules_parser.add_argument("--input-format", choices=INPUT_FORMATS, help="Default: from the file extension.")
+    rules_parser.add_argument("--output-format", choices=OUTPUT_FORMATS, help="Default: from the file extension.")
+    rules_parser.add_argument("--chunk-size", type=int, default=2000, help="Records per vectorized evaluation.")
+    rules_parser.add_argument(
+        "--remaining-days",
+        type=float,
+        help="Include the time constraint for this many remaining event days (uses each record's hpd).",
+    )
+    rules_parser.set_defaults(handler=run_rules)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
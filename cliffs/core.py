@@ -0,0 +1,170 @@
+import numpy as np
+
+from cliffs.engine import N_SPLITS, SPLIT_COLUMNS, UNCONSTRAINED, simulate_settings, simulate_splits
+from cliffs.params import SimParams
+
+CONSTRAINT_LABELS = ("T2 Materials", "T3 Materials", "Mallets", "Time", "Unconstrained")
+# Binding index when no limit runs out: every resource is UNCONSTRAINED and time is not counted.
+NO_BINDING = 4
+
+
+# Fields of SimResult.table: the simulate_splits columns plus the derived cycle limits.
+RESULT_COLUMNS = SPLIT_COLUMNS + ["max_cycles_mats", "max_cycles"]
+
+
+class SimResult:
+    """All 14 Fantasy splits for one configuration, held in one read-only structured array.
+
+    table has one record per split and one field per RESULT_COLUMNS entry (about 2 KB).
+    Columns and rows are views into it; a pandas DataFrame is only built by to_frame.
+    Results are shared between sessions through the simulation cache, so they are immutable.
+    """
+
+    __slots__ = ("table", "n_diamonds_per_cycle", "required_cycles")
+
+    def __init__(self, table, n_diamonds_per_cycle, required_cycles):
+        table.flags.writeable = False
+        self.table = table
+        self.n_diamonds_per_cycle = n_diamonds_per_cycle
+        self.required_cycles = required_cycles
+
+    @classmethod
+    def from_columns(cls, columns, n_diamonds_per_cycle, required_cycles):
+        """Pack one configuration's simulate_splits output, keeping each column's dtype."""
+        dtype = [(name, np.asarray(columns[name]).dtype) for name in SPLIT_COLUMNS]
+        dtype += [("max_cycles_mats", np.float64), ("max_cycles", np.float64)]
+        table = np.empty(N_SPLITS, dtype=dtype)
+        for name in SPLIT_COLUMNS:
+            table[name] = columns[name]
+        table["max_cycles_mats"] = np.minimum(table["n_cycles_t2"], table["n_cycles_t3"])
+        table["max_cycles"] = np.minimum(table["max_cycles_mats"], table["n_cycles_mallets"])
+        return cls(table, float(n_diamonds_per_cycle), float(required_cycles))
+
+    @property
+    def columns(self):
+        return {name: self.table[name] for name in SPLIT_COLUMNS}
+
+    @property
+    def max_cycles_mats(self):
+        """Cycles allowed by T2 and T3 materials alone (what the optimal split maximizes)."""
+        return self.table["max_cycles_mats"]
+
+    @property
+    def max_cycles(self):
+        return self.table["max_cycles"]
+
+    @property
+    def best_index(self):
+        """Index of the Fantasy split with the most material-constrained cycles."""
+        return int(np.argmax(self.max_cycles_mats))
+
+    @property
+    def best_row(self):
+        """The optimal split's record; fields are read like a row, e.g. best_row["max_cycles"]."""
+        return self.table[self.best_index]
+
+    def to_frame(self):
+        """Simulation table with derived columns, as a pandas DataFrame."""
+        import pandas as pd
+
+        return pd.DataFrame(self.table)
+
+
+def binding_index(limits):
+    """Index into CONSTRAINT_LABELS of the smallest limit along the last axis.
+
+    Limits are T2, T3, mallets and time cycles in that order. When every one is at least
+    UNCONSTRAINED nothing runs out, so the index is NO_BINDING, not the first of the tie.
+    """
+    limits = np.asarray(limits)
+    return np.where(np.all(limits >= UNCONSTRAINED, axis=-1), NO_BINDING, np.argmin(limits, axis=-1))
+
+
+def summarize(columns, required_cycles, n_cycles_time=None):
+    """Best split and binding constraint for every configuration in a simulate_splits batch.
+
+    The best split maximizes material-constrained cycles, as on the Simulator page. The
+    binding constraint indexes CONSTRAINT_LABELS (see binding_index); time only competes
+    when n_cycles_time is given.
+    """
+    max_cycles_mats = np.minimum(columns["n_cycles_t2"], columns["n_cycles_t3"])
+    best = np.argmax(max_cycles_mats, axis=-1)
+
+    def at_best(values):
+        return np.take_along_axis(values, best[..., np.newaxis], axis=-1)[..., 0]
+
+    time_limit = np.inf if n_cycles_time is None else n_cycles_time
+    limits = np.stack(
+        np.broadcast_arrays(
+            at_best(columns["n_cycles_t2"]),
+            at_best(columns["n_cycles_t3"]),
+            at_best(columns["n_cycles_mallets"]),
+            time_limit,
+        ),
+        axis=-1,
+    )
+    effective_cycles = limits.min(axis=-1)
+    return {
+        "best_split": best,
+        "max_cycles": limits[..., :3].min(axis=-1),
+        "binding": binding_index(limits),
+        "effective_cycles": effective_cycles,
+        "n_cc_used": at_best(columns["n_cc_used"]),
+        "cycle_deficit": np.clip(required_cycles - effective_cycles, 0, None),
+    }
+
+
+def simulate(params: SimParams) -> SimResult:
+    """Simulate every Fantasy split for one set of sidebar params."""
+    columns, n_diamonds_per_cycle, required_cycles = simulate_settings(params.to_settings())
+    return SimResult.from_columns(columns, n_diamonds_per_cycle, required_cycles)
+
+
+def run_simulation(
+    n_hunts_t1_writing,
+    n_hunts_t2_writing,
+    writing_multiplier,
+    cc_writing,
+    n_hunts_t3_noto_postscript,
+    bk,
+    noto_postscript_multiplier,
+    cc_noto,
+    fantasy_postscript_multiplier,
+    fantasy_diamond_multiplier,
+    cc_fantasy,
+    n_t2_mats,
+    n_t3_mats,
+    required_diamonds,
+    available_diamonds,
+    n_mallets,
+    noto_break_block,
+    fantasy_postscript_break_block,
+    fantasy_writing_short_only,
+    fantasy_postscript_extend,
+):
+    """Simulate all 14 Fantasy splits for one configuration (wraps simulate_splits)."""
+    import pandas as pd
+
+    columns, n_diamonds_per_cycle, required_cycles = simulate_splits(
+        n_hunts_t1_writing,
+        n_hunts_t2_writing,
+        writing_multiplier,
+        cc_writing,
+        n_hunts_t3_noto_postscript,
+        bk,
+        noto_postscript_multiplier,
+        cc_noto,
+        fantasy_postscript_multiplier,
+        fantasy_diamond_multiplier,
+        cc_fantasy,
+        n_t2_mats,
+        n_t3_mats,
+        required_diamonds,
+        available_diamonds,
+        n_mallets,
+        noto_break_block,
+        fantasy_postscript_break_block,
+        fantasy_writing_short_only,
+        fantasy_postscript_extend,
+    )
+    return pd.DataFrame(columns, columns=SPLIT_COLUMNS), n_diamonds_per_cycle.item(), required_cycles.item()
@@ -0,0 +1,484 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+CANDLE_OPTIONS = ["None", "White Candle", "Red Candle"]
+UNCONSTRAINED = 999
+
+# Game rules of the event, read from a versioned rule-set file. CLIFFS_RULES points the
+# models at another file (a future event or rebalanced rules); cliffs.rules compiles rule
+# sets into coefficient matrices to compare many of them at once.
+RULE_SET_FORMAT = 1
+RULE_KEYS = (
+    "t2_mats_per_hunt",  # T2 materials a T2 hunt (writing or Fantasy postscript) costs
+    "t3_mats_per_noto_hunt",  # T3 materials a Noto charging hunt costs before Baitkeep
+    "baitkeep_rate",  # Baitkeep divides the T3 cost by 1 + baitkeep_rate
+    "noto_postscript_hunts",  # Noto postscript hunts, not extended
+    "noto_extended_postscript_hunts",  # Noto postscript hunts when extended
+    "fantasy_postscript_hunts",  # Fantasy postscript hunts, split between T1 and T2
+    "fantasy_writing_hunts",  # Fantasy writing hunts that cost mallets
+    "diamonds_per_cycle",  # diamonds a cycle earns before the Fantasy candle
+    "cc_bonus",  # drop multiplier added by Condensed Creativity
+    "white_candle_bonus",  # drop multiplier added by a White Candle
+    "red_candle_bonus",  # drop multiplier added by a Red Candle
+    "white_candle_diamond_bonus",  # diamond multiplier added by a White Candle in Fantasy
+    "red_candle_diamond_bonus",  # diamond multiplier added by a Red Candle in Fantasy
+    "noto_writing_mallets",  # mallets spent in Noto writing
+    "break_block_mallets",  # mallets a Noto or Fantasy postscript break block costs
+    "extend_mallets",  # mallets a Noto or Fantasy postscript extension costs
+)
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "rulesets", "lny_2026.json")
+
+# Drop and cost rates of the model (per hunt, before multipliers). These are the
+# hand-entered estimates; `python -m cliffs calibrate` fits them to hunt logs, and
+# pointing CLIFFS_RATES at its rate table makes every model here use the fitted values.
+DEFAULT_RATES = {
+    "t1_writing_t2": 1.5,  # T2 materials per T1 writing hunt
+    "t2_writing_t3": 1.2,  # T3 materials per T2 writing hunt
+    "fantasy_postscript_mats": 3,  # T2 (T1 hunt) or T3 (T2 hunt) materials per Fantasy postscript hunt
+    "noto_mallets": 0.6,  # mallets per Noto postscript hunt
+    "fantasy_mallets": 2.5,  # mallets per Fantasy postscript hunt
+    "noto_extend_probability": 0.2,  # Noto postscript extend chance, against NO_EXTEND_PROBABILITY
+    "fantasy_writing_mallets": 5.18,  # mallets per Fantasy writing hunt (med / short)
+    "fantasy_writing_short_mallets": 12.52,  # mallets per Fantasy writing hunt (short only)
+}
+
+
+def load_rule_set(path=DEFAULT_RULES_PATH):
+    """Rule-set file: format, name, version, event_end_utc, every RULE_KEYS entry under "rules" and optional "rates".
+
+    "rates" overrides DEFAULT_RATES entries for events whose drops differ; they take
+    precedence over a calibrated rate table.
+    """
+    with open(path) as f:
+        rule_set = json.load(f)
+    if rule_set.get("format") != RULE_SET_FORMAT:
+        raise ValueError(f"{path} is not a version {RULE_SET_FORMAT} rule set.")
+    rules = rule_set.get("rules", {})
+    missing = [key for key in RULE_KEYS if key not in rules]
+    unknown = [key for key in rules if key not in RULE_KEYS] + [
+        key for key in rule_set.get("rates", {}) if key not in DEFAULT_RATES
+    ]
+    if missing or unknown:
+        raise ValueError(f"{path}: missing rules {missing}, unknown rules or rates {unknown}.")
+    try:
+        event_end = datetime.fromisoformat(rule_set["event_end_utc"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"{path}: event_end_utc must be an ISO 8601 time, e.g. 2026-02-24T16:00:00Z.") from None
+    if event_end.tzinfo is None:
+        raise ValueError(f"{path}: event_end_utc needs a time zone (Z for UTC).")
+    rule_set.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    rule_set.setdefault("version", 1)
+    rule_set.setdefault("rates", {})
+    return rule_set
+
+
+def load_rates(path=None):
+    """DEFAULT_RATES with the estimates of a calibrated rate table (see cliffs.calibration) applied."""
+    rates = dict(DEFAULT_RATES)
+    if path:
+        with open(path) as f:
+            table = json.load(f)
+        rates.update({name: row["estimate"] for name, row in table["rates"].items() if name in rates})
+    return rates
+
+
+RULES_PATH = os.environ.get("CLIFFS_RULES") or DEFAULT_RULES_PATH
+RULE_SET = load_rule_set(RULES_PATH)
+RULES = RULE_SET["rules"]
+EVENT_END_UTC = RULE_SET["event_end_utc"]
+EVENT_END = datetime.fromisoformat(EVENT_END_UTC).astimezone(timezone.utc)
+T2_MATS_PER_HUNT = RULES["t2_mats_per_hunt"]
+T3_MATS_PER_NOTO_HUNT = RULES["t3_mats_per_noto_hunt"]
+BAITKEEP_RATE = RULES["baitkeep_rate"]
+NOTO_POSTSCRIPT_HUNTS = RULES["noto_postscript_hunts"]
+NOTO_EXTENDED_POSTSCRIPT_HUNTS = RULES["noto_extended_postscript_hunts"]
+FANTASY_POSTSCRIPT_HUNTS = RULES["fantasy_postscript_hunts"]
+FANTASY_WRITING_HUNTS = RULES["fantasy_writing_hunts"]
+DIAMONDS_PER_CYCLE = RULES["diamonds_per_cycle"]
+CC_BONUS = RULES["cc_bonus"]
+WHITE_CANDLE_BONUS = RULES["white_candle_bonus"]
+RED_CANDLE_BONUS = RULES["red_candle_bonus"]
+WHITE_CANDLE_DIAMOND_BONUS = RULES["white_candle_diamond_bonus"]
+RED_CANDLE_DIAMOND_BONUS = RULES["red_candle_diamond_bonus"]
+NOTO_WRITING_MALLETS = RULES["noto_writing_mallets"]
+BREAK_BLOCK_MALLETS = RULES["break_block_mallets"]
+EXTEND_MALLETS = RULES["extend_mallets"]
+
+N_SPLITS = FANTASY_POSTSCRIPT_HUNTS + 1  # Fantasy postscript T2 hunts: 0..13
+POSTSCRIPT_HUNTS = NOTO_POSTSCRIPT_HUNTS + FANTASY_POSTSCRIPT_HUNTS  # a cycle's hunts besides writing
+
+RATES_PATH = os.environ.get("CLIFFS_RATES")
+RATES = {**load_rates(RATES_PATH), **RULE_SET["rates"]}
+T1_WRITING_T2_RATE = RATES["t1_writing_t2"]
+T2_WRITING_T3_RATE = RATES["t2_writing_t3"]
+FANTASY_POSTSCRIPT_RATE = RATES["fantasy_postscript_mats"]
+NOTO_MALLET_RATE = RATES["noto_mallets"]
+FANTASY_MALLET_RATE = RATES["fantasy_mallets"]
+
+# Expected-value assumptions of the mallet model.
+NOTO_EXTEND_PS_PROBABILITY = RATES["noto_extend_probability"]
+NO_EXTEND_PROBABILITY = 0.5
+FANTASY_WRITING_MALLETS = RATES["fantasy_writing_mallets"]
+FANTASY_WRITING_SHORT_MALLETS = RATES["fantasy_writing_short_mallets"]
+
+# Saved-URL settings keys that feed the simulation (chart and event settings excluded).
+SIMULATION_KEYS = (
+    "t1w", "t2w", "ccw", "cw", "t3n", "bk", "ccn", "cn", "ccf", "cf",
+    "t2m", "t3m", "rd", "ad", "mal", "nbb", "fbb", "fws", "fpe",
+)
+
+# Values of each discrete setting; together they index COEFFICIENT_INDEX (3^3 * 2^8 = 6912 rows).
+DISCRETE_CHOICES = {
+    "cw": (0, 1, 2),
+    "cn": (0, 1, 2),
+    "cf": (0, 1, 2),
+    "ccw": (0, 1),
+    "ccn": (0, 1),
+    "ccf": (0, 1),
+    "bk": (0, 1),
+    "nbb": (0, 1),
+    "fbb": (0, 1),
+    "fws": (0, 1),
+    "fpe": (0, 1),
+}
+DISCRETE_SHAPE = tuple(len(choices) for choices in DISCRETE_CHOICES.values())
+
+SPLIT_COLUMNS = [
+    "n_hunts_t1_fantasy_postscript",
+    "n_hunts_t2_fantasy_postscript",
+    "n_hunts_t2_writing",
+    "n_hunts_t2_total",
+    "t2_mats_used",
+    "t2_mats_farmed",
+    "net_t2_mats",
+    "n_cycles_t2",
+    "n_hunts_t3_total",
+    "t3_mats_used",
+    "t3_mats_farmed",
+    "net_t3_mats",
+    "n_cycles_t3",
+    "mallets_used",
+    "mallets_farmed",
+    "net_mallets",
+    "n_cycles_mallets",
+    "n_cc_used",
+]
+
+
+def compute_multiplier(cc, white_candle, red_candle):
+    return 1 + (CC_BONUS * cc + WHITE_CANDLE_BONUS * white_candle + RED_CANDLE_BONUS * red_candle)
+
+
+def compute_diamond_multiplier(white_candle, red_candle):
+    return 1 + (WHITE_CANDLE_DIAMOND_BONUS * white_candle + RED_CANDLE_DIAMOND_BONUS * red_candle)
+
+
+def average_noto_ps_hunts():
+    """Expected Noto postscript length: 13 hunts when extended, otherwise 10."""
+    no_extend_prob = NO_EXTEND_PROBABILITY
+    noto_extend_ps_probability = NOTO_EXTEND_PS_PROBABILITY
+    return (
+        (no_extend_prob / (no_extend_prob + noto_extend_ps_probability)) * NOTO_POSTSCRIPT_HUNTS
+        + (noto_extend_ps_probability / (no_extend_prob + noto_extend_ps_probability)) * NOTO_EXTENDED_POSTSCRIPT_HUNTS
+    )
+
+
+def cycle_hunts(n_hunts_t1_writing, n_hunts_t2_writing):
+    """Hunts in one cycle for a writing allocation (143 at the 80 / 40 default).
+
+    The only cycle length in the model: the time constraint, the event plan, the roster
+    and the stepped engine's partial cycles all convert hunts to cycles with it.
+    """
+    return n_hunts_t1_writing + n_hunts_t2_writing + POSTSCRIPT_HUNTS
+
+
+def _split_axis(value):
+    """Add a trailing length-1 axis so a batch input broadcasts against the splits."""
+    return np.asarray(value)[..., np.newaxis]
+
+
+def cycles_until_empty(stock, net):
+    """Cycles a stockpile lasts at a given net change per cycle (999 if not drawn down)."""
+    drawn_down = net < 0
+    return np.where(drawn_down, stock / np.where(drawn_down, -net, 1), UNCONSTRAINED)
+
+
+def simulate_splits(
+    n_hunts_t1_writing,
+    n_hunts_t2_writing,
+    writing_multiplier,
+    cc_writing,
+    n_hunts_t3_noto_postscript,
+    bk,
+    noto_postscript_multiplier,
+    cc_noto,
+    fantasy_postscript_multiplier,
+    fantasy_diamond_multiplier,
+    cc_fantasy,
+    n_t2_mats,
+    n_t3_mats,
+    required_diamonds,
+    available_diamonds,
+    n_mallets,
+    noto_break_block,
+    fantasy_postscript_break_block,
+    fantasy_writing_short_only,
+    fantasy_postscript_extend,
+):
+    """Array version of run_simulation covering all 14 Fantasy splits in one pass.
+
+    Every argument may be a scalar or an array; arrays broadcast against each other as a
+    leading batch shape, and the split axis is appended last. Returns a dict of
+    SPLIT_COLUMNS arrays shaped (*batch, 14), plus n_diamonds_per_cycle and
+    required_cycles shaped (*batch,).
+    """
+    fantasy_t2_mats, fantasy_t3_mats = fantasy_farming(fantasy_postscript_multiplier)
+    return _evaluate(
+        n_hunts_t1_writing,
+        n_hunts_t2_writing,
+        n_hunts_t3_noto_postscript,
+        writing_multiplier,
+        baitkeep_discount(bk),
+        fantasy_t2_mats,
+        fantasy_t3_mats,
+        mallet_spend(noto_break_block, fantasy_postscript_break_block, fantasy_writing_short_only, fantasy_postscript_extend),
+        mallet_farming(noto_postscript_multiplier, fantasy_postscript_multiplier),
+        cc_writing,
+        cc_noto,
+        cc_fantasy,
+        DIAMONDS_PER_CYCLE * np.asarray(fantasy_diamond_multiplier),
+        n_t2_mats,
+        n_t3_mats,
+        required_diamonds,
+        available_diamonds,
+        n_mallets,
+    )
+
+
+def fantasy_farming(fantasy_postscript_multiplier):
+    """T2 and T3 materials farmed in the Fantasy postscript for each split, shaped (*batch, 14)."""
+    n_hunts_t2_fantasy_postscript = np.arange(N_SPLITS)
+    n_hunts_t1_fantasy_postscript = FANTASY_POSTSCRIPT_HUNTS - n_hunts_t2_fantasy_postscript
+    fm = _split_axis(fantasy_postscript_multiplier)
+    return (
+        n_hunts_t1_fantasy_postscript * FANTASY_POSTSCRIPT_RATE * fm,
+        n_hunts_t2_fantasy_postscript * FANTASY_POSTSCRIPT_RATE * fm,
+    )
+
+
+def baitkeep_discount(bk):
+    """Fraction of the T3 materials a Noto charging hunt costs with Baitkeep."""
+    return 1 / (1 + (np.asarray(bk) * BAITKEEP_RATE))
+
+
+def mallet_spend(noto_break_block, fantasy_postscript_break_block, fantasy_writing_short_only, fantasy_postscript_extend):
+    """Expected mallets spent per cycle for the four mallet strategies."""
+    noto_extend_ps_probability = NOTO_EXTEND_PS_PROBABILITY
+    return (
+        np.asarray(noto_break_block) * BREAK_BLOCK_MALLETS
+        + NOTO_WRITING_MALLETS
+        + noto_extend_ps_probability * EXTEND_MALLETS
+        + np.asarray(fantasy_postscript_break_block) * BREAK_BLOCK_MALLETS
+        + FANTASY_WRITING_MALLETS * FANTASY_WRITING_HUNTS  # fantasy writing (med / short)
+        + np.asarray(fantasy_writing_short_only)
+        * ((FANTASY_WRITING_SHORT_MALLETS - FANTASY_WRITING_MALLETS) * FANTASY_WRITING_HUNTS)
+        + np.asarray(fantasy_postscript_extend) * EXTEND_MALLETS
+    )
+
+
+def mallet_farming(noto_postscript_multiplier, fantasy_postscript_multiplier):
+    """Expected mallets farmed per cycle in the Noto and Fantasy postscripts."""
+    avg_noto_ps_hunts = average_noto_ps_hunts()
+    return (
+        NOTO_MALLET_RATE * np.asarray(noto_postscript_multiplier) * avg_noto_ps_hunts
+        + FANTASY_MALLET_RATE * np.asarray(fantasy_postscript_multiplier) * FANTASY_POSTSCRIPT_HUNTS
+    )
+
+
+def _evaluate(
+    t1w,
+    t2w,
+    t3n,
+    writing_multiplier,
+    t3_discount,
+    fantasy_t2_mats,
+    fantasy_t3_mats,
+    mallets_used,
+    mallets_farmed,
+    cc_writing,
+    cc_noto,
+    cc_fantasy,
+    n_diamonds_per_cycle,
+    n_t2_mats,
+    n_t3_mats,
+    required_diamonds,
+    available_diamonds,
+    n_mallets,
+):
+    """Split columns from hunt counts, stockpiles and the per-cycle coefficients of the discrete settings."""
+    required_cycles = required_cycles_for(n_diamonds_per_cycle, required_diamonds, available_diamonds)
+    t2 = t2_columns(t1w, t2w, writing_multiplier, fantasy_t2_mats, n_t2_mats)
+    t3 = t3_columns(t2w, t3n, writing_multiplier, t3_discount, fantasy_t3_mats, n_t3_mats)
+    mallets = mallet_columns(mallets_used, mallets_farmed, n_mallets)
+    n_cc_used = cc_used(t1w, t2w, t3n, cc_writing, cc_noto, cc_fantasy, t2, t3, mallets, required_cycles)
+    return pack_columns({**t2, **t3, **mallets, "n_cc_used": n_cc_used}, n_diamonds_per_cycle, required_cycles)
+
+
+# The per-resource steps below are also the nodes of cliffs.graph, which recomputes only
+# the ones whose inputs changed.
+
+
+def required_cycles_for(n_diamonds_per_cycle, required_diamonds, available_diamonds):
+    """Cycles needed to earn the remaining diamonds (0 when a cycle earns none)."""
+    has_diamonds = n_diamonds_per_cycle > 0
+    return np.where(
+        has_diamonds,
+        (np.asarray(required_diamonds) - np.asarray(available_diamonds)) / np.where(has_diamonds, n_diamonds_per_cycle, 1),
+        0,
+    )
+
+
+def t2_columns(t1w, t2w, writing_multiplier, fantasy_t2_mats, n_t2_mats):
+    """T2 material columns: hunts, use, farming, net per cycle and cycles until empty."""
+    n_hunts_t2_fantasy_postscript = np.arange(N_SPLITS)
+    t2w = _split_axis(t2w)
+    n_hunts_t2_total = t2w + n_hunts_t2_fantasy_postscript
+    t2_mats_used = n_hunts_t2_total * T2_MATS_PER_HUNT
+    t2_mats_farmed = (_split_axis(t1w) * T1_WRITING_T2_RATE * _split_axis(writing_multiplier)) + fantasy_t2_mats
+    net_t2_mats = t2_mats_farmed - t2_mats_used
+    return {
+        "n_hunts_t1_fantasy_postscript": FANTASY_POSTSCRIPT_HUNTS - n_hunts_t2_fantasy_postscript,
+        "n_hunts_t2_fantasy_postscript": n_hunts_t2_fantasy_postscript,
+        "n_hunts_t2_writing": t2w,
+        "n_hunts_t2_total": n_hunts_t2_total,
+        "t2_mats_used": t2_mats_used,
+        "t2_mats_farmed": t2_mats_farmed,
+        "net_t2_mats": net_t2_mats,
+        "n_cycles_t2": cycles_until_empty(_split_axis(n_t2_mats), net_t2_mats),
+    }
+
+
+def t3_columns(t2w, t3n, writing_multiplier, t3_discount, fantasy_t3_mats, n_t3_mats):
+    """T3 material columns: Noto charging hunts, use, farming, net per cycle and cycles until empty."""
+    n_hunts_t3_total = _split_axis(t3n)
+    t3_mats_used = n_hunts_t3_total * T3_MATS_PER_NOTO_HUNT * _split_axis(t3_discount)
+    t3_mats_farmed = (_split_axis(t2w) * T2_WRITING_T3_RATE * _split_axis(writing_multiplier)) + fantasy_t3_mats
+    net_t3_mats = t3_mats_farmed - t3_mats_used
+    return {
+        "n_hunts_t3_total": n_hunts_t3_total,
+        "t3_mats_used": t3_mats_used,
+        "t3_mats_farmed": t3_mats_farmed,
+        "net_t3_mats": net_t3_mats,
+        "n_cycles_t3": cycles_until_empty(_split_axis(n_t3_mats), net_t3_mats),
+    }
+
+
+def mallet_columns(mallets_used, mallets_farmed, n_mallets):
+    """Mallet columns (independent of the split, so shaped (*batch, 1))."""
+    mallets_used = _split_axis(mallets_used)
+    mallets_farmed = _split_axis(mallets_farmed)
+    net_mallets = mallets_farmed - mallets_used
+    return {
+        "mallets_used": mallets_used,
+        "mallets_farmed": mallets_farmed,
+        "net_mallets": net_mallets,
+        "n_cycles_mallets": cycles_until_empty(_split_axis(n_mallets), net_mallets),
+    }
+
+
+def cc_used(t1w, t2w, t3n, cc_writing, cc_noto, cc_fantasy, t2, t3, mallets, required_cycles):
+    """Condensed Creativity used over the cycles actually run (capped at the diamond target)."""
+    cc_hunts_per_cycle = (
+        _split_axis(cc_writing) * (_split_axis(t1w) + _split_axis(t2w))
+        + _split_axis(cc_noto) * _split_axis(t3n)
+        + _split_axis(cc_fantasy) * FANTASY_POSTSCRIPT_HUNTS
+    )
+    limiting_cycles = np.minimum(
+        np.minimum(t2["n_cycles_t2"], t3["n_cycles_t3"]),
+        np.minimum(mallets["n_cycles_mallets"], _split_axis(required_cycles)),
+    )
+    return limiting_cycles * cc_hunts_per_cycle
+
+
+def pack_columns(columns, n_diamonds_per_cycle, required_cycles):
+    """Order columns as SPLIT_COLUMNS and broadcast them to one (*batch, 14) shape."""
+    shape = np.broadcast_shapes(*(np.shape(v) for v in columns.values()))
+    columns = {name: np.broadcast_to(columns[name], shape) for name in SPLIT_COLUMNS}
+    n_diamonds_per_cycle = np.broadcast_to(n_diamonds_per_cycle, shape[:-1])
+    required_cycles = np.broadcast_to(required_cycles, shape[:-1])
+    return columns, n_diamonds_per_cycle, required_cycles
+
+
+def settings_multipliers(settings):
+    """Writing, Noto, Fantasy postscript and Fantasy diamond multipliers for a settings dict."""
+    cw, cn, cf = (np.asarray(settings[key]) for key in ("cw", "cn", "cf"))
+    return (
+        compute_multiplier(settings["ccw"], cw == 1, cw == 2),
+        compute_multiplier(settings["ccn"], cn == 1, cn == 2),
+        compute_multiplier(settings["ccf"], cf == 1, cf == 2),
+        compute_diamond_multiplier(cf == 1, cf == 2),
+    )
+
+
+def _build_coefficient_index():
+    """Per-cycle coefficients of every discrete configuration, in ravel order of DISCRETE_CHOICES."""
+    grid = np.meshgrid(*(np.array(choices) for choices in DISCRETE_CHOICES.values()), indexing="ij")
+    discrete = {key: values.ravel() for key, values in zip(DISCRETE_CHOICES, grid)}
+    writing_multiplier, noto_multiplier, fantasy_multiplier, diamond_multiplier = settings_multipliers(discrete)
+    fantasy_t2_mats, fantasy_t3_mats = fantasy_farming(fantasy_multiplier)
+    index = {
+        "writing_multiplier": writing_multiplier,
+        "t3_discount": baitkeep_discount(discrete["bk"]),
+        "fantasy_t2_mats": fantasy_t2_mats,
+        "fantasy_t3_mats": fantasy_t3_mats,
+        "mallets_used": mallet_spend(discrete["nbb"], discrete["fbb"], discrete["fws"], discrete["fpe"]),
+        "mallets_farmed": mallet_farming(noto_multiplier, fantasy_multiplier),
+        "n_diamonds_per_cycle": DIAMONDS_PER_CYCLE * diamond_multiplier,
+    }
+    for values in index.values():
+        values.flags.writeable = False
+    return index
+
+
+COEFFICIENT_INDEX = _build_coefficient_index()
+
+
+def discrete_index(settings):
+    """Row of COEFFICIENT_INDEX for the discrete settings (candle indices, CC, Baitkeep, mallets)."""
+    return np.ravel_multi_index(
+        tuple(np.asarray(settings[key], dtype=int) for key in DISCRETE_CHOICES), DISCRETE_SHAPE
+    )
+
+
+def simulate_settings(settings):
+    """Run the simulation from sidebar settings keyed like the saved URL (t1w, cw, ...).
+
+    Candle settings are option indices into CANDLE_OPTIONS; any value may be an array.
+    The per-cycle coefficients of the discrete settings come from COEFFICIENT_INDEX, so
+    only the hunt-count and stockpile terms are computed; results match simulate_splits.
+    """
+    row = discrete_index(settings)
+    coefficients = {name: values[row] for name, values in COEFFICIENT_INDEX.items()}
+    return _evaluate(
+        settings["t1w"],
+        settings["t2w"],
+        settings["t3n"],
+        coefficients["writing_multiplier"],
+        coefficients["t3_discount"],
+        coefficients["fantasy_t2_mats"],
+        coefficients["fantasy_t3_mats"],
+        coefficients["mallets_used"],
+        coefficients["mallets_farmed"],
+        settings["ccw"],
+        settings["ccn"],
+        settings["ccf"],
+        coefficients["n_diamonds_per_cycle"],
+        settings["t2m"],
+        settings["t3m"],
+        settings["rd"],
+        settings["ad"],
+        settings["mal"],
+    )
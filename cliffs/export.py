@@ -0,0 +1,154 @@
+"""Serializers for simulation results: CSV, JSON Lines, Parquet and Arrow.
+
+Chunk writers take dicts of equal-length columns and append them to a binary file
+object as they arrive, so large sweeps and batches are written chunk by chunk instead
+of being built up as one string. Parquet and Arrow need pyarrow (installed with
+Streamlit); available_formats lists what can be written here.
+"""
+
+import csv
+import importlib.util
+import io
+import json
+import tempfile
+
+import numpy as np
+
+# Format name -> (file extension, MIME type).
+EXPORT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "jsonl": ("jsonl", "application/x-ndjson"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+FORMAT_LABELS = {"csv": "CSV", "jsonl": "JSON Lines", "parquet": "Parquet", "arrow": "Arrow"}
+ARROW_FORMATS = ("parquet", "arrow")
+
+# Spooled exports move from memory to a temporary file past this many bytes.
+SPOOL_MEMORY = 32 * 2**20
+
+
+def available_formats():
+    """Export formats usable in this environment (Parquet/Arrow only with pyarrow)."""
+    has_pyarrow = importlib.util.find_spec("pyarrow") is not None
+    return [name for name in EXPORT_FORMATS if has_pyarrow or name not in ARROW_FORMATS]
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet and Arrow export require pyarrow (pip install pyarrow).") from None
+    return pa
+
+
+def _python_values(values):
+    """Plain Python list for a column (NumPy scalars are not JSON serializable)."""
+    return values.tolist() if isinstance(values, np.ndarray) else list(values)
+
+
+class CsvChunkWriter:
+    def __init__(self, file, fields=None):
+        self._text = io.TextIOWrapper(file, encoding="utf-8", newline="", write_through=True)
+        self._writer = csv.writer(self._text)
+        self._fields = fields
+        if fields is not None:
+            self._writer.writerow(fields)
+
+    def write(self, columns):
+        if self._fields is None:
+            self._fields = list(columns)
+            self._writer.writerow(self._fields)
+        self._writer.writerows(zip(*(_python_values(columns[name]) for name in self._fields)))
+
+    def close(self):
+        self._text.flush()
+        self._text.detach()
+
+
+class JsonlChunkWriter:
+    def __init__(self, file, fields=None):
+        self._text = io.TextIOWrapper(file, encoding="utf-8", write_through=True)
+        self._fields = fields
+
+    def write(self, columns):
+        names = self._fields or list(columns)
+        for row in zip(*(_python_values(columns[name]) for name in names)):
+            self._text.write(json.dumps(dict(zip(names, row))) + "\n")
+
+    def close(self):
+        self._text.flush()
+        self._text.detach()
+
+
+class ParquetChunkWriter:
+    """Parquet file with one row group per chunk; the schema comes from the first chunk."""
+
+    def __init__(self, file, fields=None):
+        self._pa = _pyarrow()
+        self._file = file
+        self._fields = fields
+        self._writer = None
+        self._schema = None
+
+    def write(self, columns):
+        table = self._pa.table({name: columns[name] for name in self._fields or columns})
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = self._open(self._schema)
+        self._writer.write_table(table.cast(self._schema))
+
+    def _open(self, schema):
+        return self._pa.parquet.ParquetWriter(self._file, schema)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class ArrowChunkWriter(ParquetChunkWriter):
+    """Arrow IPC file with one record batch per chunk."""
+
+    def _open(self, schema):
+        return self._pa.ipc.new_file(self._file, schema)
+
+
+CHUNK_WRITERS = {
+    "csv": CsvChunkWriter,
+    "jsonl": JsonlChunkWriter,
+    "parquet": ParquetChunkWriter,
+    "arrow": ArrowChunkWriter,
+}
+
+
+def write_chunks(chunks, export_format, file, fields=None):
+    """Write an iterable of column dicts to a binary file object; returns the rows written."""
+    writer = CHUNK_WRITERS[export_format](file, fields)
+    n_rows = 0
+    try:
+        for columns in chunks:
+            writer.write(columns)
+            n_rows += len(next(iter(columns.values())))
+    finally:
+        writer.close()
+    return n_rows
+
+
+def export_result(result, export_format):
+    """One SimResult (all 14 splits) serialized in export_format, as bytes."""
+    if export_format == "csv":
+        # Same bytes as the original DataFrame download.
+        return result.to_frame().to_csv(index=False).encode()
+    buffer = io.BytesIO()
+    write_chunks([{name: result.table[name] for name in result.table.dtype.names}], export_format, buffer)
+    return buffer.getvalue()
+
+
+def spool_chunks(chunks, export_format, fields=None, max_memory=SPOOL_MEMORY):
+    """Write chunks to a temporary file (kept in memory up to max_memory bytes), rewound for reading."""
+    file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    write_chunks(chunks, export_format, file, fields)
+    file.seek(0)
+    return file
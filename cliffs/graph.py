@@ -0,0 +1,239 @@
+"""Incremental evaluation of the model as a graph of named nodes.
+
+Each node declares its inputs, which are settings keys (as in the saved URL, plus
+remaining_days) or other nodes, and computes its value from them. A ModelGraph holds
+one session's inputs and node values. set_inputs invalidates only the nodes downstream
+of the inputs that changed, and reading a node recomputes it only if it was invalidated.
+So changing T2 materials redoes the T2 cycle limit, CC used and the result, but not the
+multipliers or the T3 and mallet nodes, and changing hunts per day touches only the time
+constraint.
+
+Nodes marked shared also go through the process-wide simulation cache, keyed by every
+setting they depend on, so sessions with the same settings compute them once, and through
+the on-disk result store (cliffs.store), so they are computed once across restarts too.
+"""
+
+from functools import partial
+
+import numpy as np
+
+from cliffs.cache import normalize_setting, simulation_cache
+from cliffs.core import CONSTRAINT_LABELS, SimResult, binding_index
+from cliffs.engine import (
+    DIAMONDS_PER_CYCLE,
+    SIMULATION_KEYS,
+    baitkeep_discount,
+    cc_used,
+    cycle_hunts,
+    fantasy_farming,
+    mallet_columns,
+    mallet_farming,
+    mallet_spend,
+    pack_columns,
+    required_cycles_for,
+    settings_multipliers,
+    t2_columns,
+    t3_columns,
+)
+from cliffs.inverse import solve_requirements
+from cliffs.projection import project
+from cliffs.store import result_store
+from cliffs.timeline import binding_schedule
+
+# Node name -> (inputs, function of those inputs in order, shared across sessions).
+NODES = {}
+
+
+def node(*inputs, shared=False):
+    """Register the decorated function as a node named after it."""
+
+    def register(fn):
+        NODES[fn.__name__] = (inputs, fn, shared)
+        return fn
+
+    return register
+
+
+@node("cw", "cn", "cf", "ccw", "ccn", "ccf")
+def multipliers(cw, cn, cf, ccw, ccn, ccf):
+    """Writing, Noto, Fantasy postscript and Fantasy diamond multipliers."""
+    return settings_multipliers({"cw": cw, "cn": cn, "cf": cf, "ccw": ccw, "ccn": ccn, "ccf": ccf})
+
+
+@node("multipliers")
+def fantasy_mats(multipliers):
+    """T2 and T3 materials farmed in the Fantasy postscript for each split."""
+    return fantasy_farming(multipliers[2])
+
+
+@node("t1w", "t2w", "multipliers", "fantasy_mats", "t2m")
+def t2(t1w, t2w, multipliers, fantasy_mats, t2m):
+    return t2_columns(t1w, t2w, multipliers[0], fantasy_mats[0], t2m)
+
+
+@node("t2w", "t3n", "bk", "multipliers", "fantasy_mats", "t3m")
+def t3(t2w, t3n, bk, multipliers, fantasy_mats, t3m):
+    return t3_columns(t2w, t3n, multipliers[0], baitkeep_discount(bk), fantasy_mats[1], t3m)
+
+
+@node("nbb", "fbb", "fws", "fpe", "multipliers", "mal")
+def mallets(nbb, fbb, fws, fpe, multipliers, mal):
+    return mallet_columns(mallet_spend(nbb, fbb, fws, fpe), mallet_farming(multipliers[1], multipliers[2]), mal)
+
+
+@node("multipliers", "rd", "ad")
+def diamonds(multipliers, rd, ad):
+    """(diamonds per cycle, cycles needed for the diamond target)."""
+    n_diamonds_per_cycle = DIAMONDS_PER_CYCLE * np.asarray(multipliers[3])
+    return n_diamonds_per_cycle, required_cycles_for(n_diamonds_per_cycle, rd, ad)
+
+
+@node("t1w", "t2w", "t3n", "ccw", "ccn", "ccf", "t2", "t3", "mallets", "diamonds")
+def n_cc_used(t1w, t2w, t3n, ccw, ccn, ccf, t2, t3, mallets, diamonds):
+    return cc_used(t1w, t2w, t3n, ccw, ccn, ccf, t2, t3, mallets, diamonds[1])
+
+
+@node("t2", "t3", "mallets", "n_cc_used", "diamonds", shared=True)
+def result(t2, t3, mallets, n_cc_used, diamonds):
+    """SimResult for all 14 splits; identical to cliffs.simulate for the same settings."""
+    columns, n_diamonds_per_cycle, required_cycles = pack_columns(
+        {**t2, **t3, **mallets, "n_cc_used": n_cc_used}, *diamonds
+    )
+    return SimResult.from_columns(columns, n_diamonds_per_cycle, required_cycles)
+
+
+@node("result", shared=True)
+def best_row(result):
+    return result.best_row
+
+
+@node("t1w", "t2w")
+def hunts_per_cycle(t1w, t2w):
+    return cycle_hunts(t1w, t2w)
+
+
+@node("hpd", "remaining_days", "hunts_per_cycle")
+def time_constraint(hpd, remaining_days, hunts_per_cycle):
+    """Hunts left before the event ends and the cycles they allow at this writing allocation."""
+    remaining_hunts = remaining_days * hpd
+    return {"remaining_hunts": remaining_hunts, "n_cycles_time": remaining_hunts / hunts_per_cycle}
+
+
+@node("best_row", "time_constraint")
+def binding_constraint(best_row, time_constraint):
+    """(label, cycles) of the limit the optimal split hits first, time included."""
+    limits = (
+        best_row["n_cycles_t2"],
+        best_row["n_cycles_t3"],
+        best_row["n_cycles_mallets"],
+        time_constraint["n_cycles_time"],
+    )
+    binding = int(binding_index(limits))
+    return CONSTRAINT_LABELS[binding], float(min(limits))
+
+
+@node("best_row", "diamonds", "hpd", "remaining_days", "hunts_per_cycle")
+def schedule(best_row, diamonds, hpd, remaining_days, hunts_per_cycle):
+    """Binding constraint for each day the player could start on (see cliffs.timeline)."""
+    return binding_schedule(best_row, hpd, remaining_days, diamonds[1], hunts_per_cycle)
+
+
+@node("result", "t2m", "t3m", "mal", "hpd", "remaining_days", "hunts_per_cycle")
+def requirements(result, t2m, t3m, mal, hpd, remaining_days, hunts_per_cycle):
+    """Minimum stockpiles and hunts per day to reach the diamond target (see cliffs.inverse)."""
+    settings = {"t2m": t2m, "t3m": t3m, "mal": mal, "hpd": hpd}
+    return solve_requirements(result, settings, remaining_days, hunts_per_cycle)
+
+
+@node(*SIMULATION_KEYS, shared=True)
+def projection(*values):
+    """Stockpile projections for every split (see cliffs.projection.project)."""
+    return project(dict(zip(SIMULATION_KEYS, values)))
+
+
+def settings_of(name, nodes=NODES):
+    """Inputs (settings keys or remaining_days) a node depends on, directly or through other nodes."""
+    if name not in nodes:
+        return {name}
+    return set().union(*(settings_of(source, nodes) for source in nodes[name][0]))
+
+
+def node_key(name, settings, nodes=NODES):
+    """Simulation cache key of a shared node for the given settings."""
+    return ("node", name, tuple((key, settings[key]) for key in sorted(settings_of(name, nodes))))
+
+
+def warm_cache(store=result_store, cache=simulation_cache):
+    """Load the store's most recently used node values into the cache (first call per process only)."""
+    if store is None:
+        return 0
+    return store.warm(cache, lambda name, settings: node_key(name, settings) if name in NODES else None)
+
+
+class ModelGraph:
+    """One session's inputs and the node values computed from them."""
+
+    def __init__(self, nodes=None, cache=simulation_cache, store=result_store):
+        self._nodes = NODES if nodes is None else nodes
+        self._cache = cache
+        self._store = store
+        self._inputs = {}
+        self._values = {}
+        self._dependents = {}
+        for name, (inputs, _, _) in self._nodes.items():
+            for source in inputs:
+                self._dependents.setdefault(source, set()).add(name)
+        self._settings_inputs = {name: sorted(settings_of(name, self._nodes)) for name in self._nodes}
+        self._recomputed = []  # nodes recomputed since start_rerun, in order
+
+    def set_inputs(self, values):
+        """Update inputs, invalidating the nodes that depend on changed ones; returns the changed keys."""
+        changed = []
+        for key, value in values.items():
+            value = normalize_setting(value)
+            if key not in self._inputs or self._inputs[key] != value:
+                self._inputs[key] = value
+                changed.append(key)
+        for key in changed:
+            self._invalidate(key)
+        return changed
+
+    def start_rerun(self, values):
+        """Begin a script rerun: reset the recomputed log, then set_inputs(values).
+
+        Cached node values are kept; only the nodes downstream of changed inputs are dropped.
+        """
+        self._recomputed = []
+        return self.set_inputs(values)
+
+    @property
+    def recomputed(self):
+        """Nodes recomputed since the last start_rerun, in order (nodes computed later in the rerun are appended)."""
+        return self._recomputed
+
+    def _invalidate(self, name):
+        # Recurse even past missing values: a shared node read from the cache has no inputs stored.
+        for dependent in self._dependents.get(name, ()):
+            self._values.pop(dependent, None)
+            self._invalidate(dependent)
+
+    def __getitem__(self, name):
+        if name in self._values:
+            return self._values[name]
+        if name not in self._nodes:
+            return self._inputs[name]
+        inputs, fn, shared = self._nodes[name]
+
+        def compute():
+            self._recomputed.append(name)
+            return fn(*(self[source] for source in inputs))
+
+        if shared:
+            settings = {key: self._inputs[key] for key in self._settings_inputs[name]}
+            if self._store is not None:
+                compute = partial(self._store.get_or_compute, name, settings, compute)
+            value = self._cache.get_or_compute(node_key(name, settings, self._nodes), compute)
+        else:
+            value = compute()
+        self._values[name] = value
+        return value
@@ -0,0 +1,78 @@
+"""Inverse mode: the smallest stockpiles and hunt rate that reach the diamond target in time.
+
+A stockpile with net change net per cycle lasts stock / -net cycles, so running the
+required cycles R takes at least -net * R of it (nothing if it is not drawn down), and
+doing R cycles before the deadline takes R * hunts per cycle / remaining days hunts a
+day. Both are closed forms on the per-cycle nets, evaluated for all 14 Fantasy splits
+(and any leading batch shape) at once.
+"""
+
+import numpy as np
+
+from cliffs.engine import N_SPLITS
+
+# Settings key solved for, with its net-per-cycle column (None for hunts per day), in the
+# order of CONSTRAINT_LABELS.
+REQUIREMENTS = {"t2m": "net_t2_mats", "t3m": "net_t3_mats", "mal": "net_mallets", "hpd": None}
+REQUIREMENT_LABELS = {"t2m": "T2 Materials", "t3m": "T3 Materials", "mal": "Mallets", "hpd": "Hunts per Day"}
+
+# Relative slack when comparing a stockpile with its requirement (the division in
+# cycles_until_empty and the product here round differently).
+TOLERANCE = 1e-9
+
+
+def required_stock(net, required_cycles):
+    """Smallest stockpile that lasts required_cycles at net change per cycle; shape (*batch, 14)."""
+    cycles = np.maximum(np.asarray(required_cycles), 0)[..., np.newaxis]
+    return np.broadcast_to(np.maximum(-np.asarray(net), 0) * cycles, np.shape(cycles)[:-1] + (N_SPLITS,))
+
+
+def required_hunts_per_day(required_cycles, remaining_days, hunts_per_cycle):
+    """Hunts per day needed to finish required_cycles before the deadline (inf once it has passed)."""
+    hunts = np.maximum(np.asarray(required_cycles), 0) * hunts_per_cycle
+    days = np.asarray(remaining_days, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(hunts > 0, hunts / days, 0.0)
+
+
+def minimum_requirements(columns, required_cycles, remaining_days, hunts_per_cycle):
+    """Minimum of each REQUIREMENTS key to reach the diamond target, for every split.
+
+    columns are simulate_splits columns; returns t2m, t3m and mal shaped (*batch, 14) and
+    hpd shaped (*batch,).
+    """
+    minimum = {key: required_stock(columns[net], required_cycles) for key, net in REQUIREMENTS.items() if net}
+    minimum["hpd"] = required_hunts_per_day(required_cycles, remaining_days, hunts_per_cycle)
+    return minimum
+
+
+def solve_requirements(result, settings, remaining_days, hunts_per_cycle):
+    """Minimum of each REQUIREMENTS key for one configuration, over every Fantasy split.
+
+    Each minimum holds on its own, at the split needing the least of that stockpile (the
+    optimal split when it ties), so different stockpiles may be met at different splits.
+    Returns one dict per key with label, current (from settings), minimum, shortfall and
+    split (the split's Fantasy T2 hunts; None for hunts per day, which every split
+    shares), plus "per_split" (the stockpile minimums for all 14 splits).
+    """
+    minimum = minimum_requirements(result.columns, result.required_cycles, remaining_days, hunts_per_cycle)
+    best = result.best_index
+    rows = {}
+    for key, net in REQUIREMENTS.items():
+        split = None
+        if net:
+            values = minimum[key]
+            split = best if values[best] <= values.min() * (1 + TOLERANCE) else int(np.argmin(values))
+            value = float(values[split])
+        else:
+            value = float(minimum[key])
+        current = float(settings[key])
+        rows[key] = {
+            "label": REQUIREMENT_LABELS[key],
+            "current": current,
+            "minimum": value,
+            "shortfall": max(value - current * (1 + TOLERANCE), 0.0),
+            "split": split,
+        }
+    rows["per_split"] = {key: minimum[key] for key, net in REQUIREMENTS.items() if net}
+    return rows
@@ -0,0 +1,131 @@
+"""Background jobs shared by every session: a thread pool with progress, cancellation and coalescing.
+
+Heavy work (optimizer searches, Monte Carlo runs) is submitted under a key describing
+its inputs. If a job with that key is already running it is joined rather than started
+again, and each session waiting on it is recorded as a subscriber. When the last
+subscriber releases a job (its inputs changed, or the session left its page), the job
+is cancelled at its next progress report. Results of finished jobs go into the
+simulation cache under the job key unless submitted with cache=False.
+
+A job function takes one argument, report(fraction, partial=None), and should call it as
+it makes progress; report raises JobCancelled once the job is cancelled. Threads are used
+rather than processes so results land in the in-process cache without pickling. They
+keep reruns responsive while a job runs; they are not a parallel speed-up, since the
+optimizer and Monte Carlo loops are mostly Python-level steps over small arrays and
+hold the GIL.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cliffs.cache import simulation_cache
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when every subscriber has released the job."""
+
+
+class Job:
+    """One running or finished piece of background work and its latest progress."""
+
+    def __init__(self, key, cache):
+        self.key = key
+        self.cache = cache
+        self.progress = 0.0
+        self.partial = None
+        self.subscribers = set()
+        self.started = time.monotonic()
+        self._cancel = threading.Event()
+        self._future = None
+
+    @property
+    def done(self):
+        return self._future.done()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def result(self, timeout=None):
+        """The job function's return value; re-raises its exception (JobCancelled if cancelled)."""
+        return self._future.result(timeout)
+
+    def report(self, fraction, partial=None):
+        """Record progress (0-1) and an optional partial result; raises JobCancelled if cancelled."""
+        if self._cancel.is_set():
+            raise JobCancelled(self.key)
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if partial is not None:
+            self.partial = partial
+
+
+class JobPool:
+    """Thread pool running keyed jobs, coalescing identical ones across sessions."""
+
+    def __init__(self, max_workers, cache=simulation_cache):
+        self.max_workers = max_workers
+        self._cache = cache
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="cliffs-job")
+        self._running = {}
+        self._lock = threading.Lock()
+        self.n_submitted = 0
+        self.n_coalesced = 0
+        self.n_cancelled = 0
+
+    def submit(self, key, fn, subscriber, cache=True):
+        """Job running fn for key, joining an identical job in flight; subscriber is any hashable id."""
+        with self._lock:
+            job = self._running.get(key)
+            if job is None:
+                job = Job(key, cache)
+                job._future = self._executor.submit(self._run, job, fn)
+                self._running[key] = job
+                self.n_submitted += 1
+            elif subscriber not in job.subscribers:
+                self.n_coalesced += 1
+            job.subscribers.add(subscriber)
+            return job
+
+    def _run(self, job, fn):
+        try:
+            job.report(0.0)
+            result = fn(job.report)
+            job.progress = 1.0
+            if job.cache:
+                self._cache.put(job.key, result)
+            return result
+        finally:
+            with self._lock:
+                if self._running.get(job.key) is job:
+                    del self._running[job.key]
+
+    def release(self, job, subscriber):
+        """Drop subscriber from job, cancelling the job if nobody else is waiting on it."""
+        with self._lock:
+            job.subscribers.discard(subscriber)
+            if job.subscribers or job.done:
+                return
+            job._cancel.set()
+            self.n_cancelled += 1
+            # A new request for the same key starts fresh instead of joining the cancelled job.
+            if self._running.get(job.key) is job:
+                del self._running[job.key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "running": len(self._running),
+                "max_workers": self.max_workers,
+                "submitted": self.n_submitted,
+                "coalesced": self.n_coalesced,
+                "cancelled": self.n_cancelled,
+            }
+
+
+job_pool = JobPool(max_workers=int(os.environ.get("CLIFFS_JOB_WORKERS", min(4, os.cpu_count() or 1))))
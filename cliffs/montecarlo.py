@@ -0,0 +1,149 @@
+"""Stochastic (Monte Carlo) mode for the cycle model.
+
+Instead of the fixed expectations used by simulate_splits, every cycle samples the
+random parts of the model for each trial and each of the 14 Fantasy splits:
+
+- material and mallet drops are Poisson with the deterministic per-cycle means;
+- Fantasy writing mallet costs are Poisson around the med / short-only per-hunt averages;
+- one uniform draw per cycle decides the Noto postscript: below the extend probability
+  the player extends (30 mallets, 13 hunts); below p_extend / (p_extend + p_no_extend)
+  the postscript runs 13 hunts without extending; otherwise it runs 10 hunts.
+
+Each sampled quantity has the same mean as in simulate_splits. A trial counts the
+cycles it completes before any stockpile goes negative.
+"""
+
+import math
+import time
+
+import numpy as np
+
+from cliffs.core import simulate
+from cliffs.engine import (
+    BAITKEEP_RATE,
+    BREAK_BLOCK_MALLETS,
+    EXTEND_MALLETS,
+    FANTASY_MALLET_RATE,
+    FANTASY_POSTSCRIPT_HUNTS,
+    FANTASY_POSTSCRIPT_RATE,
+    FANTASY_WRITING_HUNTS,
+    FANTASY_WRITING_MALLETS,
+    FANTASY_WRITING_SHORT_MALLETS,
+    N_SPLITS,
+    NO_EXTEND_PROBABILITY,
+    NOTO_EXTEND_PS_PROBABILITY,
+    NOTO_EXTENDED_POSTSCRIPT_HUNTS,
+    NOTO_MALLET_RATE,
+    NOTO_POSTSCRIPT_HUNTS,
+    NOTO_WRITING_MALLETS,
+    T1_WRITING_T2_RATE,
+    T2_MATS_PER_HUNT,
+    T2_WRITING_T3_RATE,
+    T3_MATS_PER_NOTO_HUNT,
+    UNCONSTRAINED,
+)
+
+PERCENTILES = (10, 50, 90)
+MAX_HORIZON = 500
+
+
+def default_horizon(params):
+    """Cycles to simulate: enough to cover the diamond target and the deterministic max cycles."""
+    result = simulate(params)
+    finite = result.max_cycles[result.max_cycles < UNCONSTRAINED]
+    longest = max(result.required_cycles, finite.max() if finite.size else 0)
+    return int(min(MAX_HORIZON, math.ceil(longest * 1.5) + 1))
+
+
+def run_trials(params, n_trials, rng, horizon):
+    """Completed cycles for n_trials independent runs of every split, shape (n_trials, 14)."""
+    shape = (n_trials, N_SPLITS)
+    t2f = np.arange(N_SPLITS)
+    t1f = FANTASY_POSTSCRIPT_HUNTS - t2f
+    wm = params.writing_multiplier
+    nm = params.noto_postscript_multiplier
+    fm = params.fantasy_postscript_multiplier
+
+    t2_used = (params.n_hunts_t2_writing + t2f) * T2_MATS_PER_HUNT
+    t3_used = params.n_hunts_t3_noto_postscript * T3_MATS_PER_NOTO_HUNT * (1 / (1 + (params.bk * BAITKEEP_RATE)))
+    fixed_mallets = (
+        params.noto_break_block * BREAK_BLOCK_MALLETS
+        + NOTO_WRITING_MALLETS
+        + params.fantasy_postscript_break_block * BREAK_BLOCK_MALLETS
+        + params.fantasy_postscript_extend * EXTEND_MALLETS
+    )
+    writing_mallets = FANTASY_WRITING_SHORT_MALLETS if params.fantasy_writing_short_only else FANTASY_WRITING_MALLETS
+    long_ps_probability = NOTO_EXTEND_PS_PROBABILITY / (NO_EXTEND_PROBABILITY + NOTO_EXTEND_PS_PROBABILITY)
+
+    t2 = np.full(shape, float(params.n_t2_mats))
+    t3 = np.full(shape, float(params.n_t3_mats))
+    mallets = np.full(shape, float(params.n_mallets))
+    completed = np.zeros(shape, dtype=int)
+    alive = np.ones(shape, dtype=bool)
+
+    for _ in range(horizon):
+        noto_roll = rng.random(shape)
+        extended = noto_roll < NOTO_EXTEND_PS_PROBABILITY
+        noto_ps_hunts = np.where(noto_roll < long_ps_probability, NOTO_EXTENDED_POSTSCRIPT_HUNTS, NOTO_POSTSCRIPT_HUNTS)
+
+        t2 += (
+            rng.poisson(params.n_hunts_t1_writing * T1_WRITING_T2_RATE * wm, shape)
+            + rng.poisson(t1f * FANTASY_POSTSCRIPT_RATE * fm, shape)
+            - t2_used
+        )
+        t3 += (
+            rng.poisson(params.n_hunts_t2_writing * T2_WRITING_T3_RATE * wm, shape)
+            + rng.poisson(t2f * FANTASY_POSTSCRIPT_RATE * fm, shape)
+            - t3_used
+        )
+        mallets += (
+            rng.poisson(NOTO_MALLET_RATE * nm * noto_ps_hunts)
+            + rng.poisson(FANTASY_MALLET_RATE * fm * FANTASY_POSTSCRIPT_HUNTS, shape)
+            - rng.poisson(writing_mallets * FANTASY_WRITING_HUNTS, shape)
+            - extended * EXTEND_MALLETS
+            - fixed_mallets
+        )
+
+        alive &= (t2 >= 0) & (t3 >= 0) & (mallets >= 0)
+        completed += alive
+        if not alive.any():
+            break
+    return completed
+
+
+def summarize_trials(completed, required_cycles):
+    """Per-split P10/P50/P90 completed cycles and probability of reaching the diamond target."""
+    return {
+        "n_trials": len(completed),
+        "percentiles": dict(zip(PERCENTILES, np.percentile(completed, PERCENTILES, axis=0))),
+        "p_target": (completed >= required_cycles).mean(axis=0),
+    }
+
+
+def monte_carlo(params, n_trials=2000, time_budget=2.0, seed=0, batch_size=250, horizon=None):
+    """Run trials in batches, yielding a running summary after each batch.
+
+    Stops after n_trials or once time_budget seconds have passed, whichever comes first.
+    Batches draw from one generator seeded with seed, so a run that completes its trial
+    count is reproducible. Summaries also carry horizon (cycles simulated; counts at the
+    horizon are censored), elapsed and done.
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    if horizon is None:
+        horizon = default_horizon(params)
+    required_cycles = simulate(params).required_cycles
+
+    batches = []
+    n_run = 0
+    while n_run < n_trials:
+        size = min(batch_size, n_trials - n_run)
+        batches.append(run_trials(params, size, rng, horizon))
+        n_run += size
+        elapsed = time.perf_counter() - start
+        done = n_run >= n_trials or elapsed >= time_budget
+        summary = summarize_trials(np.concatenate(batches), required_cycles)
+        summary.update(horizon=horizon, elapsed=elapsed, done=done)
+        yield summary
+        if done:
+            return
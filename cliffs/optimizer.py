@@ -0,0 +1,228 @@
+import itertools
+import time
+
+import numpy as np
+
+from cliffs.engine import DISCRETE_CHOICES, FANTASY_POSTSCRIPT_HUNTS, N_SPLITS, simulate_settings
+
+# Sidebar settings each optimizer lever controls, keyed like the saved URL.
+LEVERS = {
+    "hunts": ("t1w", "t2w", "t3n"),
+    "candles": ("cw", "cn", "cf"),
+    "cc": ("ccw", "ccn", "ccf"),
+    "bk": ("bk",),
+    "mallets": ("nbb", "fbb", "fws", "fpe"),
+}
+
+# (start, stop, step) for each searched hunt count, stop inclusive.
+DEFAULT_HUNT_GRID = {"t1w": (0, 200, 20), "t2w": (0, 100, 10), "t3n": (0, 26, 2)}
+
+STOCK_KEYS = ("t2m", "t3m", "rd", "ad", "mal")
+
+# Upper bound on configurations (regions x hunt grid) simulated per array pass.
+BATCH_CONFIGS = 8192
+
+
+def pareto_mask(cycles, cc_used, mallet_cost):
+    """Mask of points not dominated on (max cycles, min CC, min mallet cost); ties keep the first."""
+    order = np.lexsort((mallet_cost, cc_used, -cycles))
+    keep = np.zeros(len(cycles), dtype=bool)
+    kept_cc = np.empty(0)
+    kept_mallets = np.empty(0)
+    for i in order:
+        # Everything kept so far has at least as many cycles, so only the costs need comparing.
+        if np.any((kept_cc <= cc_used[i]) & (kept_mallets <= mallet_cost[i])):
+            continue
+        keep[i] = True
+        kept_cc = np.append(kept_cc, cc_used[i])
+        kept_mallets = np.append(kept_mallets, mallet_cost[i])
+    return keep
+
+
+def _front_2d(cycles, cc_used):
+    """Indices of the (max cycles, min CC) frontier of points sharing one mallet cost."""
+    order = np.lexsort((cc_used, -cycles))
+    sorted_cc = cc_used[order]
+    best_before = np.concatenate(([np.inf], np.minimum.accumulate(sorted_cc)[:-1]))
+    return order[sorted_cc < best_before]
+
+
+def _region_dominated(front_cycles, front_cc, front_mallets, cycles_ub, cc_per_cycle_min, required_cycles, mallet_cost):
+    """Whether every point a region could produce is already dominated by the frontier.
+
+    Within a region the mallet cost is fixed, cycles never exceed cycles_ub, and CC used is
+    at least cc_per_cycle_min * min(cycles, required_cycles). The region is dominated if, for
+    every cycle count c up to cycles_ub, some frontier point with no higher mallet cost reaches
+    c cycles while using no more than that CC floor.
+    """
+    usable = front_mallets <= mallet_cost
+    if not usable.any() or front_cycles[usable].max() < cycles_ub:
+        return False
+    cycles = front_cycles[usable]
+    cc_used = front_cc[usable]
+    order = np.argsort(cycles)
+    cycles = cycles[order]
+    # Cheapest CC among frontier points reaching at least cycles[i].
+    cheapest_cc = np.minimum.accumulate(cc_used[order][::-1])[::-1]
+    interval_start = np.concatenate(([0.0], cycles[:-1]))
+    relevant = interval_start < cycles_ub
+    cc_floor = cc_per_cycle_min * np.clip(np.minimum(interval_start, required_cycles), 0, None)
+    return bool(np.all(cheapest_cc[relevant] <= cc_floor[relevant]))
+
+
+def _regions(settings, levers):
+    """Every combination of the searched discrete levers, as arrays over DISCRETE_CHOICES keys."""
+    free_keys = [key for lever in levers if lever != "hunts" for key in LEVERS[lever]]
+    region_values = np.array(list(itertools.product(*(DISCRETE_CHOICES[key] for key in free_keys))), dtype=int)
+    regions = {key: np.full(len(region_values), settings[key]) for key in DISCRETE_CHOICES}
+    regions.update({key: region_values[:, i] for i, key in enumerate(free_keys)})
+    return regions
+
+
+def _hunt_grid(settings, levers, hunt_grid):
+    """Flattened arrays of every searched (t1w, t2w, t3n) combination."""
+    if "hunts" not in levers:
+        return {key: np.array([settings[key]]) for key in LEVERS["hunts"]}
+    ranges = [np.arange(start, stop + 1, step) for start, stop, step in (hunt_grid[key] for key in LEVERS["hunts"])]
+    mesh = np.meshgrid(*ranges, indexing="ij")
+    return {key: values.ravel() for key, values in zip(LEVERS["hunts"], mesh)}
+
+
+def optimize(settings, levers=tuple(LEVERS), hunt_grid=None, cycle_cap=None, progress=None):
+    """Search the joint space of the chosen levers and return its Pareto frontier.
+
+    settings holds the current sidebar values keyed like the saved URL; levers not being
+    searched stay at those values. Objectives are max cycles (optionally capped at
+    cycle_cap), CC used and net mallet cost per cycle. Combinations of the discrete levers
+    ("regions") are visited most-promising first, and a region is skipped without
+    simulating its hunt grid when a bound shows the frontier already dominates it.
+
+    progress, if given, is called with the fraction of regions visited after each batch
+    (see cliffs.jobs).
+
+    Returns (frontier, stats): frontier is a dict of arrays (one entry per settings key plus
+    the Fantasy split and the three objectives) sorted by cycles descending.
+    """
+    start_time = time.perf_counter()
+    hunt_grid = {**DEFAULT_HUNT_GRID, **(hunt_grid or {})}
+    cap = np.inf if cycle_cap is None else cycle_cap
+
+    regions = _regions(settings, levers)
+    n_regions = len(regions["bk"])
+    hunts = _hunt_grid(settings, levers, hunt_grid)
+    n_hunts = len(hunts["t1w"])
+    stock = {key: settings[key] for key in STOCK_KEYS}
+
+    # Mallet cycles and cost do not depend on hunt counts, so a single pass bounds every region.
+    min_hunts = {key: values.min() for key, values in hunts.items()}
+    columns, _, required_cycles = simulate_settings({**regions, **min_hunts, **stock})
+    mallet_cost = -columns["net_mallets"][:, 0]
+    cycles_ub = np.minimum(columns["n_cycles_mallets"][:, 0], cap)
+    cc_per_cycle_min = (
+        regions["ccw"] * (min_hunts["t1w"] + min_hunts["t2w"])
+        + regions["ccn"] * min_hunts["t3n"]
+        + regions["ccf"] * FANTASY_POSTSCRIPT_HUNTS
+    )
+
+    pending = list(np.lexsort((mallet_cost, -cycles_ub)))
+    front = {"region": np.empty(0, int), "hunt": np.empty(0, int), "split": np.empty(0, int)}
+    front_objectives = np.empty((0, 3))
+    n_evaluated = n_pruned = 0
+    regions_per_batch = max(1, BATCH_CONFIGS // n_hunts)
+
+    while pending:
+        batch = []
+        while pending and len(batch) < regions_per_batch:
+            r = pending.pop(0)
+            if _region_dominated(
+                front_objectives[:, 0], front_objectives[:, 1], front_objectives[:, 2],
+                cycles_ub[r], cc_per_cycle_min[r], required_cycles[r], mallet_cost[r],
+            ):
+                n_pruned += 1
+            else:
+                batch.append(r)
+        if not batch:
+            break
+        n_evaluated += len(batch)
+
+        batch = np.array(batch)
+        batch_settings = {key: values[batch][:, None] for key, values in regions.items()}
+        batch_settings.update({key: values[None, :] for key, values in hunts.items()})
+        columns, _, _ = simulate_settings({**batch_settings, **stock})
+        max_cycles = np.minimum(
+            np.minimum(columns["n_cycles_t2"], columns["n_cycles_t3"]), columns["n_cycles_mallets"]
+        )
+        cycles = np.minimum(max_cycles, cap).reshape(len(batch), -1)
+        cc_used = np.clip(columns["n_cc_used"], 0, None).reshape(len(batch), -1)
+
+        candidates = [front]
+        candidate_objectives = [front_objectives]
+        for i, r in enumerate(batch):
+            local = _front_2d(cycles[i], cc_used[i])
+            candidates.append({
+                "region": np.full(len(local), r),
+                "hunt": local // N_SPLITS,
+                "split": local % N_SPLITS,
+            })
+            candidate_objectives.append(
+                np.column_stack((cycles[i, local], cc_used[i, local], np.full(len(local), mallet_cost[r])))
+            )
+        merged = {key: np.concatenate([c[key] for c in candidates]) for key in front}
+        merged_objectives = np.concatenate(candidate_objectives)
+        keep = pareto_mask(merged_objectives[:, 0], merged_objectives[:, 1], merged_objectives[:, 2])
+        front = {key: values[keep] for key, values in merged.items()}
+        front_objectives = merged_objectives[keep]
+        if progress is not None:
+            progress((n_evaluated + n_pruned) / n_regions)
+
+    order = np.lexsort((front_objectives[:, 1], -front_objectives[:, 0]))
+    frontier = {key: values[front["region"][order]] for key, values in regions.items()}
+    frontier.update({key: values[front["hunt"][order]] for key, values in hunts.items()})
+    frontier["n_hunts_t2_fantasy_postscript"] = front["split"][order]
+    frontier["max_cycles"] = front_objectives[order, 0]
+    frontier["n_cc_used"] = front_objectives[order, 1]
+    frontier["mallet_cost"] = front_objectives[order, 2]
+
+    stats = {
+        "n_regions": n_regions,
+        "n_evaluated": n_evaluated,
+        "n_pruned": n_pruned,
+        "n_candidates": n_evaluated * n_hunts * N_SPLITS,
+        "elapsed": time.perf_counter() - start_time,
+    }
+    return frontier, stats
+
+
+def sweep_size(settings, levers=tuple(LEVERS), hunt_grid=None):
+    """Rows iter_sweep yields: configurations searched times Fantasy splits."""
+    hunt_grid = {**DEFAULT_HUNT_GRID, **(hunt_grid or {})}
+    n_regions = len(_regions(settings, levers)["bk"])
+    return n_regions * len(_hunt_grid(settings, levers, hunt_grid)["t1w"]) * N_SPLITS
+
+
+def iter_sweep(settings, levers=tuple(LEVERS), hunt_grid=None, chunk_configs=BATCH_CONFIGS):
+    """Simulate every configuration of the chosen levers, without pruning, chunk by chunk.
+
+    This is the full space optimize searches. Yields dicts of flat columns, one row per
+    configuration and Fantasy split: the searched settings keys, the split columns and
+    max_cycles. At most chunk_configs configurations are simulated at a time, so memory
+    stays flat however large the sweep is.
+    """
+    hunt_grid = {**DEFAULT_HUNT_GRID, **(hunt_grid or {})}
+    regions = _regions(settings, levers)
+    hunts = _hunt_grid(settings, levers, hunt_grid)
+    n_hunts = len(hunts["t1w"])
+    stock = {key: settings[key] for key in STOCK_KEYS}
+    n_configs = len(regions["bk"]) * n_hunts
+
+    for start in range(0, n_configs, chunk_configs):
+        config = np.arange(start, min(start + chunk_configs, n_configs))
+        chunk = {key: values[config // n_hunts] for key, values in regions.items()}
+        chunk.update({key: values[config % n_hunts] for key, values in hunts.items()})
+        columns, _, _ = simulate_settings({**chunk, **stock})
+        rows = {key: np.repeat(values, N_SPLITS) for key, values in chunk.items()}
+        rows.update({name: np.broadcast_to(values, (len(config), N_SPLITS)).ravel() for name, values in columns.items()})
+        rows["max_cycles"] = np.minimum(
+            np.minimum(rows["n_cycles_t2"], rows["n_cycles_t3"]), rows["n_cycles_mallets"]
+        )
+        yield rows
@@ -0,0 +1,137 @@
+from dataclasses import dataclass, fields
+from functools import partial
+
+import numpy as np
+
+from cliffs.engine import compute_diamond_multiplier, compute_multiplier
+
+
+def qp_int(query, key, default, min_value=0):
+    """Read an integer query parameter, falling back to default."""
+    val = query.get(key)
+    if val is not None:
+        try:
+            return max(int(val), min_value)
+        except (ValueError, TypeError):
+            pass
+    return default
+
+
+def qp_bool(query, key, default):
+    """Read a boolean query parameter (1/0), falling back to default."""
+    val = query.get(key)
+    if val is not None:
+        return val == "1"
+    return default
+
+
+def qp_radio_index(query, key, default, max_index=2):
+    """Read a radio button index query parameter, falling back to default."""
+    val = query.get(key)
+    if val is not None:
+        try:
+            v = int(val)
+            if 0 <= v <= max_index:
+                return v
+        except (ValueError, TypeError):
+            pass
+    return default
+
+
+@dataclass(frozen=True)
+class SimParams:
+    """One player's sidebar settings. Defaults match a fresh app session."""
+
+    n_hunts_t1_writing: int = 80
+    n_hunts_t2_writing: int = 40
+    cc_writing: bool = True
+    candle_writing: int = 0
+    n_hunts_t3_noto_postscript: int = 13
+    bk: bool = True
+    cc_noto: bool = True
+    candle_noto: int = 1
+    cc_fantasy: bool = True
+    candle_fantasy: int = 2
+    n_t2_mats: int = 1000
+    n_t3_mats: int = 500
+    required_diamonds: int = 355
+    available_diamonds: int = 0
+    n_mallets: int = 50
+    noto_break_block: bool = True
+    fantasy_postscript_break_block: bool = True
+    fantasy_writing_short_only: bool = True
+    fantasy_postscript_extend: bool = True
+    max_cycles_cap: int = 30
+    hunts_per_day: int = 80
+
+    @classmethod
+    def from_query(cls, query):
+        """Build params from saved-URL query parameters; missing or invalid keys use defaults."""
+        return cls(**{name: parse(query) for name, parse in _FIELD_PARSERS})
+
+    def to_settings(self):
+        """Settings dict keyed like the saved URL, with numeric values (see simulate_settings)."""
+        return {key: int(getattr(self, name)) for name, key in QUERY_KEYS.items()}
+
+    def to_query(self):
+        """Query parameters written by the "Save Settings to URL" button."""
+        return {key: str(value) for key, value in self.to_settings().items()}
+
+    @property
+    def writing_multiplier(self):
+        return compute_multiplier(self.cc_writing, self.candle_writing == 1, self.candle_writing == 2)
+
+    @property
+    def noto_postscript_multiplier(self):
+        return compute_multiplier(self.cc_noto, self.candle_noto == 1, self.candle_noto == 2)
+
+    @property
+    def fantasy_postscript_multiplier(self):
+        return compute_multiplier(self.cc_fantasy, self.candle_fantasy == 1, self.candle_fantasy == 2)
+
+    @property
+    def fantasy_diamond_multiplier(self):
+        return compute_diamond_multiplier(self.candle_fantasy == 1, self.candle_fantasy == 2)
+
+
+QUERY_KEYS = {
+    "n_hunts_t1_writing": "t1w",
+    "n_hunts_t2_writing": "t2w",
+    "cc_writing": "ccw",
+    "candle_writing": "cw",
+    "n_hunts_t3_noto_postscript": "t3n",
+    "bk": "bk",
+    "cc_noto": "ccn",
+    "candle_noto": "cn",
+    "cc_fantasy": "ccf",
+    "candle_fantasy": "cf",
+    "n_t2_mats": "t2m",
+    "n_t3_mats": "t3m",
+    "required_diamonds": "rd",
+    "available_diamonds": "ad",
+    "n_mallets": "mal",
+    "noto_break_block": "nbb",
+    "fantasy_postscript_break_block": "fbb",
+    "fantasy_writing_short_only": "fws",
+    "fantasy_postscript_extend": "fpe",
+    "max_cycles_cap": "cap",
+    "hunts_per_day": "hpd",
+}
+
+
+def _field_parser(field):
+    key = QUERY_KEYS[field.name]
+    if field.name.startswith("candle_"):
+        return partial(qp_radio_index, key=key, default=field.default)
+    if field.type is bool:
+        return partial(qp_bool, key=key, default=field.default)
+    min_value = 1 if field.name in ("max_cycles_cap", "hunts_per_day") else 0
+    return partial(qp_int, key=key, default=field.default, min_value=min_value)
+
+
+_FIELD_PARSERS = [(field.name, _field_parser(field)) for field in fields(SimParams)]
+
+
+def settings_from_queries(queries):
+    """Columnar settings arrays for many saved-URL query dicts, parsed like SimParams.from_query."""
+    return {QUERY_KEYS[name]: np.array([int(parse(query)) for query in queries]) for name, parse in _FIELD_PARSERS}
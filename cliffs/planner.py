@@ -0,0 +1,203 @@
+"""Exact integer event plan: the allocation that earns the most diamonds before the deadline.
+
+With a fixed number of hunts left, every cycle's writing hunts also cost time, so the
+plan trades T1 writing hunts (T2 materials) against cycle length. For one choice of
+candles and CC the cycle limit is
+
+    min(T2 cycles(t1w), T3 cycles, mallet cycles, remaining hunts / cycle_hunts(t1w, t2w))
+
+where T2 cycles rise with t1w and time cycles fall with it, so the best integer t1w is
+the floor or ceiling of the crossing point. That is solved in closed form for every
+(t2w, t3n, Fantasy split), and candle/CC combinations are searched branch-and-bound:
+mallet and time limits bound each one before its hunt grid is evaluated.
+"""
+
+import itertools
+import time
+
+import numpy as np
+
+from cliffs.core import CONSTRAINT_LABELS, binding_index
+from cliffs.engine import (
+    FANTASY_POSTSCRIPT_HUNTS,
+    FANTASY_POSTSCRIPT_RATE,
+    N_SPLITS,
+    T1_WRITING_T2_RATE,
+    T2_MATS_PER_HUNT,
+    T2_WRITING_T3_RATE,
+    T3_MATS_PER_NOTO_HUNT,
+    baitkeep_discount,
+    cycle_hunts,
+    settings_multipliers,
+    simulate_settings,
+)
+
+PLAN_LEVERS = {
+    "hunts": ("t1w", "t2w", "t3n"),
+    "candles": ("cw", "cn", "cf"),
+    "cc": ("ccw", "ccn", "ccf"),
+}
+
+# Inclusive (min, max) hunt counts searched when the hunts lever is on.
+DEFAULT_PLAN_BOUNDS = {"t1w": (0, 200), "t2w": (0, 100), "t3n": (0, 26)}
+
+EPSILON = 1e-9
+
+
+def _boost_choices(settings, levers):
+    """Every candle/CC combination searched and its cost (CC phases first, then candle strength)."""
+    keys = PLAN_LEVERS["candles"] + PLAN_LEVERS["cc"]
+    choices = [
+        (0, 1, 2) if key in PLAN_LEVERS["candles"] and "candles" in levers
+        else (0, 1) if key in PLAN_LEVERS["cc"] and "cc" in levers
+        else (settings[key],)
+        for key in keys
+    ]
+    combos = np.array(list(itertools.product(*choices)), dtype=int)
+    cost = combos[:, 3:].sum(axis=1) * 10 + combos[:, :3].sum(axis=1)
+    return {key: combos[:, i] for i, key in enumerate(keys)}, cost
+
+
+def _best_hunts(t2m, t3m, mallet_cycles, remaining_hunts, wm, fm, t3_per_hunt, bounds, min_writing_hunts):
+    """Best (t1w, t2w, t3n, split) and its cycles for one candle/CC choice, solved exactly."""
+    t2w = np.arange(bounds["t2w"][0], bounds["t2w"][1] + 1)[:, None, None]
+    t3n = np.arange(bounds["t3n"][0], bounds["t3n"][1] + 1)[None, :, None]
+    split = np.arange(N_SPLITS)[None, None, :]
+    t1_lo = np.maximum(bounds["t1w"][0], min_writing_hunts - t2w)
+    t1_hi = bounds["t1w"][1]
+
+    # T2 deficit per cycle is a - b * t1w; time cycles are remaining / cycle_hunts(t1w, t2w).
+    a = T2_MATS_PER_HUNT * (t2w + split) - FANTASY_POSTSCRIPT_RATE * fm * (FANTASY_POSTSCRIPT_HUNTS - split)
+    b = T1_WRITING_T2_RATE * wm
+    denominator = t2m + remaining_hunts * b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing = (remaining_hunts * a - t2m * cycle_hunts(0, t2w)) / denominator
+    crossing = np.nan_to_num(crossing, nan=0, posinf=t1_hi, neginf=0)
+    candidates = np.clip(np.stack((np.floor(crossing), np.ceil(crossing))), t1_lo, t1_hi)
+
+    t3_deficit = t3n * t3_per_hunt - (t2w * T2_WRITING_T3_RATE * wm + split * FANTASY_POSTSCRIPT_RATE * fm)
+    t3_cycles = np.where(t3_deficit > 0, t3m / np.where(t3_deficit > 0, t3_deficit, 1), np.inf)
+    t2_deficit = a - b * candidates
+    t2_cycles = np.where(t2_deficit > 0, t2m / np.where(t2_deficit > 0, t2_deficit, 1), np.inf)
+    time_cycles = remaining_hunts / cycle_hunts(candidates, t2w)
+    cycles = np.minimum(np.minimum(np.minimum(t2_cycles, t3_cycles), time_cycles), mallet_cycles)
+    # T2 writing counts too large to reach min_writing_hunts within the T1 bound are infeasible.
+    cycles = np.where(t1_lo <= t1_hi, cycles, -np.inf)
+
+    # Among allocations tied on cycles, take the shortest cycle (fewest writing hunts).
+    writing_hunts = np.where(cycles >= cycles.max() - EPSILON, candidates + t2w, np.inf)
+    best = np.unravel_index(np.argmin(writing_hunts), cycles.shape)
+    _, i2, i3, s = best
+    return {
+        "t1w": int(candidates[best]),
+        "t2w": int(t2w[i2, 0, 0]),
+        "t3n": int(t3n[0, i3, 0]),
+        "n_hunts_t2_fantasy_postscript": int(s),
+    }, float(cycles[best]), cycles.size
+
+
+def plan_event(settings, remaining_hunts, levers=tuple(PLAN_LEVERS), bounds=None, min_writing_hunts=0):
+    """Integer allocation that maximizes diamonds earned from the hunts left in the event.
+
+    settings holds the sidebar values keyed like the saved URL; stockpiles, diamonds,
+    Baitkeep and mallet strategies always come from it, as do levers not being searched.
+    min_writing_hunts requires t1w + t2w to be at least that many (the writing phase length).
+    Diamonds count up to the remaining target (required minus available), so once the
+    target is reachable ties go to fewer CC phases, then weaker candles, then more cycles,
+    then fewer writing hunts.
+
+    Returns (plan, stats). plan holds the chosen settings (t1w, t2w, t3n, candles, CC and
+    n_hunts_t2_fantasy_postscript) with cycles, diamonds, binding constraint, n_cc_used
+    and hunts_per_cycle; stats reports combinations searched/pruned and elapsed time.
+    """
+    start_time = time.perf_counter()
+    bounds = {**DEFAULT_PLAN_BOUNDS, **(bounds or {})}
+    if "hunts" not in levers:
+        bounds = {key: (settings[key], settings[key]) for key in PLAN_LEVERS["hunts"]}
+    remaining_hunts = max(float(remaining_hunts), 0.0)
+    target = max(settings["rd"] - settings["ad"], 0)
+
+    boosts, cost = _boost_choices(settings, levers)
+    n_combos = len(cost)
+    boosted = {**settings, **boosts}
+    multipliers = np.column_stack(np.broadcast_arrays(*settings_multipliers(boosted))).astype(float)
+    # Mallet cycles depend only on the boosts, so one pass bounds every combination.
+    columns, diamonds_per_cycle, _ = simulate_settings(boosted)
+    mallet_cycles = np.where(columns["net_mallets"][:, 0] < 0, columns["n_cycles_mallets"][:, 0], np.inf)
+    shortest_writing = max(bounds["t1w"][0] + bounds["t2w"][0], min_writing_hunts)
+    time_ub = remaining_hunts / cycle_hunts(shortest_writing, 0)
+    diamonds_ub = np.minimum(diamonds_per_cycle * np.minimum(mallet_cycles, time_ub), target)
+    t3_per_hunt = T3_MATS_PER_NOTO_HUNT * baitkeep_discount(settings["bk"])
+
+    best = None
+    best_diamonds, best_cost, best_cycles = -np.inf, np.inf, -np.inf
+    seen = set()
+    n_evaluated = n_pruned = n_candidates = 0
+    # Highest bound first, cheapest first among equal bounds.
+    for c in np.lexsort((cost, -diamonds_ub)):
+        key = tuple(multipliers[c])
+        bound_beaten = diamonds_ub[c] < best_diamonds - EPSILON or (
+            diamonds_ub[c] <= best_diamonds + EPSILON and cost[c] >= best_cost
+        )
+        # Combinations sharing multipliers plan identically, and the cheapest comes first.
+        if bound_beaten or key in seen:
+            n_pruned += 1
+            continue
+        seen.add(key)
+        n_evaluated += 1
+        hunts, cycles, n_points = _best_hunts(
+            settings["t2m"], settings["t3m"], mallet_cycles[c], remaining_hunts,
+            multipliers[c, 0], multipliers[c, 2], t3_per_hunt, bounds, min_writing_hunts,
+        )
+        n_candidates += n_points
+        diamonds = min(diamonds_per_cycle[c] * cycles, target)
+        tied = abs(diamonds - best_diamonds) <= EPSILON
+        if diamonds > best_diamonds + EPSILON or (tied and (cost[c], -cycles) < (best_cost, -best_cycles)):
+            best = (c, hunts)
+            best_diamonds, best_cost, best_cycles = diamonds, cost[c], cycles
+
+    if best is None:
+        raise ValueError("No hunt allocation within the bounds reaches the minimum writing hunts.")
+    c, hunts = best
+    plan = {key: int(values[c]) for key, values in boosts.items()}
+    plan.update(hunts)
+    plan.update(describe_plan({**settings, **plan}, remaining_hunts))
+    stats = {
+        "n_combinations": n_combos,
+        "n_evaluated": n_evaluated,
+        "n_pruned": n_pruned,
+        "n_candidates": n_candidates,
+        "elapsed": time.perf_counter() - start_time,
+    }
+    return plan, stats
+
+
+def describe_plan(settings, remaining_hunts):
+    """Cycles, diamonds, binding constraint and CC used for one settings dict and Fantasy split.
+
+    settings also carries n_hunts_t2_fantasy_postscript; results come from the simulator so
+    they match the rest of the app. Diamonds count up to the remaining target, as in plan_event.
+    """
+    columns, diamonds_per_cycle, required_cycles = simulate_settings(settings)
+    split = settings["n_hunts_t2_fantasy_postscript"]
+    hunts_per_cycle = cycle_hunts(settings["t1w"], settings["t2w"])
+    limits = (
+        columns["n_cycles_t2"][split],
+        columns["n_cycles_t3"][split],
+        columns["n_cycles_mallets"][split],
+        remaining_hunts / hunts_per_cycle,
+    )
+    binding = int(binding_index(limits))
+    cycles = float(min(limits))
+    cc_hunts_per_cycle = (
+        settings["ccw"] * (settings["t1w"] + settings["t2w"])
+        + settings["ccn"] * settings["t3n"]
+        + settings["ccf"] * FANTASY_POSTSCRIPT_HUNTS
+    )
+    return {
+        "cycles": cycles,
+        "diamonds": min(float(diamonds_per_cycle) * cycles, float(max(settings["rd"] - settings["ad"], 0))),
+        "binding_constraint": CONSTRAINT_LABELS[binding],
+        "n_cc_used": max(float(min(cycles, required_cycles)), 0.0) * cc_hunts_per_cycle,
+        "hunts_per_cycle": hunts_per_cycle,
+    }
@@ -0,0 +1,163 @@
+"""Opt-in per-rerun profiling: stage timers, allocation tracking and structured logs.
+
+Profiling is off unless the CLIFFS_PROFILE environment variable is set (to anything but
+"0") or the page URL carries ?profile=1. Each rerun gets a RerunProfiler; code wraps hot
+sections in profiler.stage(name) (nestable) or closes a straight-line section with
+profiler.checkpoint(name). A disabled profiler's stages are no-ops.
+
+Allocations come from tracemalloc, which is process-wide and slows every session down, so
+they are only traced when CLIFFS_PROFILE is set; ?profile=1 on its own gives stage timings.
+Concurrent sessions' allocations show up in each other's numbers. A fragment that reruns
+on its own (without the rest of the page) profiles into its own record via
+fragment_profiler, since its page's rerun has already finished. Setting CLIFFS_PROFILE_LOG to a file path (or "-" for stderr) writes
+one JSON line per rerun to the "cliffs.profile" logger for aggregation across sessions.
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROFILE_ENV = "CLIFFS_PROFILE"
+PROFILE_LOG_ENV = "CLIFFS_PROFILE_LOG"
+PROFILE_QUERY_KEY = "profile"
+
+logger = logging.getLogger("cliffs.profile")
+
+
+def _configure_logging():
+    target = os.environ.get(PROFILE_LOG_ENV)
+    if not target or logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr) if target == "-" else logging.FileHandler(target)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+_configure_logging()
+
+
+def allocation_tracking_enabled():
+    """Whether the server was started with profiling on, so tracemalloc may run process-wide."""
+    return os.environ.get(PROFILE_ENV, "0") not in ("", "0")
+
+
+def profiling_enabled(query=None):
+    """Whether profiling is switched on by environment variable or query parameter."""
+    if allocation_tracking_enabled():
+        return True
+    return query is not None and query.get(PROFILE_QUERY_KEY, "0") not in ("", "0", "false")
+
+
+class RerunProfiler:
+    """Stage timings and traced allocations for one script run."""
+
+    def __init__(self, enabled, track_allocations=None):
+        if track_allocations is None:
+            track_allocations = allocation_tracking_enabled()
+        self.enabled = enabled
+        self.track_allocations = track_allocations
+        self.stages = []
+        self.context = {}
+        self.record = None  # set by finish
+        self._track = enabled and track_allocations
+        self._open = []  # per open stage: [start traced bytes, highest peak seen by children]
+        if self._track and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._start = self._mark = time.perf_counter()
+        self._mark_memory = self._reset_peak()
+
+    def _reset_peak(self):
+        """Traced bytes now, after folding the current peak into the open stages and resetting it."""
+        if not self._track:
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._open:
+            frame[1] = max(frame[1], peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _memory_since(self, start_bytes, child_peak=0):
+        if not self._track:
+            return None, None
+        current, peak = tracemalloc.get_traced_memory()
+        return current - start_bytes, max(peak, child_peak) - start_bytes
+
+    def _record(self, name, depth, seconds=None, allocated=None, peak=None):
+        entry = {"stage": name, "depth": depth, "seconds": seconds, "allocated_bytes": allocated, "peak_bytes": peak}
+        self.stages.append(entry)
+        return entry
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block (and its allocations) as one stage."""
+        if not self.enabled:
+            yield
+            return
+        # Recorded on entry so nested stages are listed after their parent.
+        entry = self._record(name, len(self._open))
+        frame = [self._reset_peak(), 0]
+        self._open.append(frame)
+        start = self._mark = time.perf_counter()
+        self._mark_memory = frame[0]
+        try:
+            yield
+        finally:
+            entry["seconds"] = time.perf_counter() - start
+            entry["allocated_bytes"], entry["peak_bytes"] = self._memory_since(*frame)
+            self._open.pop()
+            self._mark = time.perf_counter()
+            self._mark_memory = self._reset_peak()
+
+    def checkpoint(self, name):
+        """Record everything since the last stage boundary or checkpoint as one stage."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        allocated, peak = self._memory_since(self._mark_memory)
+        self._record(name, len(self._open), now - self._mark, allocated, peak)
+        self._mark = now
+        self._mark_memory = self._reset_peak()
+
+    def note(self, **fields):
+        """Attach extra fields (page, cache hit, ...) to this rerun's record."""
+        self.context.update(fields)
+
+    def finish(self):
+        """Close the rerun and return its record; also logs it as JSON when logging is configured."""
+        record = {
+            "event": "rerun",
+            "timestamp": time.time(),
+            "total_seconds": time.perf_counter() - self._start,
+            "traced_bytes": tracemalloc.get_traced_memory()[0] if self._track else None,
+            **self.context,
+            "stages": self.stages,
+        }
+        if self.enabled and logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record))
+        self.record = record
+        return record
+
+
+@contextmanager
+def fragment_profiler(profiler, name):
+    """Profiler for the stages of a fragment.
+
+    During a full rerun this is the rerun's own profiler. When the fragment reruns on its
+    own, that profiler has already finished, so a new one records the fragment rerun and is
+    finished (and logged) on exit, with fragment=name in its record.
+    """
+    if profiler.record is None:
+        yield profiler
+        return
+    fragment = RerunProfiler(profiler.enabled, profiler.track_allocations)
+    fragment.note(**{key: value for key, value in profiler.context.items() if key != "recomputed"}, fragment=name)
+    try:
+        yield fragment
+    finally:
+        fragment.finish()
@@ -0,0 +1,76 @@
+"""Stockpile projections over cycles for every Fantasy split at once.
+
+Linear trajectories are stock + net * cycle; stepped ones come from the discrete engine
+in cliffs.stepping. Each split is sampled on its own grid of at most POINT_BUDGET whole
+cycles, so chart payloads stay small however long the horizon is, and the exact cycle
+each resource hits zero is returned separately instead of being read off the chart.
+The stepped engine loops once per cycle, so it is only run up to UNCONSTRAINED cycles (as
+in compare_with_linear); stepped values past that are NaN.
+"""
+
+import math
+
+import numpy as np
+
+from cliffs.engine import UNCONSTRAINED, simulate_settings
+from cliffs.stepping import RESOURCES, step_cycles
+
+POINT_BUDGET = 200
+
+# Stock, net-per-cycle and cycle-limit columns for each of RESOURCES.
+_RESOURCE_COLUMNS = (
+    ("t2m", "net_t2_mats", "n_cycles_t2"),
+    ("t3m", "net_t3_mats", "n_cycles_t3"),
+    ("mal", "net_mallets", "n_cycles_mallets"),
+)
+_HISTORY_KEYS = ("t2_history", "t3_history", "mallets_history")
+
+
+def sample_grid(horizons, n_points=POINT_BUDGET):
+    """Whole cycles from 0 to each horizon, evenly thinned to n_points rows (both ends kept).
+
+    Returns shape (n, len(horizons)); a horizon shorter than n repeats cycles.
+    """
+    horizons = np.asarray(horizons)
+    n = min(n_points, int(horizons.max()) + 1)
+    return np.round(np.linspace(0, 1, n)[:, None] * horizons).astype(int)
+
+
+def project(settings, n_points=POINT_BUDGET, stepped=True):
+    """Projected stock of every resource for all 14 splits of one settings dict.
+
+    Each split is projected until it runs out of something or reaches the diamond target
+    (plus one cycle, as on the Simulator page). Returns a dict with:
+
+    - cycles: whole cycles sampled per split, shape (n, 14) (see sample_grid);
+    - horizon: last cycle projected per split, shape (14,);
+    - linear / stepped: {resource: (n, 14) array} for each of RESOURCES (stepped values
+      are NaN after the split stops or past UNCONSTRAINED cycles);
+    - zero_crossing: {resource: (14,)} exact cycle the linear stock reaches zero (inf if
+      it never does);
+    - stepped_stop: (14,) cycle at which the stepped engine stops (inf if not within the
+      projection).
+    """
+    columns, _, required_cycles = simulate_settings(settings)
+    limits = np.minimum.reduce([columns[limit] for _, _, limit in _RESOURCE_COLUMNS])
+    split_horizon = np.floor(np.minimum(limits, required_cycles)).clip(0).astype(int) + 1
+    cycles = sample_grid(split_horizon, n_points)
+
+    result = {"cycles": cycles, "horizon": split_horizon, "linear": {}, "zero_crossing": {}}
+    for resource, (stock_key, net_key, limit_key) in zip(RESOURCES, _RESOURCE_COLUMNS):
+        net = columns[net_key]
+        result["linear"][resource] = settings[stock_key] + cycles * net
+        result["zero_crossing"][resource] = np.where(net < 0, columns[limit_key], math.inf)
+
+    if stepped:
+        stepped_horizon = min(int(split_horizon.max()), UNCONSTRAINED)
+        steps = step_cycles(settings, max_cycles=stepped_horizon, record=True)
+        # History rows stop once every split has stopped; later rows repeat the final stock.
+        rows = np.minimum(cycles, len(steps["t2_history"]) - 1)
+        after_stop = (cycles > steps["completed_cycles"] + 1) | (cycles > stepped_horizon)
+        result["stepped"] = {
+            resource: np.where(after_stop, np.nan, np.take_along_axis(steps[history_key], rows, axis=0))
+            for resource, history_key in zip(RESOURCES, _HISTORY_KEYS)
+        }
+        result["stepped_stop"] = np.where(steps["cycles"] < UNCONSTRAINED, steps["cycles"], math.inf)
+    return result
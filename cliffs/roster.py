@@ -0,0 +1,100 @@
+"""Roster mode: many players' saved configurations evaluated and ranked in one batched pass.
+
+A roster is a list of saved settings, one player per line, as bookmark URLs / query
+strings, JSONL records or CSV rows with a header (the batch CLI's input formats). All
+players go through simulate_settings and summarize together as one batch, so a roster
+of several hundred players costs about as much as a single simulation.
+"""
+
+import io
+
+import numpy as np
+
+from cliffs.cli import ID_KEYS, read_records
+from cliffs.core import CONSTRAINT_LABELS, summarize
+from cliffs.engine import N_SPLITS, cycle_hunts, simulate_settings
+from cliffs.export import write_chunks
+from cliffs.params import settings_from_queries
+
+ROSTER_FIELDS = [
+    "player",
+    "best_t1_fantasy_hunts",
+    "best_t2_fantasy_hunts",
+    "binding_constraint",
+    "effective_cycles",
+    "required_cycles",
+    "diamonds",
+    "diamond_deficit",
+    "n_cc_used",
+    "reaches_target",
+]
+
+
+def roster_format(text):
+    """Input format of a pasted roster: jsonl, csv (a header line without "=") or query."""
+    first = next((line.strip() for line in text.splitlines() if line.strip() and not line.lstrip().startswith("#")), "")
+    if first.startswith("{"):
+        return "jsonl"
+    if "=" not in first and "," in first:
+        return "csv"
+    return "query"
+
+
+def parse_roster(text, input_format=None):
+    """One saved-URL query dict per player in a pasted or uploaded roster."""
+    return list(read_records(text.splitlines(keepends=True), input_format or roster_format(text)))
+
+
+def evaluate_roster(records, remaining_days=None):
+    """Best split, binding constraint, diamond deficit and CC used of every player, as columns.
+
+    Players without an id / name / player key are numbered by their line. The time
+    constraint is included when remaining_days is given. diamonds are those earned in the
+    effective cycles (capped at the target), diamond_deficit how many short of it. Players
+    already past their target need no cycles, so required cycles and CC used are never negative.
+    """
+    batch = settings_from_queries(records)
+    columns, n_diamonds_per_cycle, required_cycles = simulate_settings(batch)
+    required_cycles = np.maximum(required_cycles, 0)
+    n_cycles_time = None
+    if remaining_days is not None:
+        n_cycles_time = remaining_days * batch["hpd"] / cycle_hunts(batch["t1w"], batch["t2w"])
+    summary = summarize(columns, required_cycles, n_cycles_time)
+
+    target = np.maximum(batch["rd"] - batch["ad"], 0)
+    earned = np.minimum(np.minimum(summary["effective_cycles"], required_cycles) * n_diamonds_per_cycle, target)
+    earned = np.where(np.isfinite(earned), earned, target)
+    deficit = np.where(n_diamonds_per_cycle > 0, summary["cycle_deficit"] * n_diamonds_per_cycle, target)
+    ids = [next((record[key] for key in ID_KEYS if key in record), None) for record in records]
+    return {
+        "player": [f"Player {i + 1}" if value is None else value for i, value in enumerate(ids)],
+        "best_t1_fantasy_hunts": N_SPLITS - 1 - summary["best_split"],
+        "best_t2_fantasy_hunts": summary["best_split"],
+        "binding_constraint": [CONSTRAINT_LABELS[i] for i in summary["binding"]],
+        "effective_cycles": summary["effective_cycles"],
+        "required_cycles": required_cycles,
+        "diamonds": earned,
+        "diamond_deficit": deficit,
+        "n_cc_used": np.clip(summary["n_cc_used"], 0, None),
+        "reaches_target": deficit <= 0,
+    }
+
+
+def roster_totals(roster):
+    """Aggregate totals of an evaluate_roster result."""
+    labels, counts = np.unique(roster["binding_constraint"], return_counts=True)
+    return {
+        "n_players": len(roster["player"]),
+        "n_reaching_target": int(np.sum(roster["reaches_target"])),
+        "diamonds": float(np.sum(roster["diamonds"])),
+        "diamond_deficit": float(np.sum(roster["diamond_deficit"])),
+        "n_cc_used": float(np.sum(roster["n_cc_used"])),
+        "binding_counts": {label: int(count) for label, count in zip(labels.tolist(), counts)},
+    }
+
+
+def export_roster(roster, export_format):
+    """An evaluate_roster result serialized in one of export.EXPORT_FORMATS, as bytes."""
+    buffer = io.BytesIO()
+    write_chunks([roster], export_format, buffer, ROSTER_FIELDS)
+    return buffer.getvalue()
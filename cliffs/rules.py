@@ -0,0 +1,205 @@
+"""Rule sets compiled into coefficient matrices, to evaluate and compare them in bulk.
+
+Every per-cycle quantity of the model is linear in a few features of a configuration
+that do not depend on the rules (FEATURES): hunt counts times the CC / candle indicators
+of their phase, the Baitkeep and mallet-strategy flags, and a constant. compile_rule_sets
+turns each rule set (engine.load_rule_set) into a weight matrix W, so for configurations X
+
+    X @ W = [net T2 per cycle for every split | net T3 for every split |
+             net mallets | diamonds per cycle | CC hunts per cycle]
+
+and the cycle limits follow from one division and a min, as in core.summarize. Stacking
+the matrices of many rule sets evaluates every (rule set, configuration) pair in one
+matmul; rule sets with fewer Fantasy postscript hunts have their extra splits masked out.
+
+Results match simulate_settings on the same rules up to floating-point rounding.
+"""
+
+import numpy as np
+
+from cliffs.core import summarize
+from cliffs.engine import NO_EXTEND_PROBABILITY, RATES_PATH, cycles_until_empty, load_rates
+
+# Per phase: the CC setting and the candle setting whose bonuses multiply its drops.
+PHASE_BOOSTS = {"writing": ("ccw", "cw"), "noto": ("ccn", "cn"), "fantasy": ("ccf", "cf")}
+BOOSTS = ("base", "cc", "white_candle", "red_candle")
+
+FEATURES = (
+    *(f"t1w*writing_{boost}" for boost in BOOSTS),
+    *(f"t2w*writing_{boost}" for boost in BOOSTS),
+    *(f"noto_{boost}" for boost in BOOSTS),
+    *(f"fantasy_{boost}" for boost in BOOSTS),
+    "t2w",
+    "t3n",
+    "t3n*bk",
+    "t3n*ccn",
+    "nbb",
+    "fbb",
+    "fws",
+    "fpe",
+    "constant",
+)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+
+def _boosts(settings, phase):
+    """base, CC, White Candle and Red Candle indicators of a phase, shaped (*batch, 4)."""
+    cc, candle = (np.asarray(settings[key]) for key in PHASE_BOOSTS[phase])
+    return np.stack(np.broadcast_arrays(np.ones_like(cc), cc, candle == 1, candle == 2), axis=-1).astype(float)
+
+
+def features(settings):
+    """Rule-independent FEATURES of the configurations in a settings dict, shaped (*batch, len(FEATURES))."""
+    value = {key: np.asarray(settings[key], dtype=float) for key in ("t1w", "t2w", "t3n", "bk", "ccn")}
+    writing = _boosts(settings, "writing")
+    columns = [
+        value["t1w"][..., np.newaxis] * writing,
+        value["t2w"][..., np.newaxis] * writing,
+        _boosts(settings, "noto"),
+        _boosts(settings, "fantasy"),
+    ]
+    flags = [
+        value["t2w"],
+        value["t3n"] * (1 - value["bk"]),
+        value["t3n"] * value["bk"],
+        value["t3n"] * value["ccn"],
+        *(np.asarray(settings[key], dtype=float) for key in ("nbb", "fbb", "fws", "fpe")),
+    ]
+    shape = np.broadcast_shapes(*(np.shape(c)[:-1] for c in columns), *(np.shape(f) for f in flags))
+    columns = [np.broadcast_to(c, shape + c.shape[-1:]) for c in columns]
+    flags = [np.broadcast_to(f, shape)[..., np.newaxis] for f in flags]
+    return np.concatenate(columns + flags + [np.ones(shape + (1,))], axis=-1)
+
+
+def rule_set_rates(rule_set, rates_path=RATES_PATH):
+    """Rates a rule set runs on: defaults, then the calibrated table, then the rule set's own rates."""
+    return {**load_rates(rates_path), **rule_set["rates"]}
+
+
+def compile_rule_set(rule_set, n_splits=None, rates=None):
+    """Weight matrix of one rule set, shaped (len(FEATURES), 2 * n_splits + 3).
+
+    n_splits pads the split axis for stacking with rule sets that have more Fantasy
+    postscript hunts (padded splits get zero weights).
+    """
+    rules = rule_set["rules"]
+    rates = rates or rule_set_rates(rule_set)
+    n_fantasy = rules["fantasy_postscript_hunts"]
+    n_splits = n_splits or n_fantasy + 1
+    multiplier = np.array([1, rules["cc_bonus"], rules["white_candle_bonus"], rules["red_candle_bonus"]], dtype=float)
+    diamond_multiplier = np.array(
+        [1, 0, rules["white_candle_diamond_bonus"], rules["red_candle_diamond_bonus"]], dtype=float
+    )
+    extend_probability = rates["noto_extend_probability"]
+    average_noto_hunts = (
+        NO_EXTEND_PROBABILITY * rules["noto_postscript_hunts"]
+        + extend_probability * rules["noto_extended_postscript_hunts"]
+    ) / (NO_EXTEND_PROBABILITY + extend_probability)
+
+    def rows(prefix):
+        return slice(FEATURE_INDEX[f"{prefix}_base"], FEATURE_INDEX[f"{prefix}_base"] + len(BOOSTS))
+
+    weights = np.zeros((len(FEATURES), 2 * n_splits + 3))
+    net_mallets, diamonds, cc_hunts = 2 * n_splits, 2 * n_splits + 1, 2 * n_splits + 2
+    t2_cost, t3_cost = rules["t2_mats_per_hunt"], rules["t3_mats_per_noto_hunt"]
+    for split in range(n_fantasy + 1):
+        t2, t3 = split, n_splits + split
+        weights[rows("t1w*writing"), t2] = rates["t1_writing_t2"] * multiplier
+        weights[rows("fantasy"), t2] = rates["fantasy_postscript_mats"] * (n_fantasy - split) * multiplier
+        weights[FEATURE_INDEX["t2w"], t2] = -t2_cost
+        weights[FEATURE_INDEX["constant"], t2] = -t2_cost * split
+        weights[rows("t2w*writing"), t3] = rates["t2_writing_t3"] * multiplier
+        weights[rows("fantasy"), t3] = rates["fantasy_postscript_mats"] * split * multiplier
+        weights[FEATURE_INDEX["t3n"], t3] = -t3_cost
+        weights[FEATURE_INDEX["t3n*bk"], t3] = -t3_cost / (1 + rules["baitkeep_rate"])
+
+    writing_mallets = rates["fantasy_writing_mallets"] * rules["fantasy_writing_hunts"]
+    short_only_mallets = rates["fantasy_writing_short_mallets"] * rules["fantasy_writing_hunts"]
+    weights[rows("noto"), net_mallets] = rates["noto_mallets"] * average_noto_hunts * multiplier
+    weights[rows("fantasy"), net_mallets] = rates["fantasy_mallets"] * n_fantasy * multiplier
+    weights[FEATURE_INDEX["constant"], net_mallets] = -(
+        rules["noto_writing_mallets"] + extend_probability * rules["extend_mallets"] + writing_mallets
+    )
+    weights[FEATURE_INDEX["nbb"], net_mallets] = -rules["break_block_mallets"]
+    weights[FEATURE_INDEX["fbb"], net_mallets] = -rules["break_block_mallets"]
+    weights[FEATURE_INDEX["fws"], net_mallets] = -(short_only_mallets - writing_mallets)
+    weights[FEATURE_INDEX["fpe"], net_mallets] = -rules["extend_mallets"]
+
+    weights[rows("fantasy"), diamonds] = rules["diamonds_per_cycle"] * diamond_multiplier
+    for feature in ("t1w*writing_cc", "t2w*writing_cc", "t3n*ccn"):
+        weights[FEATURE_INDEX[feature], cc_hunts] = 1
+    weights[FEATURE_INDEX["fantasy_cc"], cc_hunts] = n_fantasy
+    return weights
+
+
+def compile_rule_sets(rule_sets):
+    """Stacked weight matrices of several rule sets, padded to the most Fantasy splits.
+
+    Returns names, weights (n_rule_sets, len(FEATURES), 2 * n_splits + 3), valid (which
+    splits exist in each rule set), postscript_hunts (a cycle's hunts besides writing) and
+    n_splits.
+    """
+    n_splits = max(rule_set["rules"]["fantasy_postscript_hunts"] for rule_set in rule_sets) + 1
+    return {
+        "names": [f"{rule_set['name']} v{rule_set['version']}" for rule_set in rule_sets],
+        "weights": np.stack([compile_rule_set(rule_set, n_splits) for rule_set in rule_sets]),
+        "valid": np.array(
+            [np.arange(n_splits) <= rule_set["rules"]["fantasy_postscript_hunts"] for rule_set in rule_sets]
+        ),
+        "postscript_hunts": np.array(
+            [
+                float(rule_set["rules"]["noto_postscript_hunts"] + rule_set["rules"]["fantasy_postscript_hunts"])
+                for rule_set in rule_sets
+            ]
+        ),
+        "n_splits": n_splits,
+    }
+
+
+def evaluate_rule_sets(settings, compiled, remaining_days=None):
+    """Best split and cycle limits of every configuration under every compiled rule set.
+
+    settings holds saved-URL keys (scalars or arrays with a common batch shape). Returns
+    core.summarize's entries plus required_cycles and n_diamonds_per_cycle, each shaped
+    (n_rule_sets, *batch). The time constraint is included when remaining_days is given.
+    """
+    x = features(settings)
+    batch = x.shape[:-1]
+    n_rule_sets, n_splits = len(compiled["names"]), compiled["n_splits"]
+    y = np.matmul(x.reshape(-1, len(FEATURES)), compiled["weights"]).reshape((n_rule_sets, *batch, -1))
+
+    def per_config(key):
+        return np.asarray(settings[key], dtype=float)
+
+    def per_rule_set(values):
+        return np.reshape(values, (n_rule_sets,) + (1,) * len(batch))
+
+    net_t2, net_t3 = y[..., :n_splits], y[..., n_splits : 2 * n_splits]
+    net_mallets, n_diamonds_per_cycle, cc_hunts = y[..., 2 * n_splits], y[..., 2 * n_splits + 1], y[..., 2 * n_splits + 2]
+    valid = compiled["valid"].reshape((n_rule_sets,) + (1,) * len(batch) + (n_splits,))
+    has_diamonds = n_diamonds_per_cycle > 0
+    required_cycles = np.where(
+        has_diamonds, (per_config("rd") - per_config("ad")) / np.where(has_diamonds, n_diamonds_per_cycle, 1), 0
+    )
+
+    columns = {
+        "n_cycles_t2": np.where(valid, cycles_until_empty(per_config("t2m")[..., np.newaxis], net_t2), -np.inf),
+        "n_cycles_t3": cycles_until_empty(per_config("t3m")[..., np.newaxis], net_t3),
+        "n_cycles_mallets": np.broadcast_to(
+            cycles_until_empty(per_config("mal"), net_mallets)[..., np.newaxis], net_t2.shape
+        ),
+    }
+    limiting_cycles = np.minimum(
+        np.minimum(columns["n_cycles_t2"], columns["n_cycles_t3"]),
+        np.minimum(columns["n_cycles_mallets"], required_cycles[..., np.newaxis]),
+    )
+    columns["n_cc_used"] = np.where(valid, limiting_cycles, 0) * cc_hunts[..., np.newaxis]
+    n_cycles_time = None
+    if remaining_days is not None:
+        hunts_per_cycle = per_config("t1w") + per_config("t2w") + per_rule_set(compiled["postscript_hunts"])
+        n_cycles_time = remaining_days * per_config("hpd") / hunts_per_cycle
+    summary = summarize(columns, required_cycles, n_cycles_time)
+    summary["required_cycles"] = required_cycles
+    summary["n_diamonds_per_cycle"] = n_diamonds_per_cycle
+    return summary
+
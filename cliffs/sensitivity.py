@@ -0,0 +1,109 @@
+"""One-at-a-time sensitivity of the optimal scenario to every sidebar input.
+
+Each input is nudged down and up by one step (hunt counts and stockpiles by a fixed
+amount, candles by one option, checkboxes toggled), and the base settings plus every
+perturbation are simulated together in a single simulate_settings batch. Impacts are
+reported as changes in max cycles, CC used and diamond deficit at each variant's best
+Fantasy split, which is what the Simulator page's tornado chart shows.
+"""
+
+import numpy as np
+
+from cliffs.core import summarize
+from cliffs.engine import CANDLE_OPTIONS, simulate_settings
+
+# Sidebar inputs perturbed, with their step for numeric inputs (None for checkboxes).
+SENSITIVITY_STEPS = {
+    "t1w": 10,
+    "t2w": 10,
+    "ccw": None,
+    "cw": 1,
+    "t3n": 1,
+    "bk": None,
+    "ccn": None,
+    "cn": 1,
+    "ccf": None,
+    "cf": 1,
+    "t2m": 100,
+    "t3m": 100,
+    "ad": 13,
+    "mal": 10,
+    "nbb": None,
+    "fbb": None,
+    "fws": None,
+    "fpe": None,
+}
+
+SENSITIVITY_LABELS = {
+    "t1w": "T1 Writing Hunts",
+    "t2w": "T2 Writing Hunts",
+    "ccw": "CC (Writing)",
+    "cw": "Candle (Writing)",
+    "t3n": "Noto Charging Hunts",
+    "bk": "Baitkeep Charm",
+    "ccn": "CC (Noto)",
+    "cn": "Candle (Noto)",
+    "ccf": "CC (Fantasy)",
+    "cf": "Candle (Fantasy)",
+    "t2m": "T2 Materials",
+    "t3m": "T3 Materials",
+    "ad": "Available Diamonds",
+    "mal": "Mallets",
+    "nbb": "Noto Break Block",
+    "fbb": "Fantasy Break Block",
+    "fws": "Fantasy Writing Short Only",
+    "fpe": "Fantasy Extend Postscript",
+}
+
+IMPACTS = ("max_cycles", "n_cc_used", "diamond_deficit")
+
+
+def _perturbations(settings):
+    """(key, new value) for every valid one-step change, lower value first for each key."""
+    changes = []
+    for key, step in SENSITIVITY_STEPS.items():
+        value = settings[key]
+        if step is None:
+            changes.append((key, 1 - int(bool(value))))
+            continue
+        upper = len(CANDLE_OPTIONS) - 1 if key in ("cw", "cn", "cf") else np.inf
+        changes.extend((key, new) for new in (value - step, value + step) if 0 <= new <= upper)
+    return changes
+
+
+def sensitivity(settings, cycle_cap=None):
+    """Change in the optimal scenario's outcomes for a one-step change of each input.
+
+    settings is keyed like the saved URL. Max cycles are capped at cycle_cap (if given)
+    before differencing, so unconstrained resources do not swamp the chart. Returns a dict
+    of arrays with one entry per perturbation: key, label, value (the perturbed setting),
+    direction (-1 lower / +1 higher than the current value) and delta_<impact> for each
+    of IMPACTS, plus "base" with the unperturbed impacts.
+    """
+    changes = _perturbations(settings)
+    n = len(changes) + 1
+    batch = {key: np.full(n, value) for key, value in settings.items()}
+    for i, (key, value) in enumerate(changes, start=1):
+        batch[key][i] = value
+
+    columns, n_diamonds_per_cycle, required_cycles = simulate_settings(batch)
+    summary = summarize(columns, required_cycles)
+    cap = np.inf if cycle_cap is None else cycle_cap
+    impacts = {
+        "max_cycles": np.minimum(summary["max_cycles"], cap),
+        "n_cc_used": np.clip(summary["n_cc_used"], 0, None),
+        "diamond_deficit": summary["cycle_deficit"] * n_diamonds_per_cycle,
+    }
+
+    keys = np.array([key for key, _ in changes])
+    values = np.array([value for _, value in changes])
+    result = {
+        "key": keys,
+        "label": np.array([SENSITIVITY_LABELS[key] for key in keys]),
+        "value": values,
+        "direction": np.sign(values - np.array([settings[key] for key in keys])),
+        "base": {name: float(impact[0]) for name, impact in impacts.items()},
+    }
+    for name, impact in impacts.items():
+        result[f"delta_{name}"] = impact[1:] - impact[0]
+    return result
@@ -0,0 +1,219 @@
+"""Discrete, phase-by-phase cycle engine.
+
+The linear model in simulate_splits divides each stockpile by its net loss per cycle.
+This engine instead walks every cycle phase by phase (Writing -> Noto -> Fantasy) with
+whole-number inventories:
+
+- a phase's costs come out of the stock on hand when the phase starts, and its drops
+  are only credited when it ends (T2 mats farmed in Writing are not available to the
+  Writing phase's own T2 hunts);
+- hunts that consume materials run only while a full hunt's worth is in stock, so a
+  player can run out partway through a phase;
+- fractional expected drops and costs are credited as whole items using running
+  totals, so long-run rates match the linear model exactly.
+
+All 14 Fantasy splits (and any leading batch of settings) are stepped together.
+"""
+
+import numpy as np
+
+from cliffs.engine import (
+    BAITKEEP_RATE,
+    BREAK_BLOCK_MALLETS,
+    EXTEND_MALLETS,
+    FANTASY_MALLET_RATE,
+    FANTASY_POSTSCRIPT_HUNTS,
+    FANTASY_POSTSCRIPT_RATE,
+    FANTASY_WRITING_HUNTS,
+    FANTASY_WRITING_MALLETS,
+    FANTASY_WRITING_SHORT_MALLETS,
+    N_SPLITS,
+    NOTO_EXTEND_PS_PROBABILITY,
+    NOTO_MALLET_RATE,
+    NOTO_POSTSCRIPT_HUNTS,
+    NOTO_WRITING_MALLETS,
+    T1_WRITING_T2_RATE,
+    T2_MATS_PER_HUNT,
+    T2_WRITING_T3_RATE,
+    T3_MATS_PER_NOTO_HUNT,
+    UNCONSTRAINED,
+    average_noto_ps_hunts,
+    cycle_hunts,
+    settings_multipliers,
+    simulate_settings,
+)
+
+PHASES = ("Writing", "Noto", "Fantasy")
+RESOURCES = ("T2 Materials", "T3 Materials", "Mallets")
+
+
+class _WholeUnits:
+    """Converts a fractional per-cycle flow into whole units using a running total."""
+
+    def __init__(self, per_cycle, rounding):
+        self.per_cycle = per_cycle
+        self.rounding = rounding
+        self.total = np.zeros_like(per_cycle)
+
+    def peek(self):
+        return self.rounding(self.total + self.per_cycle) - self.rounding(self.total)
+
+    def commit(self, mask):
+        self.total = np.where(mask, self.total + self.per_cycle, self.total)
+
+
+def step_cycles(settings, max_cycles=UNCONSTRAINED, record=False):
+    """Step every split cycle by cycle until each one runs out of a resource.
+
+    settings is keyed like the saved URL and may hold arrays (see simulate_settings).
+    Returns a dict of (*batch, 14) arrays:
+
+    - cycles: completed cycles plus the fraction of the stopping cycle's hunts done, out
+      of engine.cycle_hunts (UNCONSTRAINED if the split never runs out within max_cycles);
+    - completed_cycles, stop_phase (index into PHASES), stop_resource (index into
+      RESOURCES) and stop_hunts (hunts done in the stopping phase);
+    - with record=True, t2_history / t3_history / mallets_history holding the stock at
+      the start of every cycle, shape (n_steps + 1, *batch, 14).
+    """
+    def split_axis(key):
+        return np.expand_dims(np.asarray(settings[key], dtype=float), -1)
+
+    writing_multiplier, noto_multiplier, fantasy_multiplier, _ = (
+        np.expand_dims(np.asarray(m, dtype=float), -1) for m in settings_multipliers(settings)
+    )
+    t2f = np.arange(N_SPLITS)
+    t1f = FANTASY_POSTSCRIPT_HUNTS - t2f
+    t1w, t2w, t3n = split_axis("t1w"), split_axis("t2w"), split_axis("t3n")
+
+    per_cycle = {
+        "t1w": t1w,
+        "t2w": t2w,
+        "t3n": t3n,
+        "t1f": t1f,
+        "t2f": t2f,
+        "t3_per_hunt": T3_MATS_PER_NOTO_HUNT * (1 / (1 + (split_axis("bk") * BAITKEEP_RATE))),
+        "writing_t2": t1w * T1_WRITING_T2_RATE * writing_multiplier,
+        "writing_t3": t2w * T2_WRITING_T3_RATE * writing_multiplier,
+        "noto_cost": (
+            split_axis("nbb") * BREAK_BLOCK_MALLETS + NOTO_WRITING_MALLETS + NOTO_EXTEND_PS_PROBABILITY * EXTEND_MALLETS
+        ),
+        "noto_mallets": NOTO_MALLET_RATE * noto_multiplier * average_noto_ps_hunts(),
+        "fantasy_cost": (
+            FANTASY_WRITING_MALLETS * FANTASY_WRITING_HUNTS
+            + split_axis("fws") * ((FANTASY_WRITING_SHORT_MALLETS - FANTASY_WRITING_MALLETS) * FANTASY_WRITING_HUNTS)
+            + split_axis("fbb") * BREAK_BLOCK_MALLETS
+            + split_axis("fpe") * EXTEND_MALLETS
+        ),
+        "fantasy_t2": t1f * FANTASY_POSTSCRIPT_RATE * fantasy_multiplier,
+        "fantasy_t3": t2f * FANTASY_POSTSCRIPT_RATE * fantasy_multiplier,
+        "fantasy_mallets": FANTASY_MALLET_RATE * fantasy_multiplier * FANTASY_POSTSCRIPT_HUNTS,
+        "t2": split_axis("t2m"),
+        "t3": split_axis("t3m"),
+        "mallets": split_axis("mal"),
+    }
+    per_cycle = dict(zip(per_cycle, (a.astype(float) for a in np.broadcast_arrays(*per_cycle.values()))))
+    shape = per_cycle["t2"].shape
+
+    t1w, t2w, t3n, t1f, t2f, t3_per_hunt = (
+        per_cycle[key] for key in ("t1w", "t2w", "t3n", "t1f", "t2f", "t3_per_hunt")
+    )
+    t2, t3, mallets = (per_cycle[key].copy() for key in ("t2", "t3", "mallets"))
+    writing_t2 = _WholeUnits(per_cycle["writing_t2"], np.floor)
+    writing_t3 = _WholeUnits(per_cycle["writing_t3"], np.floor)
+    noto_cost = _WholeUnits(per_cycle["noto_cost"], np.ceil)
+    noto_mallets = _WholeUnits(per_cycle["noto_mallets"], np.floor)
+    fantasy_cost = _WholeUnits(per_cycle["fantasy_cost"], np.ceil)
+    fantasy_t2 = _WholeUnits(per_cycle["fantasy_t2"], np.floor)
+    fantasy_t3 = _WholeUnits(per_cycle["fantasy_t3"], np.floor)
+    fantasy_mallets = _WholeUnits(per_cycle["fantasy_mallets"], np.floor)
+
+    hunts_per_cycle = cycle_hunts(t1w, t2w)
+    running = np.ones(shape, dtype=bool)
+    completed = np.zeros(shape, dtype=int)
+    stop_phase = np.full(shape, -1)
+    stop_resource = np.full(shape, -1)
+    stop_hunts = np.zeros(shape)
+    hunts_before_stop = np.zeros(shape)
+    history = [(t2.copy(), t3.copy(), mallets.copy())] if record else None
+
+    def stop(mask, phase, resource, hunts_done, hunts_earlier):
+        nonlocal running
+        stop_phase[mask] = phase
+        stop_resource[mask] = resource
+        stop_hunts[mask] = hunts_done[mask]
+        hunts_before_stop[mask] = hunts_earlier[mask] + hunts_done[mask]
+        running = running & ~mask
+
+    zero = np.zeros(shape)
+    for _ in range(int(max_cycles)):
+        # Writing: T2 hunts spend T2_MATS_PER_HUNT T2 mats each from the stock on hand.
+        t2_hunts = np.minimum(t2w, np.floor(t2 / T2_MATS_PER_HUNT))
+        short = running & (t2_hunts < t2w)
+        stop(short, 0, 0, t1w + t2_hunts, zero)
+        t2 = np.where(running, t2 - t2w * T2_MATS_PER_HUNT + writing_t2.peek(), t2)
+        t3 = np.where(running, t3 + writing_t3.peek(), t3)
+        writing_t2.commit(running)
+        writing_t3.commit(running)
+        writing_hunts = t1w + t2w
+
+        # Noto: writing/break block/extend mallets up front, then the T3 charging hunts.
+        short = running & (noto_cost.peek() > mallets)
+        stop(short, 1, 2, zero, writing_hunts)
+        mallets = np.where(running, mallets - noto_cost.peek(), mallets)
+        noto_cost.commit(running)
+        t3_hunts = np.minimum(t3n, np.floor(t3 / t3_per_hunt))
+        short = running & (t3_hunts < t3n)
+        stop(short, 1, 1, t3_hunts, writing_hunts)
+        t3 = np.where(running, t3 - t3n * t3_per_hunt, t3)
+        mallets = np.where(running, mallets + noto_mallets.peek(), mallets)
+        noto_mallets.commit(running)
+        noto_hunts = writing_hunts + NOTO_POSTSCRIPT_HUNTS
+
+        # Fantasy: writing/break block/extend mallets up front, then the postscript hunts.
+        short = running & (fantasy_cost.peek() > mallets)
+        stop(short, 2, 2, zero, noto_hunts)
+        mallets = np.where(running, mallets - fantasy_cost.peek(), mallets)
+        fantasy_cost.commit(running)
+        t2_hunts = np.minimum(t2f, np.floor(t2 / T2_MATS_PER_HUNT))
+        short = running & (t2_hunts < t2f)
+        stop(short, 2, 0, t1f + t2_hunts, noto_hunts)
+        t2 = np.where(running, t2 - t2f * T2_MATS_PER_HUNT + fantasy_t2.peek(), t2)
+        t3 = np.where(running, t3 + fantasy_t3.peek(), t3)
+        mallets = np.where(running, mallets + fantasy_mallets.peek(), mallets)
+        for flow in (fantasy_t2, fantasy_t3, fantasy_mallets):
+            flow.commit(running)
+
+        completed += running
+        if record:
+            history.append((t2.copy(), t3.copy(), mallets.copy()))
+        if not running.any():
+            break
+
+    cycles = np.where(running, UNCONSTRAINED, completed + hunts_before_stop / hunts_per_cycle)
+    result = {
+        "cycles": cycles,
+        "completed_cycles": completed,
+        "stop_phase": stop_phase,
+        "stop_resource": stop_resource,
+        "stop_hunts": stop_hunts,
+    }
+    if record:
+        result["t2_history"], result["t3_history"], result["mallets_history"] = (np.stack(h) for h in zip(*history))
+    return result
+
+
+def compare_with_linear(settings, max_cycles=UNCONSTRAINED):
+    """Per-split cycle limits from the linear model next to the stepped engine's stopping point."""
+    columns, _, _ = simulate_settings(settings)
+    linear = np.minimum(np.minimum(columns["n_cycles_t2"], columns["n_cycles_t3"]), columns["n_cycles_mallets"])
+    stepped = step_cycles(settings, max_cycles)
+    return {
+        "n_hunts_t2_fantasy_postscript": columns["n_hunts_t2_fantasy_postscript"],
+        "linear_cycles": linear,
+        "stepped_cycles": stepped["cycles"],
+        "difference": stepped["cycles"] - linear,
+        "completed_cycles": stepped["completed_cycles"],
+        "stop_phase": stepped["stop_phase"],
+        "stop_resource": stepped["stop_resource"],
+        "stop_hunts": stepped["stop_hunts"],
+    }
@@ -0,0 +1,211 @@
+"""Persistent on-disk store for shared model results, in SQLite.
+
+Popular bookmark URLs are opened over and over, so the shared graph nodes (the
+simulation result, the best split and the stockpile projections) are also written to
+disk, keyed by a canonical hash of the saved-URL settings they depend on. Entries
+survive restarts: the most recently used ones are loaded into the in-memory simulation
+cache when the server starts, and the rest are read on a cache miss before anything is
+recomputed.
+
+Every entry records the model version, a hash of the model code and its per-cycle
+coefficients, and entries from any other version are dropped when the store opens. The
+file is capped at max_bytes by evicting the least recently used entries. Values are
+pickled; the store only ever reads back what this app wrote, so keep the file private.
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from cliffs.cache import normalize_setting
+from cliffs.engine import COEFFICIENT_INDEX, RATES, RULE_SET
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored layout or pickled types change shape.
+STORE_FORMAT = 1
+
+# Modules whose source the stored values are derived from. cliffs.graph defines the stored
+# nodes and imports this module, so modules are found by name rather than imported here.
+MODEL_MODULES = ("cliffs.engine", "cliffs.core", "cliffs.graph", "cliffs.projection", "cliffs.stepping")
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "cliffs", "results.sqlite")
+
+
+def model_version():
+    """Hash of the model source, rules, rates and per-cycle coefficients; any change to a constant changes it."""
+    digest = hashlib.sha256(str(STORE_FORMAT).encode())
+    digest.update(json.dumps(RULE_SET, sort_keys=True).encode())
+    digest.update(json.dumps(RATES, sort_keys=True).encode())
+    for module in MODEL_MODULES:
+        with open(importlib.util.find_spec(module).origin, "rb") as f:
+            digest.update(f.read())
+    for name, values in sorted(COEFFICIENT_INDEX.items()):
+        digest.update(name.encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def canonical_settings(settings):
+    """Settings as canonical JSON (sorted keys, normalized numbers), as saved in the URL."""
+    canonical = {key: normalize_setting(value) for key, value in sorted(settings.items())}
+    return json.dumps(canonical, separators=(",", ":"))
+
+
+def settings_digest(settings):
+    """Canonical hash of a settings dict; "80", 80 and 80.0 hash the same."""
+    return hashlib.sha256(canonical_settings(settings).encode()).hexdigest()
+
+
+class ResultStore:
+    """Thread-safe SQLite store of pickled node values, keyed by (settings digest, node name)."""
+
+    def __init__(self, path, max_bytes=256 * 2**20, version=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version or model_version()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.warmed = False
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "digest TEXT NOT NULL, node TEXT NOT NULL, version TEXT NOT NULL, settings TEXT NOT NULL, "
+                "value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL, PRIMARY KEY (digest, node))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+            stale = self._db.execute("DELETE FROM results WHERE version != ?", (self.version,)).rowcount
+        if stale:
+            logger.info("Dropped %d stored results from other model versions", stale)
+
+    def get(self, node, settings, default=None):
+        digest = settings_digest(settings)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM results WHERE digest = ? AND node = ? AND version = ?", (digest, node, self.version)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            self._db.execute("UPDATE results SET used = ? WHERE digest = ? AND node = ?", (time.time(), digest, node))
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, node, settings, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (settings_digest(settings), node, self.version, canonical_settings(settings), blob, len(blob), time.time()),
+            )
+            self.writes += 1
+            self._evict()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for digest, node, size in self._db.execute("SELECT digest, node, size FROM results ORDER BY used").fetchall():
+            self._db.execute("DELETE FROM results WHERE digest = ? AND node = ?", (digest, node))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def get_or_compute(self, node, settings, compute):
+        """Return the stored value, calling compute() and storing its result on a miss.
+
+        Disk errors are logged and treated as misses, so a broken store never breaks a page.
+        """
+        sentinel = object()
+        try:
+            value = self.get(node, settings, sentinel)
+        except (sqlite3.Error, pickle.UnpicklingError, AttributeError, EOFError) as error:
+            logger.warning("Result store read failed: %s", error)
+            value = sentinel
+        if value is sentinel:
+            value = compute()
+            try:
+                self.put(node, settings, value)
+            except sqlite3.Error as error:
+                logger.warning("Result store write failed: %s", error)
+        return value
+
+    def recent(self, limit):
+        """(node, settings, value) for the limit most recently used entries, least recent first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT node, settings, value FROM results WHERE version = ? ORDER BY used DESC LIMIT ?",
+                (self.version, limit),
+            ).fetchall()
+        for node, settings, value in reversed(rows):
+            yield node, json.loads(settings), pickle.loads(value)
+
+    def warm(self, cache, cache_key):
+        """Load recent entries into cache once per process.
+
+        cache_key(node, settings) gives each entry's cache key, or None to skip it.
+        """
+        with self._lock:
+            if self.warmed:
+                return 0
+            self.warmed = True
+        n_loaded = 0
+        try:
+            for node, settings, value in self.recent(cache.max_entries):
+                key = cache_key(node, settings)
+                if key is not None:
+                    cache.put(key, value)
+                    n_loaded += 1
+        except (sqlite3.Error, pickle.UnpicklingError, AttributeError, EOFError) as error:
+            logger.warning("Result store warm-up stopped: %s", error)
+        return n_loaded
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+
+    def stats(self):
+        with self._lock:
+            n_entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": n_entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "version": self.version,
+        }
+
+
+def open_store(path, max_bytes):
+    """ResultStore at path, or None if path is empty or the store cannot be opened (e.g. read-only disk)."""
+    if not path:
+        return None
+    try:
+        return ResultStore(path, max_bytes)
+    except (OSError, sqlite3.Error) as error:
+        logger.warning("Result store disabled, cannot open %s: %s", path, error)
+        return None
+
+
+# Set CLIFFS_STORE_PATH to an empty string to keep results in memory only.
+result_store = open_store(
+    os.environ.get("CLIFFS_STORE_PATH", DEFAULT_PATH),
+    max_bytes=int(float(os.environ.get("CLIFFS_STORE_MB", 256)) * 2**20),
+)
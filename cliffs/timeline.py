@@ -0,0 +1,85 @@
+"""Time side of the event model: a shared clock and the day-by-day binding-constraint schedule.
+
+Every session's event page needs the time left before the event ends. event_clock reads
+the clock at most once per CLOCK_TTL seconds for the whole process, so sessions share one
+remaining_days value (and with it the time nodes of cliffs.graph, which recompute only when
+it moves on) instead of each rerun calling datetime.now.
+
+binding_schedule projects the cycle limits forward: for every day the player could start
+on, time allows fewer cycles while the stockpiles stay as they are, so it shows the day
+time overtakes materials and mallets as the binding limit, and the last day the diamond
+target is still in reach.
+"""
+
+import math
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from cliffs.cache import SimulationCache
+from cliffs.core import CONSTRAINT_LABELS
+from cliffs.engine import EVENT_END, UNCONSTRAINED
+
+SECONDS_PER_DAY = 86400
+
+# Seconds a clock reading is reused across sessions (CLIFFS_CLOCK_TTL).
+CLOCK_TTL = float(os.environ.get("CLIFFS_CLOCK_TTL", 30))
+clock_cache = SimulationCache(max_entries=8, ttl=CLOCK_TTL)
+
+
+def read_clock(event_end=EVENT_END):
+    """Current UTC time and the seconds and days left before event_end (never negative)."""
+    now = datetime.now(timezone.utc)
+    remaining_seconds = max(0.0, (event_end - now).total_seconds())
+    return {"now": now, "remaining_seconds": remaining_seconds, "remaining_days": remaining_seconds / SECONDS_PER_DAY}
+
+
+def event_clock(event_end=EVENT_END, cache=clock_cache):
+    """read_clock, reused by every session until it is CLOCK_TTL seconds old."""
+    return cache.get_or_compute(("event_clock", event_end), lambda: read_clock(event_end))
+
+
+def binding_schedule(best_row, hunts_per_day, remaining_days, required_cycles, hunts_per_cycle):
+    """Cycle limits of the optimal split for each whole day from today to the event end.
+
+    Stockpiles are taken as they are now, so starting on day d leaves
+    (remaining_days - d) * hunts_per_day / hunts_per_cycle cycles of time against the
+    unchanged T2, T3 and mallet limits. Returns per-day arrays day, days_left,
+    n_cycles_time, binding (index into CONSTRAINT_LABELS, with its binding_label) and
+    effective_cycles, plus resource_cycles (the tightest stockpile limit), time_binds_from
+    (the day time becomes the binding limit; 0 if it already is, or if no stockpile runs
+    out) and last_start_day (the last day the target can still be reached, None if it
+    cannot).
+    """
+    resource_limits = np.array([best_row["n_cycles_t2"], best_row["n_cycles_t3"], best_row["n_cycles_mallets"]])
+    resource_cycles = float(resource_limits.min())
+    cycles_per_day = hunts_per_day / hunts_per_cycle
+
+    day = np.arange(math.floor(remaining_days) + 1)
+    days_left = remaining_days - day
+    n_cycles_time = days_left * cycles_per_day
+    # A stockpile that never runs out (UNCONSTRAINED) is no limit at all, so time binds.
+    stock_limits = np.where(resource_limits >= UNCONSTRAINED, np.inf, resource_limits)
+    limits = np.column_stack((np.broadcast_to(stock_limits, (len(day), 3)), n_cycles_time))
+    binding = np.argmin(limits, axis=1)
+
+    if resource_cycles >= UNCONSTRAINED:
+        time_binds_from = 0.0  # no stockpile runs out, so only time limits the cycles
+    else:
+        time_binds_from = max(remaining_days - resource_cycles / cycles_per_day, 0.0)
+    last_start_day = None
+    if resource_cycles >= required_cycles:
+        last_start_day = remaining_days - max(required_cycles, 0) / cycles_per_day
+        last_start_day = last_start_day if last_start_day >= 0 else None
+    return {
+        "day": day,
+        "days_left": days_left,
+        "n_cycles_time": n_cycles_time,
+        "binding": binding,
+        "binding_label": [CONSTRAINT_LABELS[i] for i in binding],
+        "effective_cycles": limits.min(axis=1),
+        "resource_cycles": resource_cycles,
+        "time_binds_from": time_binds_from,
+        "last_start_day": last_start_day,
+    }
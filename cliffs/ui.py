@@ -0,0 +1,181 @@
+"""Streamlit helpers shared by the pages. The rest of cliffs stays Streamlit-free."""
+
+import functools
+import os
+import uuid
+
+import streamlit as st
+import streamlit.components.v1 as components
+import pandas as pd
+
+from cliffs.cache import simulation_cache, simulation_key
+from cliffs.jobs import job_pool
+from cliffs.engine import N_SPLITS
+from cliffs.montecarlo import PERCENTILES, monte_carlo
+from cliffs.profiling import fragment_profiler
+
+
+# Seconds between progress refreshes while a background job runs.
+POLL_INTERVAL = 0.5
+
+# Static components are served as files, so the browser loads them once and a rerun only
+# sends their arguments.
+_countdown = components.declare_component(
+    "countdown", path=os.path.join(os.path.dirname(__file__), "components", "countdown")
+)
+
+
+def render_countdown(end_utc):
+    """Live countdown to end_utc (ISO 8601), ticking in the browser between reruns."""
+    _countdown(end=end_utc, key="event_countdown", default=None)
+
+
+def background_job(name, key, fn=None, cache=True):
+    """This session's background job called name, if it is for key.
+
+    A previous job of this name for a different key (the inputs changed) is released, which
+    cancels it unless another session is waiting on it. With fn given, a job for key is
+    started, or joined if one is already running anywhere. Returns None when there is none.
+    Jobs no page asks for during a rerun are released by release_unused_jobs.
+    """
+    session = st.session_state.setdefault("_session_id", uuid.uuid4().hex)
+    jobs = st.session_state.setdefault("_jobs", {})
+    st.session_state.setdefault("_jobs_used", set()).add(name)
+    job = jobs.get(name)
+    if job is not None and job.key != key:
+        job_pool.release(job, session)
+        del jobs[name]
+        job = None
+    if job is None and fn is not None:
+        job = jobs[name] = job_pool.submit(key, fn, session, cache=cache)
+    return job
+
+
+def release_unused_jobs():
+    """Release this session's jobs that no background_job call asked for during this rerun.
+
+    Call at the end of a full rerun: a job whose page the session left, or whose inputs
+    changed while another page was shown, is cancelled unless another session waits on it.
+    """
+    used = st.session_state.pop("_jobs_used", set())
+    jobs = st.session_state.get("_jobs", {})
+    for name in [name for name in jobs if name not in used]:
+        job_pool.release(jobs.pop(name), st.session_state["_session_id"])
+
+
+def poll_job(job, render):
+    """Call render(job) every POLL_INTERVAL until the job finishes, then rerun the app once."""
+
+    @st.fragment(run_every=POLL_INTERVAL)
+    def poll():
+        if job.done:
+            st.rerun()
+        render(job)
+
+    poll()
+
+
+def _monte_carlo_job(params, options):
+    def run(report):
+        for summary in monte_carlo(params, **options):
+            report(summary["n_trials"] / options["n_trials"], partial=summary)
+        return summary
+
+    return run
+
+
+def _render_summary(summary, options, split, per_split):
+    p10, p50, p90 = (summary["percentiles"][p][split] for p in PERCENTILES)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("P(Diamond Target)", f"{summary['p_target'][split]:.0%}")
+    col2.metric("P10 Cycles", f"{p10:.0f}")
+    col3.metric("P50 Cycles", f"{p50:.0f}")
+    col4.metric("P90 Cycles", f"{p90:.0f}")
+    truncated = " — stopped at the time budget" if summary["n_trials"] < options["n_trials"] else ""
+    st.caption(
+        f"{summary['n_trials']} trials in {summary['elapsed']:.2f}s{truncated}. "
+        f"Completed cycles are counted up to {summary['horizon']}."
+    )
+    if per_split:
+        table = pd.DataFrame(
+            {
+                "n_hunts_t2_fantasy_postscript": range(N_SPLITS),
+                **{f"p{p}_cycles": summary["percentiles"][p] for p in PERCENTILES},
+                "p_target": summary["p_target"],
+            }
+        )
+        st.dataframe(table, use_container_width=True, hide_index=True)
+
+
+def render_monte_carlo(params, options, split, per_split=False):
+    """Monte Carlo percentiles for one split (and optionally every split), run in the background.
+
+    While trials run, the running summary refreshes in place; changing the sidebar cancels
+    the run. Runs that finish their trial count are cached and shared across sessions.
+    """
+    # A run that finishes its trial count does not depend on the time budget, so only the
+    # job (which may stop early) is keyed on it.
+    key = ("monte_carlo", simulation_key(params.to_settings()), options["n_trials"], options["seed"])
+    # Checked on every poll while the job runs, so peek does not count those as cache misses.
+    summary = simulation_cache.peek(key)
+    if summary is None:
+        job_key = key + (options["time_budget"],)
+        job = background_job("monte_carlo", job_key, _monte_carlo_job(params, options), cache=False)
+        if not job.done:
+
+            def render(job):
+                st.progress(job.progress, text=f"Running Monte Carlo trials... {job.progress:.0%}")
+                if job.partial is not None:
+                    _render_summary(job.partial, options, split, per_split)
+
+            poll_job(job, render)
+            return
+        summary = job.result()
+        if summary["n_trials"] == options["n_trials"]:
+            simulation_cache.put(key, summary)
+    _render_summary(summary, options, split, per_split)
+
+
+def profiled_fragment(name):
+    """st.fragment whose function takes the profiler to record its stages in.
+
+    A full rerun passes the session's rerun profiler; when the fragment reruns on its own
+    it gets a fragment_profiler, whose timings are shown under the fragment.
+    """
+
+    def decorate(fn):
+        @st.fragment
+        @functools.wraps(fn)
+        def run():
+            with fragment_profiler(st.session_state["profiler"], name) as profiler:
+                fn(profiler)
+            if profiler.enabled and profiler is not st.session_state["profiler"]:
+                record = profiler.record
+                stages = ", ".join(f"{stage['stage']} {stage['seconds'] * 1000:.0f} ms" for stage in record["stages"])
+                st.caption(f"Profiler ({name} rerun): {record['total_seconds'] * 1000:.0f} ms · {stages}")
+
+        return run
+
+    return decorate
+
+
+def render_profiler(record):
+    """Collapsible sidebar panel with one rerun's stage timings and traced allocations."""
+    with st.sidebar.expander("Profiler", expanded=False):
+        mib = 2**20
+        table = pd.DataFrame(
+            {
+                "Stage": ["\u2003" * stage["depth"] + stage["stage"] for stage in record["stages"]],
+                "ms": [stage["seconds"] * 1000 for stage in record["stages"]],
+                "Alloc MiB": [
+                    None if stage["allocated_bytes"] is None else stage["allocated_bytes"] / mib
+                    for stage in record["stages"]
+                ],
+                "Peak MiB": [
+                    None if stage["peak_bytes"] is None else stage["peak_bytes"] / mib for stage in record["stages"]
+                ],
+            }
+        )
+        st.dataframe(table, hide_index=True, use_container_width=True)
+        traced = "" if record["traced_bytes"] is None else f" · {record['traced_bytes'] / mib:.1f} MiB traced"
+        st.caption(f"Rerun total {record['total_seconds'] * 1000:.0f} ms{traced}")
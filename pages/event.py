@@ -1,82 +1,58 @@
+import math
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
 import streamlit as st
-import streamlit.components.v1 as components
-from datetime import datetime, timezone
+
+from cliffs import CANDLE_OPTIONS
+from cliffs.cache import simulation_cache, simulation_key
+from cliffs.engine import EVENT_END_UTC, FANTASY_POSTSCRIPT_HUNTS, N_SPLITS, UNCONSTRAINED
+from cliffs.inverse import REQUIREMENT_LABELS, REQUIREMENTS
+from cliffs.planner import DEFAULT_PLAN_BOUNDS, plan_event
+from cliffs.timeline import event_clock
+from cliffs.ui import profiled_fragment, render_countdown, render_monte_carlo
 
 st.title("LNY 2026 Event Dashboard")
 
 # --- Live countdown timer ---
-EVENT_END_UTC = "2026-02-24T16:00:00Z"
-
-countdown_html = f"""
-<div id="countdown" style="font-size: 2rem; font-weight: bold; text-align: center;
-     padding: 1rem; background: #262730; color: #fafafa; border-radius: 8px;
-     font-family: 'Source Sans Pro', sans-serif;">
-    Loading...
-</div>
-<script>
-    const endDate = new Date("{EVENT_END_UTC}");
-    function updateCountdown() {{
-        const now = new Date();
-        const diff = endDate - now;
-        if (diff <= 0) {{
-            document.getElementById("countdown").innerText = "Event has ended!";
-            return;
-        }}
-        const days = Math.floor(diff / (1000 * 60 * 60 * 24));
-        const hours = Math.floor((diff % (1000 * 60 * 60 * 24)) / (1000 * 60 * 60));
-        const minutes = Math.floor((diff % (1000 * 60 * 60)) / (1000 * 60));
-        const seconds = Math.floor((diff % (1000 * 60)) / 1000);
-        document.getElementById("countdown").innerText =
-            days + "d " + hours + "h " + minutes + "m " + seconds + "s remaining";
-    }}
-    updateCountdown();
-    setInterval(updateCountdown, 1000);
-</script>
-"""
-
 st.subheader("Event Countdown")
-components.html(countdown_html, height=80)
+render_countdown(EVENT_END_UTC)
 
 # --- Read simulation results ---
-best_row = st.session_state["best_row"]
-required_cycles = st.session_state["required_cycles"]
-n_diamonds_per_cycle = st.session_state["n_diamonds_per_cycle"]
+model = st.session_state["model"]
+result = model["result"]
+best_row = model["best_row"]
+required_cycles = result.required_cycles
+n_diamonds_per_cycle = result.n_diamonds_per_cycle
 
 # --- Time constraint ---
 st.subheader("Time Constraint")
 
-HUNTS_PER_CYCLE = 143
-hunts_per_day = st.session_state["hunts_per_day"]
+# One clock reading is shared by all sessions for a few seconds, so the time nodes
+# only recompute when it moves on or the settings change.
+clock = event_clock()
+remaining_days = clock["remaining_days"]
 
-event_end = datetime(2026, 2, 24, 16, 0, 0, tzinfo=timezone.utc)
-now = datetime.now(timezone.utc)
-remaining_seconds = max(0, (event_end - now).total_seconds())
-remaining_days = remaining_seconds / 86400
+model.set_inputs({"remaining_days": remaining_days})
+time_constraint = model["time_constraint"]
+total_remaining_hunts = time_constraint["remaining_hunts"]
+n_cycles_time = time_constraint["n_cycles_time"]
 
-total_remaining_hunts = remaining_days * hunts_per_day
-n_cycles_time = total_remaining_hunts / HUNTS_PER_CYCLE
-
-tcol1, tcol2 = st.columns(2)
+tcol1, tcol2, tcol3 = st.columns(3)
 tcol1.metric("Remaining Days", f"{remaining_days:.2f}")
-tcol2.metric("Max Cycles (Time)", f"{n_cycles_time:.2f}")
+tcol2.metric("Hunts per Cycle", f"{model['hunts_per_cycle']}")
+tcol3.metric("Max Cycles (Time)", f"{n_cycles_time:.2f}")
+st.caption("A cycle is your writing hunts plus the Noto and Fantasy postscripts, as in the plan below.")
 
 # --- Constraint summary ---
 st.subheader("Constraint Summary")
 
-constraints = {
-    "T2 Materials": best_row["n_cycles_t2"],
-    "T3 Materials": best_row["n_cycles_t3"],
-    "Mallets": best_row["n_cycles_mallets"],
-    "Time": n_cycles_time,
-}
-
-
 def format_cycles(value):
-    return "Unconstrained" if value >= 999 else f"{value:.2f}"
+    return "Unconstrained" if value >= UNCONSTRAINED else f"{value:.2f}"
 
 
-binding_name = min(constraints, key=constraints.get)
-binding_value = constraints[binding_name]
+binding_name, binding_value = model["binding_constraint"]
 
 col1, col2, col3, col4 = st.columns(4)
 col1.metric("T2 Cycles", format_cycles(best_row["n_cycles_t2"]))
@@ -90,6 +66,30 @@ bcol1, bcol2 = st.columns(2)
 bcol1.metric("Binding Constraint", binding_name)
 bcol2.metric("Effective Max Cycles", format_cycles(binding_value))
 
+# --- Inverse mode: what reaching the target takes ---
+requirements = model["requirements"]
+st.caption(
+    f"Minimum needed to reach {st.session_state['settings']['rd']} diamonds before the event ends, each on its "
+    "own, at the Fantasy split that needs the least of it:"
+)
+for col, key in zip(st.columns(len(REQUIREMENTS)), REQUIREMENTS):
+    requirement = requirements[key]
+    shortfall = math.ceil(requirement["shortfall"]) if math.isfinite(requirement["shortfall"]) else None
+    col.metric(
+        f"Min {requirement['label']}",
+        f"{math.ceil(requirement['minimum']):,}" if math.isfinite(requirement["minimum"]) else "Event ended",
+        delta="Enough" if shortfall == 0 else f"-{shortfall:,} short" if shortfall else None,
+        help=None if requirement["split"] is None else f"At Fantasy T2 Hunts = {requirement['split']}.",
+    )
+with st.expander("Minimum stockpiles for every Fantasy split"):
+    st.dataframe(
+        pd.DataFrame(
+            {REQUIREMENT_LABELS[key]: np.ceil(values) for key, values in requirements["per_split"].items()},
+            index=pd.Index(range(N_SPLITS), name="Fantasy T2 Hunts"),
+        ),
+        use_container_width=True,
+    )
+
 # --- Diamond progress ---
 st.subheader("Diamond Progress")
 
@@ -102,3 +102,157 @@ if binding_value >= required_cycles:
 else:
     deficit = required_cycles - binding_value
     st.error(f"You are {deficit:.2f} cycles short of your diamond target.")
+
+# --- Binding constraint by start day ---
+st.subheader("Binding Constraint by Start Day")
+
+schedule = model["schedule"]
+start_times = pd.DatetimeIndex([clock["now"] + timedelta(days=float(day)) for day in schedule["day"]], name="Start")
+
+
+def format_day(day):
+    return "Now" if day <= 0 else (clock["now"] + timedelta(days=day)).strftime("%b %d, %H:%M UTC")
+
+
+scol1, scol2 = st.columns(2)
+scol1.metric("Time Binds From", format_day(schedule["time_binds_from"]))
+scol2.metric(
+    "Last Start for Target",
+    "Out of reach" if schedule["last_start_day"] is None else format_day(schedule["last_start_day"]),
+)
+st.caption(
+    "Cycles you can still run if you start hunting on each day, with your stockpiles as they are now: "
+    "time shrinks day by day while materials and mallets stay put, until time becomes the binding limit."
+)
+st.line_chart(
+    pd.DataFrame(
+        {
+            "Time Cycles": schedule["n_cycles_time"],
+            "Stockpile Cycles": (
+                schedule["resource_cycles"] if schedule["resource_cycles"] < UNCONSTRAINED else np.nan
+            ),
+            "Required Cycles": required_cycles,
+        },
+        index=start_times,
+    )
+)
+with st.expander("Day-by-day schedule"):
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Days Left": schedule["days_left"],
+                "Time Cycles": schedule["n_cycles_time"],
+                "Binding Constraint": schedule["binding_label"],
+                "Effective Cycles": schedule["effective_cycles"],
+                "Reaches Target": schedule["effective_cycles"] >= required_cycles,
+            },
+            index=start_times,
+        ),
+        use_container_width=True,
+    )
+
+# --- Event plan solver ---
+st.subheader("Best Plan Before the Deadline")
+st.caption(
+    "Finds the whole-number writing, Noto and Fantasy hunts and the candle/CC choices that earn "
+    "the most diamonds (up to your target) with the hunts you have left. Ties go to fewer CC "
+    "phases, then weaker candles."
+)
+
+settings = st.session_state["settings"]
+# Remaining Hunts follows the time left and hunts per day until the player types their own.
+remaining_hunts_seed = int(total_remaining_hunts)
+if st.session_state.get("plan_remaining_hunts") in (None, st.session_state.get("_plan_hunts_seed")):
+    st.session_state["plan_remaining_hunts"] = remaining_hunts_seed
+st.session_state["_plan_hunts_seed"] = remaining_hunts_seed
+
+
+# The plan's own inputs only rerun this section.
+@profiled_fragment("event plan")
+def event_plan(profiler):
+    pcol1, pcol2, pcol3 = st.columns(3)
+    plan_hunts = pcol1.number_input("Remaining Hunts", min_value=0, step=10, key="plan_remaining_hunts")
+    min_writing_hunts = pcol2.number_input(
+        "Min Writing Hunts per Cycle",
+        min_value=0,
+        step=10,
+        value=settings["t1w"] + settings["t2w"],
+        help="The writing phase needs at least this many T1 + T2 hunts.",
+    )
+    min_t3n = pcol3.number_input(
+        "Min Noto Charging Hunts",
+        min_value=0,
+        max_value=DEFAULT_PLAN_BOUNDS["t3n"][1],
+        value=min(settings["t3n"], DEFAULT_PLAN_BOUNDS["t3n"][1]),
+    )
+
+    plan_levers = tuple(
+        lever
+        for col, (lever, label) in zip(
+            st.columns(3), {"hunts": "Hunt Allocation", "candles": "Candles", "cc": "Condensed Creativity"}.items()
+        )
+        if col.checkbox(label, value=True, key=f"plan_{lever}")
+    )
+    plan_bounds = {"t3n": (min_t3n, DEFAULT_PLAN_BOUNDS["t3n"][1])}
+    plan_key = ("event_plan", simulation_key(settings), plan_hunts, plan_levers, min_t3n, min_writing_hunts)
+
+    try:
+        with profiler.stage("plan solver"):
+            plan, plan_stats = simulation_cache.get_or_compute(
+                plan_key,
+                lambda: plan_event(
+                    settings,
+                    plan_hunts,
+                    plan_levers,
+                    plan_bounds,
+                    min_writing_hunts if "hunts" in plan_levers else 0,
+                ),
+            )
+    except ValueError as error:
+        st.warning(str(error))
+    else:
+        pcol1, pcol2, pcol3, pcol4 = st.columns(4)
+        pcol1.metric("Planned Diamonds", f"{plan['diamonds']:.0f}")
+        pcol2.metric("Planned Cycles", f"{plan['cycles']:.2f}")
+        pcol3.metric("Binding Constraint", plan["binding_constraint"])
+        pcol4.metric("CC Used", f"{plan['n_cc_used']:.0f}")
+
+        st.table(
+            {
+                "Setting": [
+                    "T1 / T2 Writing Hunts",
+                    "Noto Charging Hunts",
+                    "Fantasy T1 / T2 Hunts",
+                    "Candles (Writing / Noto / Fantasy)",
+                    "CC (Writing / Noto / Fantasy)",
+                    "Hunts per Cycle",
+                ],
+                "Plan": [
+                    f"{plan['t1w']} / {plan['t2w']}",
+                    f"{plan['t3n']}",
+                    f"{FANTASY_POSTSCRIPT_HUNTS - plan['n_hunts_t2_fantasy_postscript']} / {plan['n_hunts_t2_fantasy_postscript']}",
+                    " / ".join(CANDLE_OPTIONS[plan[key]] for key in ("cw", "cn", "cf")),
+                    " / ".join("Yes" if plan[key] else "No" for key in ("ccw", "ccn", "ccf")),
+                    f"{plan['hunts_per_cycle']}",
+                ],
+            }
+        )
+        st.caption(
+            f"Searched {plan_stats['n_evaluated']} of {plan_stats['n_combinations']} candle/CC combinations "
+            f"({plan_stats['n_pruned']} pruned) in {plan_stats['elapsed'] * 1000:.0f} ms."
+        )
+
+
+event_plan()
+
+# --- Stochastic mode ---
+monte_carlo_options = st.session_state["monte_carlo_options"]
+if monte_carlo_options:
+    st.subheader("Diamond Target Odds (Monte Carlo)")
+    st.caption("Resource constraints only — time is not sampled.")
+    with st.session_state["profiler"].stage("monte carlo"):
+        render_monte_carlo(
+            st.session_state["params"],
+            monte_carlo_options,
+            int(best_row["n_hunts_t2_fantasy_postscript"]),
+        )
@@ -43,6 +43,15 @@ The sidebar is shared across all pages — any changes you make are reflected ev
 - **Break Block / Extend / Short Only** — Toggle mallet usage strategies that affect consumption
   per cycle.
 
+### Stochastic Mode
+- **Monte Carlo Trials** — Instead of average drop rates and Noto extend odds, samples them every
+  cycle over many trials. The Simulator and LNY Event pages then show the P10/P50/P90 cycles you
+  complete and the probability of reaching your diamond target.
+- **Trials / Time Budget / Random Seed** — Runs stop at the trial count or the time budget,
+  whichever comes first. The same seed and trial count always give the same result. Trials run
+  in the background with a progress bar, so the page stays usable; changing the sidebar cancels
+  the run.
+
 ### Chart Settings
 - **Max Cycles Cap** — Upper display limit for the cycle constraint chart (visual only, does not
   affect calculations).
@@ -65,25 +74,88 @@ The sidebar is shared across all pages — any changes you make are reflected ev
 
 ### Simulation Table
 All 14 Fantasy Postscript scenarios (0–13 T2 hunts) with per-cycle net materials, cycle limits,
-and CC usage. Downloadable as CSV.
+and CC usage. Downloadable as CSV, JSON Lines, Parquet or Arrow; each file is only built when
+its button is clicked. The Optimizer page can also export every configuration in its search
+space (one row per split), written chunk by chunk.
 
 ### Charts
 - **Net Materials per Cycle** — Shows whether each resource is gained or lost per cycle at each
   split.
 - **Max Cycles** — Shows how many cycles each constraint allows, capped for readability.
 - **CC Used** — Total Condensed Creativity consumed.
-- **Materials Over Cycles** — Projects your material stockpile over time for a selected scenario.
+- **Materials Over Cycles** — Projects your material stockpile over time for a selected scenario,
+  with the stepped model alongside, and shows the exact cycle each resource runs out.
+
+### Sensitivity
+A tornado chart of how much the optimal scenario's max cycles, CC used or diamond deficit
+changes when each input moves by one step: 10 writing hunts, 1 Noto charging hunt, 100
+materials, 10 mallets, 13 diamonds, one candle option, or a checkbox toggled. Bars to the
+left and right are the lower/off and higher/on changes; inputs with no effect are listed
+underneath. Every variant is simulated in the same batch as the current settings.
+
+### Stepped vs Linear Model
+The main table assumes stock drains smoothly at the average loss per cycle. The stepped model
+walks each cycle phase by phase (Writing → Noto → Fantasy) with whole-number stock: mallets for a
+phase must be on hand when it starts, and materials farmed in a phase only arrive when it ends. It
+shows where each split actually stops (phase and resource). Blank cells mean unconstrained.
+
+### Model Rates
+The drop rates and mallet costs the model assumes per hunt. They default to hand-entered
+estimates; when the app runs with rates calibrated from hunt logs, the expander shows the fitted
+values with their 95% confidence intervals and how many logged hunts each is based on. The
+caption underneath names the game rule set (costs, phase lengths, bonuses) the model runs on.
+
+---
+
+## Optimizer Page
+
+The **Optimizer** page searches many settings at once instead of only the Fantasy split:
+- Tick the **levers** to search (writing/Noto hunts, candles, CC, Baitkeep, mallet strategies).
+  Unticked levers stay at your sidebar values; stockpiles and diamonds always come from the sidebar.
+- The result is the **Pareto frontier** — every setting where no other setting gives more cycles
+  while using no more CC and no more mallets per cycle.
+- **Cap cycles at Required Cycles** treats anything past your diamond target as equal, so the
+  frontier shows the cheapest ways to reach it.
+- Searches run in the background with a progress bar. Changing any input cancels the search,
+  and players running the same search at the same time share one run.
 
 ---
 
 ## LNY Event Page
 
 The **LNY Event** page provides a dashboard view with:
-- A **live countdown timer** to the event end (24 Feb 2026, 16:00 UTC).
+- A **live countdown timer** to the event end (24 Feb 2026, 16:00 UTC, set by the rule set).
 - A summary of all **resource constraints** (T2, T3, mallets) from the simulator.
 - A **time constraint** calculated from your hunts per day and remaining event time.
 - The **binding constraint** — whichever limit runs out first.
+- **Minimum needed** — the least T2 materials, T3 materials, mallets and hunts per day that reach
+  your diamond target before the event ends, and how far short you are of each. Each stockpile's
+  minimum is taken at the Fantasy split that needs the least of it (hover for the split). Every
+  split's minimum stockpiles are in the expander below.
 - **Diamond progress** — whether you can reach your target in time.
+- **Binding constraint by start day** — with your current stockpiles, the day time overtakes
+  materials and mallets as the limit, and the last day you can start and still reach your target.
+- **Best plan before the deadline** — the whole-number writing/Noto/Fantasy hunts and candle/CC
+  choices that earn the most diamonds (up to your target) with your remaining hunts. Set a minimum
+  writing length and Noto charging hunts so the plan matches how the event actually plays.
+  Remaining Hunts follows your time left and hunts per day until you type your own number.
+  A cycle is your writing hunts plus the Noto and Fantasy postscripts, for the plan and the time
+  constraint alike.
+
+---
+
+## Roster Page
+
+The **Roster** page evaluates a whole group's saved settings at once:
+- Paste one saved URL per player (add `&name=...` to label them), or upload a file of URLs,
+  JSONL records or CSV rows. Your own sidebar settings are shown as an example.
+- Every player is simulated together in one pass, so rosters of several hundred players stay fast.
+- **Totals** show how many players reach their target, the group's total diamonds, diamond
+  deficit and CC used, and how many players each constraint binds (Unconstrained when no
+  stockpile runs out and time is not counted).
+- The **player table** lists each player's best Fantasy split, binding constraint, diamonds,
+  diamond deficit and CC used. Rank it with **Rank by** or click a column header to sort, and
+  download it (CSV, JSON Lines, or Parquet / Arrow when pyarrow is installed).
 
 ---
 
@@ -0,0 +1,146 @@
+import streamlit as st
+import pandas as pd
+
+from cliffs import CANDLE_OPTIONS
+from cliffs.cache import simulation_cache, simulation_key
+from cliffs.export import EXPORT_FORMATS, FORMAT_LABELS, available_formats, spool_chunks
+from cliffs.optimizer import DEFAULT_HUNT_GRID, iter_sweep, optimize, sweep_size
+from cliffs.ui import background_job, poll_job
+
+st.title("Optimizer — LNY 2026")
+
+# Rows (configurations x Fantasy splits) the full sweep export will write.
+MAX_EXPORT_ROWS = 5_000_000
+
+settings = st.session_state["settings"]
+required_cycles = st.session_state["result"].required_cycles
+
+LEVER_LABELS = {
+    "hunts": "Writing & Noto Hunts",
+    "candles": "Candles",
+    "cc": "Condensed Creativity",
+    "bk": "Baitkeep Charm",
+    "mallets": "Mallet Strategies",
+}
+
+FRONTIER_LABELS = {
+    "t1w": "T1 Writing Hunts",
+    "t2w": "T2 Writing Hunts",
+    "t3n": "Noto Charging Hunts",
+    "n_hunts_t2_fantasy_postscript": "Fantasy T2 Hunts",
+    "cw": "Candle (Writing)",
+    "cn": "Candle (Noto)",
+    "cf": "Candle (Fantasy)",
+    "ccw": "CC (Writing)",
+    "ccn": "CC (Noto)",
+    "ccf": "CC (Fantasy)",
+    "bk": "Baitkeep",
+    "nbb": "Noto Break Block",
+    "fbb": "Fantasy Break Block",
+    "fws": "Fantasy Writing Short Only",
+    "fpe": "Fantasy Extend Postscript",
+    "max_cycles": "Max Cycles",
+    "n_cc_used": "CC Used",
+    "mallet_cost": "Net Mallet Cost per Cycle",
+}
+
+# --- Search space ---
+st.subheader("Search Space")
+st.caption("Levers left unticked stay at their sidebar values.")
+
+lever_cols = st.columns(len(LEVER_LABELS))
+levers = [
+    lever
+    for col, (lever, label) in zip(lever_cols, LEVER_LABELS.items())
+    if col.checkbox(label, value=True, key=f"opt_{lever}")
+]
+
+hcol1, hcol2, hcol3, hcol4 = st.columns(4)
+max_t1w = hcol1.number_input("Max T1 Writing Hunts", min_value=0, step=10, value=DEFAULT_HUNT_GRID["t1w"][1])
+max_t2w = hcol2.number_input("Max T2 Writing Hunts", min_value=0, step=10, value=DEFAULT_HUNT_GRID["t2w"][1])
+writing_step = hcol3.number_input("Writing Hunts Step", min_value=1, step=5, value=DEFAULT_HUNT_GRID["t2w"][2])
+max_t3n = hcol4.number_input("Max Noto Charging Hunts", min_value=0, step=1, value=DEFAULT_HUNT_GRID["t3n"][1])
+
+cap_at_target = st.checkbox(
+    "Cap cycles at Required Cycles",
+    value=True,
+    help="Cycles beyond your diamond target count the same, so the frontier trades off CC and mallets instead.",
+)
+
+hunt_grid = {
+    "t1w": (0, max_t1w, writing_step),
+    "t2w": (0, max_t2w, writing_step),
+    "t3n": (0, max_t3n, max(1, max_t3n // 13)),
+}
+
+cycle_cap = required_cycles if cap_at_target and required_cycles > 0 else None
+search_key = ("optimizer", simulation_key(settings), tuple(levers), tuple(hunt_grid.items()), cycle_cap)
+search_settings = dict(settings)
+
+# Searches run in the background; changing any input above or in the sidebar cancels this one.
+job = background_job("optimizer", search_key)
+if st.button("Run Optimizer", type="primary", disabled=not levers):
+    cached = simulation_cache.get(search_key)
+    if cached is not None:
+        st.session_state["optimizer_result"] = (*cached, search_settings)
+    else:
+        job = background_job(
+            "optimizer",
+            search_key,
+            lambda report: optimize(search_settings, levers, hunt_grid, cycle_cap, progress=report),
+        )
+
+if job is not None:
+    if job.done:
+        st.session_state["optimizer_result"] = (*job.result(), search_settings)
+    else:
+        poll_job(job, lambda job: st.progress(job.progress, text=f"Searching... {job.progress:.0%} of regions"))
+
+# --- Results ---
+if "optimizer_result" in st.session_state:
+    frontier, stats, searched_settings = st.session_state["optimizer_result"]
+    if searched_settings != settings:
+        st.info("Sidebar settings changed since this search — run the optimizer again to refresh.")
+
+    st.subheader("Pareto Frontier")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Frontier Points", f"{len(frontier['max_cycles'])}")
+    col2.metric("Regions Searched", f"{stats['n_evaluated']} / {stats['n_regions']}")
+    col3.metric("Regions Pruned", f"{stats['n_pruned']}")
+    col4.metric("Search Time", f"{stats['elapsed']:.2f}s")
+
+    frontier_df = pd.DataFrame(frontier)[list(FRONTIER_LABELS)]
+    for key in ("cw", "cn", "cf"):
+        frontier_df[key] = [CANDLE_OPTIONS[i] for i in frontier_df[key]]
+    for key in ("ccw", "ccn", "ccf", "bk", "nbb", "fbb", "fws", "fpe"):
+        frontier_df[key] = frontier_df[key].astype(bool)
+
+    st.caption("Max Cycles vs. CC Used (colour: net mallet cost per cycle)")
+    st.scatter_chart(frontier_df, x="n_cc_used", y="max_cycles", color="mallet_cost")
+
+    st.dataframe(frontier_df.rename(columns=FRONTIER_LABELS), use_container_width=True, hide_index=True)
+
+# --- Full sweep export ---
+st.subheader("Export Full Sweep")
+st.caption(
+    "Every configuration in the search space above, unpruned, one row per Fantasy split. "
+    "Rows are simulated and written in chunks when the button is clicked."
+)
+n_rows = sweep_size(settings, levers, hunt_grid)
+export_formats = available_formats()
+ecol1, ecol2 = st.columns(2)
+export_format = ecol1.selectbox(
+    "Format", export_formats, format_func=FORMAT_LABELS.get, key="opt_export_format"
+)
+ecol2.metric("Rows", f"{n_rows:,}")
+if n_rows > MAX_EXPORT_ROWS:
+    st.warning(f"Narrow the search space to at most {MAX_EXPORT_ROWS:,} rows to export it.")
+extension, mime = EXPORT_FORMATS[export_format]
+sweep_settings = dict(settings)
+st.download_button(
+    "Download Sweep",
+    lambda: spool_chunks(iter_sweep(sweep_settings, levers, hunt_grid), export_format),
+    f"cliffs_lny2026_sweep.{extension}",
+    mime,
+    disabled=not levers or n_rows > MAX_EXPORT_ROWS,
+)
@@ -0,0 +1,116 @@
+import hashlib
+from urllib.parse import urlencode
+
+import pandas as pd
+import streamlit as st
+
+from cliffs.cache import simulation_cache
+from cliffs.core import CONSTRAINT_LABELS, NO_BINDING
+from cliffs.export import EXPORT_FORMATS, FORMAT_LABELS, available_formats
+from cliffs.roster import evaluate_roster, export_roster, parse_roster, roster_totals
+from cliffs.timeline import event_clock
+
+st.title("Roster — LNY 2026")
+st.caption(
+    "Evaluate a whole group's saved settings at once. Paste one saved URL (or query string) per player; "
+    "add a `name=` parameter to label them. JSONL records and CSV with a header row also work."
+)
+
+ROSTER_LABELS = {
+    "player": "Player",
+    "best_t1_fantasy_hunts": "Best T1 Fantasy Hunts",
+    "best_t2_fantasy_hunts": "Best T2 Fantasy Hunts",
+    "binding_constraint": "Binding Constraint",
+    "effective_cycles": "Effective Cycles",
+    "required_cycles": "Required Cycles",
+    "diamonds": "Diamonds",
+    "diamond_deficit": "Diamond Deficit",
+    "n_cc_used": "CC Used",
+    "reaches_target": "Reaches Target",
+}
+
+# --- Roster input ---
+example = "?" + urlencode({"name": "Me", **st.session_state["params"].to_query()})
+uploaded = st.file_uploader("Roster file", type=["txt", "urls", "csv", "jsonl", "ndjson", "json"])
+roster_text = st.text_area(
+    "Saved settings, one player per line",
+    height=200,
+    placeholder=example,
+    key="roster_text",
+    help="Saved-URL lines starting with # are ignored. An uploaded file is used instead of this box.",
+)
+if uploaded is not None:
+    roster_text = uploaded.getvalue().decode("utf-8-sig")
+
+include_time = st.checkbox(
+    "Limit cycles by the event time left",
+    value=True,
+    help="Each player's hunts per day against the time left before the event ends, as on the LNY Event page.",
+)
+
+try:
+    records = parse_roster(roster_text)
+except ValueError as error:
+    st.error(f"Could not read the roster: {error}")
+    st.stop()
+if not records:
+    st.info(f"Add players to evaluate, e.g. your current settings:\n\n`{example}`")
+    st.stop()
+
+# --- Batched evaluation ---
+# Every player is simulated in one vectorized pass; the clock reading is shared for a few
+# seconds, so reruns with the same roster are cache hits.
+remaining_days = event_clock()["remaining_days"] if include_time else None
+roster_key = ("roster", hashlib.sha256(roster_text.encode()).hexdigest(), remaining_days)
+with st.session_state["profiler"].stage("roster"):
+    roster = simulation_cache.get_or_compute(roster_key, lambda: evaluate_roster(records, remaining_days))
+totals = roster_totals(roster)
+
+# --- Totals ---
+st.subheader("Totals")
+tcol1, tcol2, tcol3, tcol4, tcol5 = st.columns(5)
+tcol1.metric("Players", f"{totals['n_players']}")
+tcol2.metric("Reaching Target", f"{totals['n_reaching_target']} / {totals['n_players']}")
+tcol3.metric("Total Diamonds", f"{totals['diamonds']:,.0f}")
+tcol4.metric("Total Diamond Deficit", f"{totals['diamond_deficit']:,.0f}")
+tcol5.metric("Total CC Used", f"{totals['n_cc_used']:,.0f}")
+
+binding_cols = st.columns(len(CONSTRAINT_LABELS))
+for i, (col, label) in enumerate(zip(binding_cols, CONSTRAINT_LABELS)):
+    col.metric(label if i == NO_BINDING else f"Bound by {label}", f"{totals['binding_counts'].get(label, 0)}")
+
+# --- Player table ---
+st.subheader("Players")
+st.caption("Click a column header to sort.")
+
+roster_df = pd.DataFrame(roster).rename(columns=ROSTER_LABELS)
+rcol1, rcol2 = st.columns([3, 1])
+rank_by = rcol1.selectbox("Rank by", list(ROSTER_LABELS.values()), index=list(ROSTER_LABELS).index("diamond_deficit"))
+descending = rcol2.toggle("Descending", value=True)
+roster_df = roster_df.sort_values(rank_by, ascending=not descending, kind="stable")
+
+st.dataframe(
+    roster_df,
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        "Effective Cycles": st.column_config.NumberColumn(format="%.2f"),
+        "Required Cycles": st.column_config.NumberColumn(format="%.2f"),
+        "Diamonds": st.column_config.NumberColumn(format="%.0f"),
+        "Diamond Deficit": st.column_config.NumberColumn(format="%.0f"),
+        "CC Used": st.column_config.NumberColumn(format="%.0f"),
+    },
+)
+
+# Serialized only when a button is clicked, then cached with the roster.
+export_formats = available_formats()
+for col, export_format in zip(st.columns(len(export_formats)), export_formats):
+    extension, mime = EXPORT_FORMATS[export_format]
+    col.download_button(
+        f"Download {FORMAT_LABELS[export_format]}",
+        lambda export_format=export_format: simulation_cache.get_or_compute(
+            ("roster_export", export_format, roster_key), lambda: export_roster(roster, export_format)
+        ),
+        f"cliffs_roster.{extension}",
+        mime,
+    )
@@ -1,25 +1,31 @@
+import numpy as np
 import streamlit as st
 import pandas as pd
 
+from cliffs.cache import simulation_cache, simulation_key
+from cliffs.calibration import RATE_LABELS, load_rate_table
+from cliffs.engine import DEFAULT_RATES, N_SPLITS, RATES, RATES_PATH, RULE_SET, RULES_PATH, UNCONSTRAINED
+from cliffs.export import EXPORT_FORMATS, FORMAT_LABELS, available_formats, export_result
+from cliffs.sensitivity import sensitivity
+from cliffs.stepping import PHASES, RESOURCES, compare_with_linear
+from cliffs.ui import profiled_fragment, render_monte_carlo
+
 st.title("Cliffs Simulator — LNY 2026")
 
-df = st.session_state["df"]
-best_row = st.session_state["best_row"]
-required_cycles = st.session_state["required_cycles"]
-n_diamonds_per_cycle = st.session_state["n_diamonds_per_cycle"]
-writing_multiplier = st.session_state["writing_multiplier"]
-noto_postscript_multiplier = st.session_state["noto_postscript_multiplier"]
-fantasy_postscript_multiplier = st.session_state["fantasy_postscript_multiplier"]
-n_t2_mats = st.session_state["n_t2_mats"]
-n_t3_mats = st.session_state["n_t3_mats"]
-n_mallets = st.session_state["n_mallets"]
-max_cycles_cap = st.session_state["max_cycles_cap"]
+IMPACT_LABELS = {"max_cycles": "Max Cycles", "n_cc_used": "CC Used", "diamond_deficit": "Diamond Deficit"}
+
+result = st.session_state["result"]
+params = st.session_state["params"]
+profiler = st.session_state["profiler"]
+best_row = result.best_row
+required_cycles = result.required_cycles
+n_diamonds_per_cycle = result.n_diamonds_per_cycle
 
 # --- Summary metrics ---
 col1, col2, col3, col4, col5 = st.columns(5)
-col1.metric("Writing Multiplier", f"{writing_multiplier:.0f}x")
-col2.metric("Noto Multiplier", f"{noto_postscript_multiplier:.0f}x")
-col3.metric("Fantasy Multiplier", f"{fantasy_postscript_multiplier:.0f}x")
+col1.metric("Writing Multiplier", f"{params.writing_multiplier:.0f}x")
+col2.metric("Noto Multiplier", f"{params.noto_postscript_multiplier:.0f}x")
+col3.metric("Fantasy Multiplier", f"{params.fantasy_postscript_multiplier:.0f}x")
 col4.metric("Diamonds per Cycle", f"{n_diamonds_per_cycle:.0f}")
 col5.metric("Required Cycles", f"{required_cycles:.2f}")
 
@@ -32,12 +38,38 @@ col7.metric(
 )
 col8.metric("Total CC Used (Max Cycles)", f"{best_row['n_cc_used']:.0f}")
 
+# --- Stochastic mode ---
+monte_carlo_options = st.session_state["monte_carlo_options"]
+if monte_carlo_options:
+    st.subheader("Monte Carlo (Optimal Scenario)")
+    with profiler.stage("monte carlo"):
+        render_monte_carlo(
+            params,
+            monte_carlo_options,
+            int(best_row["n_hunts_t2_fantasy_postscript"]),
+            per_split=True,
+        )
+
 # --- Simulation results table ---
 st.subheader("Simulation Results")
-st.dataframe(df, use_container_width=True)
-
-csv = df.to_csv(index=False)
-st.download_button("Download CSV", csv, "cliffs_lny2026_simulation_data.csv", "text/csv")
+with profiler.stage("dataframe"):
+    df = result.to_frame()
+with profiler.stage("results table"):
+    st.dataframe(df, use_container_width=True)
+
+# Serialized only when a button is clicked, then cached with the result.
+settings = st.session_state["settings"]
+export_formats = available_formats()
+for col, export_format in zip(st.columns(len(export_formats)), export_formats):
+    extension, mime = EXPORT_FORMATS[export_format]
+    col.download_button(
+        f"Download {FORMAT_LABELS[export_format]}",
+        lambda export_format=export_format: simulation_cache.get_or_compute(
+            ("export", export_format, simulation_key(settings)), lambda: export_result(result, export_format)
+        ),
+        f"cliffs_lny2026_simulation_data.{extension}",
+        mime,
+    )
 
 # --- Charts ---
 st.subheader("Charts")
@@ -45,39 +77,154 @@ st.subheader("Charts")
 chart_df = df.set_index("n_hunts_t2_fantasy_postscript")
 
 st.caption("Net Materials per Cycle")
-st.line_chart(chart_df[["net_t2_mats", "net_t3_mats", "net_mallets"]])
+with profiler.stage("chart: net materials"):
+    st.line_chart(chart_df[["net_t2_mats", "net_t3_mats", "net_mallets"]])
 
 st.caption("Max Cycles (T2, T3 & Mallets)")
-capped_chart_df = chart_df[["n_cycles_t2", "n_cycles_t3", "n_cycles_mallets"]].clip(upper=max_cycles_cap)
-st.line_chart(capped_chart_df)
+with profiler.stage("chart: max cycles"):
+    capped_chart_df = chart_df[["n_cycles_t2", "n_cycles_t3", "n_cycles_mallets"]].clip(upper=params.max_cycles_cap)
+    st.line_chart(capped_chart_df)
 
 st.caption("Condensed Creativity Used")
-st.line_chart(chart_df[["n_cc_used"]])
+with profiler.stage("chart: CC used"):
+    st.line_chart(chart_df[["n_cc_used"]])
+
+# --- Sensitivity ---
+st.subheader("Sensitivity")
+st.caption(
+    "Change in the optimal scenario when each input moves by one step (10 writing hunts, 1 Noto hunt, "
+    "100 materials, 10 mallets, 13 diamonds, one candle option, or a checkbox toggled). "
+    "All variants are simulated together in one batch."
+)
 
-# --- Materials over cycles chart ---
-st.subheader("Materials Over Cycles")
 
-selected_row = st.selectbox(
-    "Fantasy Postscript T2 Hunts scenario",
-    range(14),
-    index=13,
-    format_func=lambda x: f"T2 Hunts = {x} (T1 Hunts = {13 - x})",
+# The impact picker only reruns this section.
+@profiled_fragment("sensitivity")
+def sensitivity_chart(profiler):
+    impact = st.radio("Impact on", list(IMPACT_LABELS), format_func=IMPACT_LABELS.get, horizontal=True, key="sens_impact")
+    with profiler.stage("sensitivity"):
+        sensitivities = simulation_cache.get_or_compute(
+            ("sensitivity", simulation_key(settings), params.max_cycles_cap),
+            lambda: sensitivity(settings, params.max_cycles_cap),
+        )
+        deltas = pd.DataFrame(
+            {
+                "Input": sensitivities["label"],
+                "direction": sensitivities["direction"],
+                "delta": sensitivities[f"delta_{impact}"],
+            }
+        )
+        tornado = deltas.pivot_table(index="Input", columns="direction", values="delta", sort=False).reindex(
+            columns=[-1, 1]
+        )
+        tornado.columns = ["Lower / Off", "Higher / On"]
+        magnitude = tornado.abs().max(axis=1)
+        unaffected = magnitude.index[magnitude.fillna(0) == 0]
+        tornado = tornado.loc[magnitude[magnitude > 0].sort_values(ascending=False).index].fillna(0).reset_index()
+    with profiler.stage("chart: sensitivity"):
+        if tornado.empty:
+            st.info("No single-step change moves this outcome.")
+        else:
+            st.bar_chart(
+                tornado, x="Input", y=["Lower / Off", "Higher / On"], horizontal=True, sort=False, stack=True,
+                x_label=f"Change in {IMPACT_LABELS[impact]}", y_label="",
+            )
+    st.caption(
+        f"Current {IMPACT_LABELS[impact]}: {sensitivities['base'][impact]:.2f}"
+        + (f" (cycles capped at {params.max_cycles_cap})" if impact == "max_cycles" else "")
+        + (f". No effect: {', '.join(unaffected)}." if len(unaffected) else ".")
+    )
+
+
+sensitivity_chart()
+
+# --- Stepped vs linear model ---
+st.subheader("Stepped vs Linear Model")
+st.caption(
+    "The stepped model walks each cycle phase by phase with whole-number stock, so it stops when a phase "
+    "cannot start or a hunt cannot be paid for, instead of dividing stock by the average loss per cycle."
 )
 
-row = df.iloc[selected_row]
-net_t2 = row["net_t2_mats"]
-net_t3 = row["net_t3_mats"]
-net_m = row["net_mallets"]
-max_cycle = int(min(row["n_cycles_t2"], row["n_cycles_t3"], row["n_cycles_mallets"], required_cycles)) + 1
-
-cycles = list(range(max_cycle + 1))
-t2_over_cycles = [n_t2_mats + net_t2 * c for c in cycles]
-t3_over_cycles = [n_t3_mats + net_t3 * c for c in cycles]
-mallets_over_cycles = [n_mallets + net_m * c for c in cycles]
+with profiler.stage("stepped model"):
+    comparison = simulation_cache.get_or_compute(
+        ("stepped", simulation_key(settings)), lambda: compare_with_linear(settings)
+    )
+comparison_df = pd.DataFrame(comparison)
+for column in ("linear_cycles", "stepped_cycles"):
+    comparison_df[column] = comparison_df[column].where(comparison_df[column] < UNCONSTRAINED)
+comparison_df["difference"] = comparison_df["stepped_cycles"] - comparison_df["linear_cycles"]
+comparison_df["stop_phase"] = [PHASES[i] if i >= 0 else "—" for i in comparison["stop_phase"]]
+comparison_df["stop_resource"] = [RESOURCES[i] if i >= 0 else "—" for i in comparison["stop_resource"]]
+st.dataframe(comparison_df, use_container_width=True, hide_index=True)
 
-projection_df = pd.DataFrame(
-    {"T2 Materials": t2_over_cycles, "T3 Materials": t3_over_cycles, "Mallets": mallets_over_cycles},
-    index=pd.Index(cycles, name="Cycle"),
-)
+# --- Materials over cycles chart ---
+st.subheader("Materials Over Cycles")
 
-st.line_chart(projection_df)
+profiler.checkpoint("stepped table")
+
+
+# The scenario picker only reruns this section.
+@profiled_fragment("materials over cycles")
+def materials_over_cycles(profiler):
+    selected_row = st.selectbox(
+        "Fantasy Postscript T2 Hunts scenario",
+        range(N_SPLITS),
+        index=N_SPLITS - 1,
+        format_func=lambda x: f"T2 Hunts = {x} (T1 Hunts = {N_SPLITS - 1 - x})",
+    )
+
+    with profiler.stage("projection"):
+        projection = st.session_state["model"]["projection"]
+    projection_df = pd.DataFrame(
+        {
+            **{resource: values[:, selected_row] for resource, values in projection["linear"].items()},
+            **{f"{resource} (stepped)": values[:, selected_row] for resource, values in projection["stepped"].items()},
+        },
+        index=pd.Index(projection["cycles"][:, selected_row], name="Cycle"),
+    )
+    projection_df = projection_df[~projection_df.index.duplicated()]
+
+    zcols = st.columns(len(RESOURCES) + 1)
+    for col, resource in zip(zcols, RESOURCES):
+        crossing = projection["zero_crossing"][resource][selected_row]
+        col.metric(f"{resource} Run Out", "Never" if np.isinf(crossing) else f"Cycle {crossing:.2f}")
+    stepped_stop = projection["stepped_stop"][selected_row]
+    zcols[-1].metric("Stepped Stop", "Not reached" if np.isinf(stepped_stop) else f"Cycle {stepped_stop:.2f}")
+
+    with profiler.stage("chart: materials over cycles"):
+        st.line_chart(projection_df)
+
+
+materials_over_cycles()
+
+# --- Model rates ---
+with st.expander("Model Rates"):
+    rate_table = (
+        simulation_cache.get_or_compute(("rate_table", RATES_PATH), lambda: load_rate_table(RATES_PATH))
+        if RATES_PATH
+        else None
+    )
+    fitted = rate_table["rates"] if rate_table else {}
+    rates_df = pd.DataFrame(
+        {
+            "Rate": [RATE_LABELS[name] for name in RATES],
+            "Default": list(DEFAULT_RATES.values()),
+            "Used": list(RATES.values()),
+            "95% CI Low": [fitted.get(name, {}).get("low") for name in RATES],
+            "95% CI High": [fitted.get(name, {}).get("high") for name in RATES],
+            "Observations": [fitted.get(name, {}).get("n", 0) for name in RATES],
+        }
+    )
+    st.dataframe(rates_df, use_container_width=True, hide_index=True)
+    if rate_table:
+        n_rows = sum(source["n_rows"] for source in rate_table["sources"].values())
+        st.caption(
+            f"Calibrated from {n_rows:,} logged hunts ({RATES_PATH}). "
+            "Rates with too few observations keep their default."
+        )
+    else:
+        st.caption(
+            "Hand-entered defaults. Fit them to your hunt logs with `python -m cliffs calibrate` and start the "
+            "app with CLIFFS_RATES pointing at the rate table."
+        )
+    st.caption(f"Game rules: {RULE_SET['name']} v{RULE_SET['version']} ({RULES_PATH}).")